@@ -0,0 +1,171 @@
+# docs/planning/m2_python/batch_runner.py  (reference only; evaluate many genomes over a process pool)
+#
+#   python batch_runner.py ../../../data/genoms --workers 8 --max-steps 200 --out results.jsonl
+#   python batch_runner.py genomes/ --substrate torus_1000x1000.yaml --workers 8   # all genomes on one shared init graph
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from genome_loader import load_genome, load_machine, machine_from_config
+
+def tasks_from_dir(path, pattern="*.yaml"):
+    """One task per genome file; workers load the YAML themselves so only the path is pickled."""
+    for f in sorted(Path(path).glob(pattern)):
+        yield {"name": f.stem, "path": str(f)}
+
+def tasks_from_population(genomes, prefix="g"):
+    """One task per in-memory genome dict (e.g. a generated population)."""
+    for i, cfg in enumerate(genomes):
+        yield {"name": f"{prefix}{i:05d}", "genome": cfg}
+
+def evaluate(task) -> dict:
+    """
+    Runs one genome to completion. task keys: name, path | genome, and optional per-task limits
+    max_steps / max_vertices / rng_seed / cycle_history, which replace the genome's machine values. With cache_dir,
+    path genomes go through the content-hash .gumb cache (see genome_loader.load_machine). With
+    profile (or trace_dir, which also writes <trace_dir>/<name>.jsonl), the run is profiled and the
+    StepProfiler summary is added to the record. With checkpoint_dir, the run saves
+    <checkpoint_dir>/<name>.ckpt every checkpoint_every steps and a rerun of a pre-empted task resumes
+    from it (rng_seed is then taken from the checkpoint); the file is removed once the run completes.
+    With substrate, the genome runs on the worker's shared substrate (shared_substrate.py) instead of
+    its own init_graph.
+    """
+    rec = {"name": task["name"]}
+    t0 = time.perf_counter()
+    try:
+        profiler = None
+        if task.get("profile") or task.get("trace_dir"):
+            from profiler import StepProfiler
+            trace = Path(task["trace_dir"]) / f"{task['name']}.jsonl" if task.get("trace_dir") else None
+            profiler = StepProfiler(trace=trace, count_edges=False)
+        limits = dict(max_steps=task.get("max_steps"), max_vertices=task.get("max_vertices"), rng_seed=task.get("rng_seed"),
+                      cycle_history=task.get("cycle_history"), profiler=profiler)
+        ckpt = Path(task["checkpoint_dir"]) / f"{task['name']}.ckpt" if task.get("checkpoint_dir") else None
+        run_kw = {}
+        if ckpt is not None and ckpt.exists():
+            from checkpoint import load_checkpoint
+            machine = load_checkpoint(ckpt)
+            for k in ("max_steps", "max_vertices", "cycle_history", "profiler"):
+                if limits[k] is not None: setattr(machine, k, limits[k])
+            rec["resumed_from"] = machine.passed_steps; run_kw["resume"] = True
+        elif task.get("substrate"):
+            from shared_substrate import worker_substrate
+            cfg = task["genome"] if "genome" in task else load_genome(task["path"], cache_dir=task.get("cache_dir"))
+            cfg = {k: v for k, v in cfg.items() if k != "init_graph"}
+            machine = machine_from_config(cfg, graph=worker_substrate().graph(), **limits)
+        elif "genome" in task:
+            machine = machine_from_config(task["genome"], **limits)
+        else:
+            machine = load_machine(task["path"], cache_dir=task.get("cache_dir"), **limits)
+        if machine.max_steps < 0:
+            raise ValueError("unbounded run (max_steps < 0); pass a per-task max_steps")
+        if ckpt is not None:
+            from checkpoint import Checkpointer
+            run_kw.update(checkpoint=Checkpointer(ckpt), checkpoint_every=task.get("checkpoint_every") or 1000)
+        machine.run(**run_kw)
+        if ckpt is not None: ckpt.unlink(missing_ok=True)
+        g = machine.graph
+        rec.update(steps=machine.passed_steps, stop_reason=machine.stop_reason, nodes=g.node_count(), edges=g.edge_count(),
+                   states=dict(Counter(n["state"] for n in g.nodes())))
+        if machine.cycle_period is not None: rec["cycle_period"] = machine.cycle_period
+        if profiler is not None: rec["profile"] = profiler.summary()
+    except Exception as e:  # one bad genome must not take down the batch
+        rec["error"] = f"{type(e).__name__}: {e}"
+    rec["seconds"] = round(time.perf_counter() - t0, 6)
+    return rec
+
+def _evaluate_chunk(tasks):
+    return [evaluate(t) for t in tasks]
+
+def run_batch(tasks, *, workers=None, chunk_size=4, max_in_flight=None, max_steps=None, max_vertices=None, cache_dir=None,
+              profile=False, trace_dir=None, checkpoint_dir=None, checkpoint_every=None, cycle_history=None, substrate=None):
+    """
+    Fans tasks out over a ProcessPoolExecutor in chunks of `chunk_size` and yields result records as
+    chunks finish (completion order, not submission order). At most `max_in_flight` chunks are queued,
+    so a very large task iterator is never materialized. max_steps/max_vertices/cycle_history/cache_dir/
+    profile/trace_dir/checkpoint_dir/checkpoint_every fill in per-task values that a task does not set itself.
+    substrate (a shared_substrate.SharedSubstrate, or a genome dict/path whose init_graph becomes one for
+    the duration of the batch) replaces every genome's init_graph; each worker attaches to it once.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    for d in (trace_dir, checkpoint_dir):
+        if d is not None: Path(d).mkdir(parents=True, exist_ok=True)
+    defaults = {k: v for k, v in (("max_steps", max_steps), ("max_vertices", max_vertices), ("cycle_history", cycle_history),
+                                  ("cache_dir", cache_dir),
+                                  ("profile", profile or None), ("trace_dir", trace_dir),
+                                  ("checkpoint_dir", checkpoint_dir), ("checkpoint_every", checkpoint_every)) if v is not None}
+    shared = None
+    if substrate is not None:
+        from shared_substrate import SharedSubstrate
+        shared = substrate if isinstance(substrate, SharedSubstrate) else SharedSubstrate.from_genome(substrate)
+        defaults["substrate"] = True
+    try:
+        yield from _run_pool(tasks, defaults, workers, chunk_size, max_in_flight, shared)
+    finally:
+        if shared is not None and shared is not substrate: shared.close()
+
+def _run_pool(tasks, defaults, workers, chunk_size, max_in_flight, shared):
+    it = iter(tasks)
+    def next_chunk():
+        chunk = []
+        for t in it:
+            chunk.append({**defaults, **t})
+            if len(chunk) >= chunk_size: break
+        return chunk
+    pool_kw = {}
+    if shared is not None:
+        from shared_substrate import attach_worker
+        pool_kw = dict(initializer=attach_worker, initargs=(shared.handle,))
+    with ProcessPoolExecutor(max_workers=workers, **pool_kw) as pool:
+        pending = set()
+        while True:
+            while len(pending) < max_in_flight:
+                chunk = next_chunk()
+                if not chunk: break
+                pending.add(pool.submit(_evaluate_chunk, chunk))
+            if not pending: return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield from fut.result()
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Evaluate a directory of genome YAML files in parallel.")
+    ap.add_argument("genomes", help="directory with genome *.yaml files")
+    ap.add_argument("--pattern", default="*.yaml")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--chunk-size", type=int, default=4)
+    ap.add_argument("--max-steps", type=int, default=None, help="per-task step limit (required for max_steps: -1 genomes)")
+    ap.add_argument("--max-vertices", type=int, default=None)
+    ap.add_argument("--cycle-history", type=int, default=None, help="stop a genome once its state repeats within this many steps")
+    ap.add_argument("--cache-dir", default=None, help="parsed-genome cache (.gumb by content hash), shared by all workers")
+    ap.add_argument("--profile", action="store_true", help="add a per-genome StepProfiler summary to each record")
+    ap.add_argument("--trace-dir", default=None, help="write per-step JSONL traces (<name>.jsonl) here; implies --profile")
+    ap.add_argument("--checkpoint-dir", default=None, help="save <name>.ckpt while running; rerunning resumes pre-empted genomes")
+    ap.add_argument("--checkpoint-every", type=int, default=None, help="steps between checkpoints (default 1000)")
+    ap.add_argument("--substrate", default=None, help="genome whose init_graph every genome runs on, shared read-only by the workers")
+    ap.add_argument("--out", default="-", help="JSONL output path, '-' for stdout")
+    args = ap.parse_args(argv)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    failed = 0
+    try:
+        for rec in run_batch(tasks_from_dir(args.genomes, args.pattern), workers=args.workers, chunk_size=args.chunk_size,
+                             max_steps=args.max_steps, max_vertices=args.max_vertices, cache_dir=args.cache_dir,
+                             profile=args.profile, trace_dir=args.trace_dir,
+                             checkpoint_dir=args.checkpoint_dir, checkpoint_every=args.checkpoint_every,
+                             cycle_history=args.cycle_history, substrate=args.substrate):
+            failed += "error" in rec
+            out.write(json.dumps(rec) + "\n"); out.flush()
+    finally:
+        if out is not sys.stdout: out.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
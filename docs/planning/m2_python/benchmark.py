@@ -0,0 +1,220 @@
+# docs/planning/m2_python/benchmark.py  (reference only; engine benchmarks over a fixed corpus)
+#
+#   python benchmark.py --out before.json                          # shipped genomes + default substrate sizes
+#   python benchmark.py --sizes 10x20,100x100,1000x1000 --out after.json --baseline before.json
+#   python benchmark.py --diff before.json after.json
+#
+# Corpus: every genome in data/genoms/ (max_steps < 0 capped by --max-steps) and the generate_graphs.py
+# substrates (torus, cylinder, diagonal strip; glider in the middle) at each LxW size, running the Life
+# rules of --substrate-genome for --substrate-steps steps. rng_seed is fixed (--seed) for all cases.
+# Each case runs in a fresh interpreter, so peak_rss_mb is that case's own high-water mark.
+#
+# Per case: load_seconds (genome -> ready machine), time_to_first_step (load + compile + step 1),
+# seconds (run(), best of --repeat), steps_per_sec (over the best run), node_steps_per_sec (node count
+# at step start summed over the steps, per second of that same best run), peak_rss_mb, and a digest of the final graph so two result files
+# also show when a change altered behavior rather than just speed.
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+GENOMES = ROOT / "data" / "genoms"
+SCRIPTS = ROOT / "scripts"
+SUBSTRATES = ("torus", "cylinder", "strip")
+DEFAULT_SIZES = "10x20,32x32,100x100,316x316"
+_clock = time.perf_counter
+
+class _StepClock:
+    """The smallest GraphUnfoldingMachine.profiler: one clock read and one node count per step."""
+    def __init__(self): self.marks = []; self.node_steps = 0
+    def attach(self, machine, step, stepper=None):
+        g = machine.graph; marks = self.marks
+        def timed():
+            self.node_steps += g.node_count(); did = step(); marks.append(_clock()); return did
+        return timed
+    def detach(self): pass
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)  # bytes on macOS, KiB elsewhere
+
+def _digest(g) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    for nid in sorted(g.node_ids()): h.update(f"{nid}:{g.node(nid)['state']};".encode())
+    for a, b in sorted(g.edges()): h.update(f"{a}-{b};".encode())
+    return h.hexdigest()
+
+def _graph(backend):
+    if backend == "compact":
+        from compact_graph import CompactGUMGraph
+        return CompactGUMGraph()
+    from python_implementation import GUMGraph
+    return GUMGraph()
+
+def substrate(kind, L, W):
+    """(states, edges as 0-based position pairs) for a generate_graphs.py substrate with a centered glider."""
+    if str(SCRIPTS) not in sys.path: sys.path.insert(0, str(SCRIPTS))
+    import generate_graphs as gg
+    p = gg.Params(L=L, W=W, glider_x0=L // 2, glider_v0=max(0, W // 2 - 1), torus_glider_r0=L // 2,
+                  torus_glider_c0=W // 2, cyl_glider_r0=L // 2, cyl_glider_c0=W // 2)
+    nodes, array_fn, iter_fn = {
+        "torus": (gg.generate_nodes_with_glider_torus, gg.edge_array_torus, gg.iter_edges_torus),
+        "cylinder": (gg.generate_nodes_with_glider_cylinder_grid, gg.edge_array_cylinder_grid, gg.iter_edges_cylinder_grid),
+        "strip": (gg.generate_nodes_with_glider_diagonal_strip, gg.edge_array_diagonal_strip_cylinder, gg.iter_edges_diagonal_strip_cylinder),
+    }[kind]
+    if gg.np is not None:
+        return nodes(p), (array_fn(p) - 1).tolist()
+    return nodes(p), [(a - 1, b - 1) for a, b in iter_fn(p)]
+
+def run_case(case: dict) -> dict:
+    """Runs one case in this process (benchmark.py --case) and returns its result record."""
+    from genome_loader import load_genome, machine_from_config
+    t0 = _clock()
+    cfg = load_genome(case["genome"])
+    if case["kind"] == "substrate":
+        states, edges = substrate(case["substrate"], case["L"], case["W"])
+        # generate_graphs fills with A; use the genome's own background (its most common init state)
+        init = [n for n in (cfg.get("init_graph") or {}).get("nodes") or [] if isinstance(n, str) and n != "-"]
+        background = Counter(init).most_common(1)[0][0] if init else "A"
+        states = [background if s == "A" else s for s in states]
+        cfg = {k: v for k, v in cfg.items() if k != "init_graph"}
+    steps = case["max_steps"] if case["max_steps"] is not None else int((cfg.get("machine") or {}).get("max_steps", 120))
+    if steps < 0: steps = case["steps_cap"]
+
+    def build(profiler):
+        graph = _graph(case["backend"])
+        if case["kind"] == "substrate": graph.add_substrate(states, edges)
+        return machine_from_config(cfg, graph=graph, max_steps=steps, rng_seed=case["seed"],
+                                   frontier=case["frontier"], profiler=profiler)
+
+    clocks = [_StepClock()]
+    machine = build(clocks[0]); load = _clock() - t0
+    times = []
+    for rep in range(case["repeat"]):
+        if rep: clocks.append(_StepClock()); machine = build(clocks[-1])  # later repeats rebuild; only run() is timed
+        start = _clock(); machine.run(); times.append(_clock() - start)
+    first = clocks[0].marks[0] - t0 if clocks[0].marks else None
+    k = min(range(len(times)), key=times.__getitem__); best = times[k]; g = machine.graph
+    return {
+        "steps": machine.passed_steps, "nodes": g.node_count(), "edges": g.edge_count(),
+        "load_seconds": round(load, 6), "time_to_first_step": None if first is None else round(first, 6),
+        "seconds": round(best, 6), "seconds_all": [round(t, 6) for t in times],
+        "steps_per_sec": round(machine.passed_steps / best, 3) if best else None,
+        "node_steps_per_sec": round(clocks[k].node_steps / best, 1) if best else None,
+        "peak_rss_mb": _peak_rss_mb(), "digest": _digest(g),
+    }
+
+def cases(args):
+    common = dict(backend=args.backend, seed=args.seed, repeat=args.repeat, frontier=args.frontier)
+    if not args.no_genomes:
+        for f in sorted(GENOMES.glob(args.pattern)):
+            yield {"case": f"genome:{f.stem}", "kind": "genome", "genome": str(f), "max_steps": None,
+                   "steps_cap": args.max_steps, **common}
+    for size in filter(None, args.sizes.split(",")):
+        L, W = (int(v) for v in size.lower().split("x"))
+        for kind in args.substrates.split(","):
+            yield {"case": f"substrate:{kind}:{L}x{W}", "kind": "substrate", "substrate": kind, "L": L, "W": W,
+                   "genome": str(args.substrate_genome), "max_steps": args.substrate_steps, "steps_cap": args.substrate_steps, **common}
+
+def _isolated(case, timeout):
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--case", json.dumps(case)]
+    try:
+        r = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=Path(__file__).resolve().parent)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout after {timeout}s"}
+    if r.returncode != 0:
+        return {"error": (r.stderr.strip().splitlines() or [f"exit {r.returncode}"])[-1]}
+    return json.loads(r.stdout.strip().splitlines()[-1])
+
+def _environment():
+    env = {"python": platform.python_version(), "implementation": platform.python_implementation(),
+           "platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count()}
+    try:
+        import numpy
+        env["numpy"] = numpy.__version__
+    except ImportError:
+        env["numpy"] = None
+    try:
+        env["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                       cwd=ROOT).stdout.strip() or None
+    except OSError:
+        env["commit"] = None
+    return env
+
+def compare(base: dict, new: dict) -> str:
+    """Table of per-case speed ratios (new / base steps_per_sec) and behavior changes (digest mismatch)."""
+    old = {r["case"]: r for r in base["results"]}
+    lines = [f"{'case':<40}{'base st/s':>12}{'new st/s':>12}{'ratio':>8}{'rss MB':>14}  note"]
+    for r in new["results"]:
+        b = old.get(r["case"])
+        if b is None or "error" in b or "error" in r:
+            lines.append(f"{r['case']:<40}{'':>12}{'':>12}{'':>8}{'':>14}  " + (r.get("error") or (b or {}).get("error") or "new case"))
+            continue
+        ratio = r["steps_per_sec"] / b["steps_per_sec"] if b["steps_per_sec"] and r["steps_per_sec"] else float("nan")
+        note = "" if (b["digest"], b["steps"]) == (r["digest"], r["steps"]) else "RESULT CHANGED"
+        rss = f"{b['peak_rss_mb']}->{r['peak_rss_mb']}"
+        lines.append(f"{r['case']:<40}{b['steps_per_sec']:>12.1f}{r['steps_per_sec']:>12.1f}{ratio:>8.2f}{rss:>14}  {note}")
+    return "\n".join(lines)
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the Python engine over the shipped genomes and generated substrates.")
+    ap.add_argument("--out", default=None, help="results JSON (default: print only)")
+    ap.add_argument("--baseline", default=None, help="earlier results JSON to compare against")
+    ap.add_argument("--diff", nargs=2, metavar=("BASE", "NEW"), help="only compare two result files")
+    ap.add_argument("--pattern", default="*.yaml", help="genome files in data/genoms/")
+    ap.add_argument("--no-genomes", action="store_true", help="substrate cases only")
+    ap.add_argument("--max-steps", type=int, default=200, help="step cap for genomes with max_steps < 0")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated LxW substrate sizes ('' for none)")
+    ap.add_argument("--substrates", default=",".join(SUBSTRATES))
+    ap.add_argument("--substrate-genome", default=GENOMES / "conways_game_of_life_torus.yaml", type=Path,
+                    help="genome whose rules run on the substrates")
+    ap.add_argument("--substrate-steps", type=int, default=50)
+    ap.add_argument("--backend", choices=("dict", "compact"), default="dict")
+    ap.add_argument("--frontier", action="store_true")
+    ap.add_argument("--seed", type=int, default=0, help="rng_seed for every case")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per case; seconds is the best")
+    ap.add_argument("--timeout", type=float, default=None, help="per-case limit in seconds")
+    ap.add_argument("--case", help=argparse.SUPPRESS)  # internal: run one case in this process
+    args = ap.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return 0
+    if args.diff:
+        base, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in args.diff)
+        print(compare(base, new))
+        return 0
+
+    results = []
+    for case in cases(args):
+        rec = {"case": case["case"], **_isolated(case, args.timeout)}
+        results.append(rec)
+        if "error" in rec:
+            print(f"{rec['case']:<40} ERROR {rec['error']}", file=sys.stderr)
+        else:
+            print(f"{rec['case']:<40}{rec['steps']:>6} steps {rec['seconds']:>10.4f}s {rec['steps_per_sec']:>10.1f} st/s"
+                  f" {rec['node_steps_per_sec']:>12.0f} node-st/s  first {rec['time_to_first_step']}s  {rec['peak_rss_mb']} MB",
+                  file=sys.stderr)
+    settings = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()
+                if k not in ("out", "baseline", "diff", "case", "timeout")}
+    report = {"environment": _environment(), "settings": settings, "results": results}
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=1) + "\n", encoding="utf-8")
+    if args.baseline:
+        print(compare(json.loads(Path(args.baseline).read_text(encoding="utf-8")), report))
+    return 1 if any("error" in r for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
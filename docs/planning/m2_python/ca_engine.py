@@ -0,0 +1,110 @@
+# docs/planning/m2_python/ca_engine.py  (reference only; NumPy stepping for fixed-topology CA genomes)
+
+import numpy as np
+
+from python_implementation import OperationKind, TranscriptionWay, _int_bounds, reachable_states
+
+def is_fixed_topology(machine) -> bool:
+    """True when every rule that can ever match is a TurnToState, i.e. the graph never changes shape."""
+    reachable = reachable_states((n["state"] for n in machine.graph.nodes()), machine.change_table)
+    for r in machine.change_table:
+        if r.is_enabled and r.condition.current in reachable and r.operation.kind != OperationKind.TurnToState:
+            return False
+    return not machine.graph.marked_ids()
+
+class VectorCAStepper:
+    """
+    Runs GraphUnfoldingMachine steps for fixed-topology genomes as array operations:
+      - node states/priors as int codes in a vector, topology as a COO adjacency (src, dst)
+      - degree from np.bincount(src), conn_with_state counts from np.bincount(src[state[dst] == s])
+      - per-rule match masks resolved to the first matching rule in table order
+        (continuable: first match at or after the node's rule_index, else wrap around)
+    step() is a drop-in for _next_step(); write_back() copies the node fields into the graph.
+    """
+    def __init__(self, machine):
+        g = machine.graph
+        self.machine = machine
+        self.ids = g.node_ids()
+        nodes = [g.node(nid) for nid in self.ids]
+        rules = [(i, r) for i, r in enumerate(machine.change_table) if r.is_enabled]
+
+        names = {"Unknown"}
+        for n in nodes: names.update((n["state"], n["prior_state"]))
+        for _, r in rules:
+            c = r.condition
+            names.update(s for s in (c.current, c.prior, c.conn_with_state, r.operation.operand) if s is not None)
+        self.names = sorted(names, key=str)
+        code = {s: k for k, s in enumerate(self.names)}
+
+        self.state = np.array([code[n["state"]] for n in nodes], dtype=np.int32)
+        self.prior = np.array([code[n["prior_state"]] for n in nodes], dtype=np.int32)
+        self.parents = np.array([n["parents_count"] for n in nodes], dtype=np.int64)
+        self.rule_index = np.array([n["rule_index"] for n in nodes], dtype=np.int64)
+
+        ids = np.asarray(self.ids, dtype=np.int64)
+        e = np.fromiter((v for ab in g.edges() for v in ab), dtype=np.int64).reshape(-1, 2)
+        a, b = np.searchsorted(ids, e[:, 0]), np.searchsorted(ids, e[:, 1])
+        self.src = np.concatenate([a, b]); self.dst = np.concatenate([b, a])
+        self.degree = np.bincount(self.src, minlength=len(ids))
+
+        mode = machine.count_compare
+        self.rules = []  # (table index, current, prior|-1, conn_with_state|-1, dlo, dhi, plo, phi, operand|-1, rule)
+        for i, r in rules:
+            c = r.condition; op = r.operation.operand
+            self.rules.append((i, code[c.current], -1 if c.prior == "any" else code[c.prior],
+                               -1 if c.conn_with_state == "any" else code[c.conn_with_state],
+                               *_int_bounds(c.conn_ge, c.conn_le, mode), *_int_bounds(c.parents_ge, c.parents_le, mode),
+                               -1 if op is None else code[op], r))
+        self.cws_codes = sorted({rule[3] for rule in self.rules if rule[3] >= 0})
+        self.table_len = max(1, len(machine.change_table))
+        self.operand = np.full(self.table_len, -1, dtype=np.int32)
+        for rule in self.rules: self.operand[rule[0]] = rule[8]
+        self.continuable = machine.transcription == TranscriptionWay.continuable
+        self.stepped = False
+
+    @classmethod
+    def build(cls, machine):
+        return cls(machine) if is_fixed_topology(machine) else None
+
+    def step(self):
+        st = self.state; n = len(st)
+        conn = {s: np.bincount(self.src[st[self.dst] == s], minlength=n) for s in self.cws_codes}
+        first = np.full(n, -1, dtype=np.int64)   # first match at or after rule_index
+        wrapped = np.full(n, -1, dtype=np.int64)  # first match before rule_index (continuable only)
+        for i, cur, prior, cws, dlo, dhi, plo, phi, _, _ in reversed(self.rules):
+            m = st == cur
+            if prior >= 0: m &= self.prior == prior
+            deg = self.degree if cws < 0 else conn[cws]
+            m &= (deg >= dlo) & (deg <= dhi) & (self.parents >= plo) & (self.parents <= phi)
+            if self.continuable:
+                first[m & (self.rule_index <= i)] = i
+                wrapped[m & (self.rule_index > i)] = i
+            else:
+                first[m] = i
+        chosen = np.where(first >= 0, first, wrapped)
+        hit = chosen >= 0
+        fired = chosen[hit]
+
+        new_state = st.copy()
+        ops = self.operand[fired]
+        new_state[np.flatnonzero(hit)[ops >= 0]] = ops[ops >= 0]
+        self.prior = st; self.state = new_state
+        if self.continuable: self.rule_index[hit] = (fired + 1) % self.table_len
+
+        table = self.machine.change_table
+        for i, k in enumerate(np.bincount(fired, minlength=len(table))):
+            if k:
+                r = table[i]; r.is_active = True; r.was_active = True
+                r.last_activation_index = r.last_activation_index + int(k) if r.last_activation_index >= 0 else int(k) - 1
+        self.stepped = True
+        return bool(fired.size)
+
+    def write_back(self):
+        if not self.stepped: return
+        g = self.machine.graph; names = self.names
+        for k, nid in enumerate(self.ids):
+            n = g.node(nid)
+            g.set_state(nid, names[self.state[k]]); n["prior_state"] = names[self.prior[k]]
+            g.set_saved_state(nid, n["prior_state"]); n["saved_parents"] = int(self.parents[k])
+            n["saved_degree"] = int(self.degree[k]); n["marked_new"] = False
+            n["rule_index"] = int(self.rule_index[k])
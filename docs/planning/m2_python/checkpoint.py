@@ -0,0 +1,91 @@
+# docs/planning/m2_python/checkpoint.py  (reference only; checkpoint / resume for GraphUnfoldingMachine runs)
+#
+#   machine.run(checkpoint=Checkpointer("run.ckpt"), checkpoint_every=1000)   # pre-empted somewhere
+#   machine = load_checkpoint("run.ckpt"); machine.run(resume=True)          # same result as one long run
+#
+# A checkpoint is gzip-compressed JSON (format "gum-checkpoint", version 1) taken between two steps:
+#   machine  engine options, passed_steps, _empty_iters, orphan ages, random.Random state, and with
+#            cycle_history the CycleDetector's hash history (cycle_state)
+#   rules    the change table in genome form plus each rule's runtime flags
+#   graph    the node id counter, ids in iteration order, per-node columns (state names interned in
+#            "names", saved_state -1 before the first snapshot), flat edge list, ids awaiting a snapshot
+# saved_conn_by_state is not stored: the restored graph recomputes it at its first snapshot, as it does
+# after any step that did not need it. Frontier scheduling restarts with every node awake, which the
+# frontier invariant makes result-neutral. Cycle detection continues the saved history (per-node hashes
+# are rebuilt from the graph), so a resumed run stops at the same step as the uninterrupted one.
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+FORMAT, VERSION = "gum-checkpoint", 1
+
+_MACHINE_OPTIONS = ("transcription", "count_compare", "max_vertices", "max_steps", "nearest_max_depth",
+                    "nearest_tie_breaker", "nearest_connect_all", "vectorize_ca", "frontier", "topology_semantics",
+                    "cycle_history", "maintain_single_component", "orphan_cleanup", "reseed_isolated_A", "prune_rules")
+
+def graph_state(g) -> dict:
+    """Between-step graph state, for either backend (GUMGraph.export_state)."""
+    return g.export_state()
+
+def restore_graph(st: dict, graph=None):
+    """Rebuilds a graph_state() dict into `graph` (an empty GUMGraph by default) with the same ids."""
+    if graph is None:
+        from python_implementation import GUMGraph
+        graph = GUMGraph()
+    return graph.restore_state(st)
+
+def machine_state(machine) -> dict:
+    from genome_loader import rule_to_config
+    version, internal, gauss = machine.rng.getstate()
+    return {
+        "format": FORMAT, "version": VERSION,
+        "machine": {**{k: getattr(machine, k) for k in _MACHINE_OPTIONS},
+                    "passed_steps": machine.passed_steps, "empty_iters": machine._empty_iters,
+                    "orphan_age": [[nid, a] for nid, a in machine.orphan_age.items()],
+                    "rng": [version, list(internal), gauss], "cycle_state": machine.cycle_state},
+        "rules": [{**rule_to_config(r), "runtime": [r.is_active, r.was_active, r.last_activation_index]} for r in machine.change_table],
+        "graph": graph_state(machine.graph),
+    }
+
+def restore_machine(state: dict, *, graph=None):
+    """GraphUnfoldingMachine from a machine_state() dict; continue it with run(resume=True)."""
+    from genome_loader import rule_from_config
+    from python_implementation import GraphUnfoldingMachine, GUMGraph
+    if state.get("format") != FORMAT: raise ValueError("not a gum checkpoint")
+    if state.get("version", 0) > VERSION: raise ValueError(f"checkpoint version {state['version']} is newer than supported ({VERSION})")
+    m = state["machine"]
+    g = restore_graph(state["graph"], graph)
+    # an empty graph would get a fresh seed vertex from the constructor
+    machine = GraphUnfoldingMachine(g if g.node_count() else GUMGraph(), **{k: m[k] for k in _MACHINE_OPTIONS if k in m})
+    machine.graph = g
+    machine.passed_steps = m["passed_steps"]; machine._empty_iters = m["empty_iters"]
+    machine.orphan_age = {nid: a for nid, a in m.get("orphan_age", [])}
+    machine.cycle_state = m.get("cycle_state")
+    version, internal, gauss = m["rng"]
+    machine.rng.setstate((version, tuple(internal), gauss))
+    rules = []
+    for rc in state["rules"]:
+        r = rule_from_config(rc); r.is_active, r.was_active, r.last_activation_index = rc["runtime"]
+        rules.append(r)
+    machine.change_table = rules
+    return machine
+
+def save_checkpoint(machine, path) -> None:
+    """Writes atomically (temp file + os.replace), so a pre-empted write never leaves a torn checkpoint."""
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(machine_state(machine), f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def load_checkpoint(path, *, graph=None):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return restore_machine(json.load(f), graph=graph)
+
+class Checkpointer:
+    """run(checkpoint=...) callback: saves to one path, overwriting the previous checkpoint."""
+    def __init__(self, path): self.path = Path(path); self.saved = 0
+    def __call__(self, machine):
+        save_checkpoint(machine, self.path); self.saved += 1
@@ -0,0 +1,284 @@
+# docs/planning/m2_python/compact_graph.py  (reference only; array-backed GUMGraph backend)
+
+from array import array
+from bisect import bisect_left, insort
+
+from python_implementation import GUMGraph, NeighborhoodCache, nearest_candidates
+
+# NodeState byte codes, same values as the NodeState enum in src/gum.ts
+STATE_CODES = {"any": 0, **{chr(ord("A") + i): i + 1 for i in range(26)}, "Unknown": 254}
+_STATE_ALIASES = {"Min": 0, "Ignored": 0}
+_STATE_NAMES = {code: name for name, code in STATE_CODES.items()}
+NO_STATE = 255  # saved_state before the first snapshot (None in the dict backend)
+
+_F_NEW, _F_DELETED = 1, 2
+
+def encode_state(state) -> int:
+    if state is None: return NO_STATE
+    s = str(state)
+    code = STATE_CODES.get(s, _STATE_ALIASES.get(s))
+    if code is None: raise ValueError(f"state {s!r} has no NodeState byte code")
+    return code
+
+def decode_state(code: int):
+    return None if code == NO_STATE else _STATE_NAMES[code]
+
+def _flag(bit):
+    def get(g, s): return bool(g._flags[s] & bit)
+    def put(g, s, on): g._flags[s] = (g._flags[s] | bit) if on else (g._flags[s] & ~bit)
+    return get, put
+
+def _coded(attr):
+    def get(g, s): return decode_state(getattr(g, attr)[s])
+    def put(g, s, v): getattr(g, attr)[s] = encode_state(v)
+    return get, put
+
+def _plain(attr):
+    def get(g, s): return getattr(g, attr)[s]
+    def put(g, s, v): getattr(g, attr)[s] = int(v)
+    return get, put
+
+# node dict key -> (getter, setter) over the slot arrays
+_FIELDS = {
+    "state": _coded("_state"), "prior_state": _coded("_prior"), "saved_state": _coded("_saved_state"),
+    "parents_count": _plain("_parents"), "saved_parents": _plain("_saved_parents"),
+    "saved_degree": _plain("_saved_degree"), "rule_index": _plain("_rule_index"),
+    "marked_new": _flag(_F_NEW), "marked_deleted": _flag(_F_DELETED),
+    "saved_conn_by_state": (lambda g, s: g._saved_cbs[s], None),
+    "neighbors": (lambda g, s: g._adj[s], None),
+}
+
+class CompactNode:
+    """Dict-like view of one node slot, so GraphUnfoldingMachine runs unchanged on either backend."""
+    __slots__ = ("_g", "_s", "id")
+    def __init__(self, g, slot, nid): self._g = g; self._s = slot; self.id = nid
+    def __getitem__(self, key):
+        if key == "id": return self.id
+        return _FIELDS[key][0](self._g, self._s)
+    def __setitem__(self, key, value):
+        if key == "state": self._g.set_state(self.id, value); return
+        if key == "saved_state": self._g.set_saved_state(self.id, value); return
+        if key == "marked_deleted" and value: self._g.mark_deleted(self.id); return
+        if key == "marked_deleted": self._g._marked.discard(self.id)
+        put = _FIELDS[key][1]
+        if put is None: raise KeyError(f"{key!r} is read-only; use the graph's edge methods")
+        put(self._g, self._s, value)
+    def get(self, key, default=None):
+        return self[key] if key == "id" or key in _FIELDS else default
+
+class CompactGUMGraph:
+    """
+    Same interface as GUMGraph, stored as parallel arrays indexed by slot:
+      - states as NodeState byte codes (array('B')), parents/degree/rule index as int32
+      - one sorted array('i') of neighbor ids per slot
+    Node ids stay monotonic (creation order == iteration order, as in GUMGraph); slots of removed
+    nodes go on a free list and are reused by later births. node()/nodes() return CompactNode views.
+    Dirty tracking, state_counts(), the saved_state index and the copy-on-write step-start topology work
+    as in GUMGraph; node["state"] / node["saved_state"] / node["marked_deleted"] assignments go through
+    set_state() / set_saved_state() / mark_deleted(), so sync_marked() has nothing to collect.
+    delete_marked(), edge_count(), bfs_expansions, pending_ids(), next_id and export_state() /
+    restore_state() work as in GUMGraph.
+    """
+    def __init__(self):
+        self._slot = {}; self._free = []; self._next = 0
+        self._state = array("B"); self._prior = array("B"); self._saved_state = array("B"); self._flags = array("B")
+        self._parents = array("i"); self._saved_parents = array("i"); self._saved_degree = array("i"); self._rule_index = array("i")
+        self._adj = []  # slot -> array('i') of neighbor ids, None for free slots
+        self._saved_cbs = []  # slot -> {state: count} from the last snapshot, only when requested
+        self._dirty = set(); self._state_count = array("q", bytes(8 * 256)); self._conn_by_state_fresh = False
+        self._step_adj = {}; self._nbhd = NeighborhoodCache(self.snapshot_neighbors)
+        self._by_saved_state = {}  # saved_state code -> set of node ids
+        self._marked = set(); self._edge_count = 0
+        self.bfs_expansions = 0
+
+    def add_vertex(self, state, parents_count=0, mark_new=True):
+        nid = self._next; self._next += 1
+        row = (encode_state(state), STATE_CODES["Unknown"], NO_STATE, _F_NEW if mark_new else 0,
+               int(parents_count), 0, 0, 0)
+        cols = (self._state, self._prior, self._saved_state, self._flags,
+                self._parents, self._saved_parents, self._saved_degree, self._rule_index)
+        if self._free:
+            s = self._free.pop()
+            for col, v in zip(cols, row): col[s] = v
+            self._adj[s] = array("i"); self._saved_cbs[s] = None
+        else:
+            s = len(self._adj)
+            for col, v in zip(cols, row): col.append(v)
+            self._adj.append(array("i")); self._saved_cbs.append(None)
+        self._slot[nid] = s
+        self._dirty.add(nid); self._state_count[row[0]] += 1
+        return nid
+    def add_substrate(self, states, edges, mark_new=True):
+        """Same as GUMGraph.add_substrate; appends whole columns instead of one slot at a time."""
+        n = len(states); base = self._next
+        adj = [[] for _ in range(n)]
+        for i, j in edges:
+            if i != j: adj[i].append(base + j); adj[j].append(base + i)
+        rows = [array("i", sorted(set(nb))) for nb in adj]
+        self._adj.extend(rows); self._edge_count += sum(map(len, rows)) // 2
+        return self._append_slots(array("B", map(encode_state, states)), mark_new)
+    def _append_slots(self, codes, mark_new):
+        """Node columns for len(codes) new nodes at the end of the slot arrays; _adj must already hold their rows."""
+        base, first = self._append_columns(codes, mark_new)
+        ids = range(base, base + len(codes))
+        self._slot.update(zip(ids, range(first, first + len(codes))))
+        self._dirty.update(ids)
+        return list(ids)
+    def _append_columns(self, codes, mark_new):
+        """The column part of _append_slots: reserves the ids and slots, returns (first id, first slot)."""
+        n = len(codes); base = self._next; self._next += n
+        for col, v in ((self._prior, STATE_CODES["Unknown"]), (self._saved_state, NO_STATE), (self._flags, _F_NEW if mark_new else 0)):
+            col.frombytes(bytes((v,)) * n)
+        for col in (self._parents, self._saved_parents, self._saved_degree, self._rule_index):
+            col.frombytes(bytes(col.itemsize * n))
+        first = len(self._state); self._state.frombytes(codes); self._saved_cbs.extend([None] * n)
+        for c in codes: self._state_count[c] += 1
+        return base, first
+    def add_edge(self, a, b):
+        sa, sb = self._slot.get(a), self._slot.get(b)
+        if sa is None or sb is None or a == b: return
+        if not _has(self._adj[sa], b):
+            self._touch_adj(a, sa); self._touch_adj(b, sb)
+            insort(self._adj[sa], b); insort(self._adj[sb], a)
+            self._dirty.add(a); self._dirty.add(b); self._edge_count += 1
+    def remove_edge(self, a, b):
+        sa, sb = self._slot.get(a), self._slot.get(b)
+        if sa is not None and _has(self._adj[sa], b):
+            self._touch_adj(a, sa); self._touch_adj(b, sb)
+            _discard(self._adj[sa], b); _discard(self._adj[sb], a)
+            self._dirty.add(a); self._dirty.add(b); self._edge_count -= 1
+    def remove_vertex(self, nid):
+        if nid in self._slot: self._remove_vertices((nid,))
+    def _remove_vertices(self, ids):
+        """Same as GUMGraph._remove_vertices."""
+        gone = set(ids); inner = 0
+        for nid in ids:
+            s = self._slot.pop(nid)
+            for nb in self._adj[s]:
+                if nb in gone: inner += 1; continue
+                snb = self._slot[nb]; self._touch_adj(nb, snb)
+                _discard(self._adj[snb], nid); self._dirty.add(nb); self._edge_count -= 1
+            self._state_count[self._state[s]] -= 1; self._index_saved(nid, self._saved_state[s], NO_STATE); self._dirty.discard(nid); self._step_adj.pop(nid, None)
+            self._adj[s] = None; self._saved_cbs[s] = None; self._free.append(s)
+        self._edge_count -= inner // 2; self._marked -= gone
+    def mark_deleted(self, nid):
+        s = self._slot.get(nid)
+        if s is not None: self._flags[s] |= _F_DELETED; self._marked.add(nid)
+    def sync_marked(self): pass  # node["marked_deleted"] writes already go through mark_deleted()
+    def marked_ids(self): return sorted(self._marked)
+    def set_state(self, nid, state):
+        s = self._slot[nid]; code = encode_state(state)
+        if self._state[s] == code: return
+        self._state_count[self._state[s]] -= 1; self._state_count[code] += 1
+        self._state[s] = code; self._dirty.add(nid)
+    def set_saved_state(self, nid, state):
+        s = self._slot[nid]; code = encode_state(state)
+        self._index_saved(nid, self._saved_state[s], code); self._saved_state[s] = code
+    def mark_dirty(self, nid):
+        if nid in self._slot: self._dirty.add(nid)
+    def state_counts(self):
+        return {_STATE_NAMES[code]: c for code, c in enumerate(self._state_count) if c}
+    def sorted_neighbors(self, nid): return self._adj[self._slot[nid]]  # live array: copy before editing edges
+    def snapshot_neighbors(self, nid):
+        t = self._step_adj.get(nid)
+        return t if t is not None else self._adj[self._slot[nid]]
+    def snapshot_adjacent(self, a, b): return _has(self.snapshot_neighbors(a), b)
+    def _touch_adj(self, nid, s):
+        if nid not in self._step_adj: self._step_adj[nid] = tuple(self._adj[s])
+    def _index_saved(self, nid, old, new):
+        if old == new: return
+        if old != NO_STATE:
+            ids = self._by_saved_state[old]; ids.discard(nid)
+            if not ids: del self._by_saved_state[old]
+        if new != NO_STATE: self._by_saved_state.setdefault(new, set()).add(nid)
+
+    def node(self, nid):
+        s = self._slot.get(nid)
+        return None if s is None else CompactNode(self, s, nid)
+    def nodes(self): return [CompactNode(self, s, nid) for nid, s in self._slot.items()]
+    def has_node(self, nid): return nid in self._slot
+    def node_ids(self): return list(self._slot)
+    def node_count(self): return len(self._slot)
+    def edge_count(self): return self._edge_count
+    def edges(self):
+        for nid, s in self._slot.items():
+            adj = self._adj[s]
+            for k in range(bisect_left(adj, nid + 1), len(adj)): yield (nid, adj[k])
+    def snapshot_nodes(self, conn_by_state=False):
+        dirty = self._dirty; self._dirty = set()
+        self._step_adj = {}; self._nbhd = NeighborhoodCache(self.snapshot_neighbors)
+        for nid in dirty:
+            s = self._slot[nid]
+            self._flags[s] &= ~_F_NEW
+            self._index_saved(nid, self._saved_state[s], self._state[s]); self._saved_state[s] = self._state[s]
+            self._saved_parents[s] = self._parents[s]
+            self._saved_degree[s] = len(self._adj[s])
+        if conn_by_state:
+            if self._conn_by_state_fresh:
+                todo = set(dirty)
+                for nid in dirty: todo.update(self._adj[self._slot[nid]])
+            else:
+                todo = set(self._slot)
+            for nid in todo:
+                s = self._slot[nid]; counts = {}
+                for nb in self._adj[s]:
+                    st = _STATE_NAMES[self._saved_state[self._slot[nb]]]; counts[st] = counts.get(st, 0) + 1
+                self._saved_cbs[s] = counts
+            dirty = todo
+        self._conn_by_state_fresh = conn_by_state
+        return dirty
+    def delete_marked(self):
+        gone = sorted(self._marked)
+        if gone: self._remove_vertices(gone)
+        return gone
+
+    def try_connect_with(self, u_id, state, *, snapshot=False):
+        """Same as GUMGraph.try_connect_with."""
+        cands = self._by_saved_state.get(encode_state(state))
+        su = self._slot.get(u_id)
+        if not cands or su is None: return
+        todo = cands.difference(self.snapshot_neighbors(u_id) if snapshot else self._adj[su]); todo.discard(u_id)
+        for v in sorted(todo):
+            if not self._flags[self._slot[v]] & (_F_NEW | _F_DELETED): self.add_edge(u_id, v)
+
+    # Same as GUMGraph's: they use the node views and the _next / _dirty / _step_adj fields both backends share.
+    _STATE_COLUMNS, _INT_COLUMNS = GUMGraph._STATE_COLUMNS, GUMGraph._INT_COLUMNS
+    export_state = GUMGraph.export_state; restore_state = GUMGraph.restore_state
+    pending_ids = GUMGraph.pending_ids; next_id = GUMGraph.next_id
+
+    # Same search as GUMGraph.try_connect_with_nearest; adjacency is already sorted by id.
+    def try_connect_with_nearest(self, u_id, *, required_state=None, max_depth=2, tie_breaker="stable", connect_all=False, rng=None, snapshot=False):
+        su = self._slot.get(u_id)
+        if su is None or self._flags[su] & _F_DELETED: return
+        neighbors_of = self.snapshot_neighbors if snapshot else self.sorted_neighbors
+        nbrs_u = frozenset(neighbors_of(u_id))
+        required = None if required_state is None else encode_state(required_state)
+        def eligible(v):
+            if v==u_id or v in nbrs_u: return False
+            sv = self._slot[v]
+            if self._flags[sv] & _F_NEW: return False
+            if required is None: return True
+            st = self._saved_state[sv]
+            return (st if st != NO_STATE else self._state[sv]) == required
+        ordered = tie_breaker=="random" and not connect_all
+        found, expanded = nearest_candidates(u_id, max_depth, neighbors_of, eligible, self._nbhd if snapshot and not ordered else None)
+        self.bfs_expansions += expanded
+        if not found: return
+        if connect_all:
+            for v in found: self.add_edge(u_id,v)
+            return
+        if tie_breaker=="random" and rng is not None:
+            v = rng.choice(found)
+        else:
+            v = min(found)  # stable/by_id/by_creation => minimal id
+        self.add_edge(u_id,v)
+
+def _has(adj, v):
+    i = bisect_left(adj, v)
+    return i < len(adj) and adj[i] == v
+
+def _discard(adj, v) -> bool:
+    i = bisect_left(adj, v)
+    if i < len(adj) and adj[i] == v:
+        del adj[i]; return True
+    return False
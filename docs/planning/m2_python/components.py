@@ -0,0 +1,210 @@
+# docs/planning/m2_python/components.py  (reference only; connected components for the component machine options)
+#
+#   machine = GraphUnfoldingMachine(g, ..., maintain_single_component=True)
+#   machine = GraphUnfoldingMachine(g, ..., orphan_cleanup={"enabled": True, "thresholds": {"size1": 5, "size2": 7, "others": 10}})
+#   machine = GraphUnfoldingMachine(g, ..., reseed_isolated_A=True)
+#
+# The per-step passes of the TS engine (src/gum.ts, runOneStep), after the rules:
+#   (marked nodes are deleted)
+#   orphan_cleanup             nodes outside the primary component age by one step per step; a node is
+#                              deleted once its age reaches the threshold for its component's size
+#                              (size1 / size2 / others). Needs maintain_single_component off.
+#   reseed_isolated_A          an isolated A node with parents_count > 0 becomes a root: parents_count 0,
+#                              prior_state Unknown. Needs the other two options off.
+#   maintain_single_component  every component but the primary one is deleted.
+# The primary component is the one with the smallest (min parents_count, min id) of its nodes.
+# TS ages orphans before removeMarkedNodes(), but its getConnectedComponents() skips marked nodes and
+# never walks through them, so the components it ages are those left once the marked nodes are gone:
+# deleting the Die-marked nodes first gives the same ages and deletions at every step.
+# fadeStarts only drive the TS UI's fading and are not used here.
+#
+# ComponentTracker keeps the components between steps instead of searching the whole graph each step.
+# sync() diffs the adjacency of the nodes the step touched (the graph's pending refresh set) against
+# its own copy: an added edge merges two components by relabeling the smaller one; lost edges and
+# deleted nodes start one BFS per affected endpoint, run in lockstep. Searches that meet are joined,
+# and a search that runs out of nodes first has found a split-off component (relabeled at the cost of
+# its own size); the last one standing keeps the old label. A cut that leaves the component connected
+# usually closes within a few hops on meshes.
+
+from collections import deque
+
+class ComponentTracker:
+    """
+    Connected components of a graph, kept current by sync() after each batch of mutations.
+    Components are labeled; members[label] is the set of node ids, and the (min parents_count, min id)
+    key of each label is cached until its membership shrinks. parents_count of an existing node is
+    assumed fixed (the engine only sets it at birth), except through reseeded().
+    """
+    def __init__(self, graph):
+        self.g = graph; self._label = {}; self.members = {}; self._key = {}; self._next_label = 0
+        self._adj = {nid: tuple(graph.sorted_neighbors(nid)) for nid in graph.node_ids()}
+        for nid in self._adj:
+            if nid in self._label: continue
+            comp = [nid]; q = deque(comp); self._label[nid] = -1
+            while q:
+                for v in self._adj[q.popleft()]:
+                    if v not in self._label: self._label[v] = -1; comp.append(v); q.append(v)
+            self._new(comp)
+
+    def _new(self, ids):
+        lab = self._next_label; self._next_label += 1
+        self.members[lab] = set(ids); self._key[lab] = None
+        for v in ids: self._label[v] = lab
+        return lab
+
+    def count(self): return len(self.members)
+    def label(self, nid): return self._label.get(nid)
+
+    def key(self, lab):
+        k = self._key[lab]
+        if k is None:
+            ms = self.members[lab]; node = self.g.node
+            k = self._key[lab] = (min(node(v)["parents_count"] for v in ms), min(ms))
+        return k
+
+    def primary(self):
+        """Label of the component to keep: smallest (min parents_count, min id)."""
+        return min(self.members, key=self.key, default=None)
+
+    def reseeded(self, nid):
+        """nid's parents_count dropped to 0."""
+        lab = self._label[nid]; k = self._key[lab]
+        if k is not None: self._key[lab] = (0, k[1])
+
+    def sync(self, removed=()):
+        """Catches up with the graph: `removed` are the ids deleted since the last sync."""
+        g = self.g; label = self._label; adj = self._adj
+        for r in removed:
+            lab = label.pop(r, None)
+            if lab is None: continue
+            del adj[r]; ms = self.members[lab]; ms.discard(r)
+            if ms: self._key[lab] = None
+            else: del self.members[lab]; del self._key[lab]
+        dirty = list(g.pending_ids())
+        for nid in dirty:
+            if nid not in label: adj[nid] = (); self._new((nid,))
+        cut = []
+        for nid in dirty:
+            new = tuple(g.sorted_neighbors(nid)); old = adj[nid]
+            if new == old: continue
+            adj[nid] = new
+            if old:
+                keep = set(new)
+                if any(v not in keep for v in old): cut.append(nid)
+            prev = set(old)
+            for v in new:
+                if v not in prev: self._union(nid, v)
+        if cut:
+            by_label = {}
+            for v in cut: by_label.setdefault(label[v], []).append(v)
+            for lab, seeds in by_label.items():
+                if len(seeds) > 1: self._split(lab, seeds)
+
+    def _union(self, a, b):
+        label = self._label; la, lb = label[a], label[b]
+        if la == lb: return
+        ma, mb = self.members[la], self.members[lb]
+        if len(ma) < len(mb): la, lb, ma, mb = lb, la, mb, ma
+        for v in mb: label[v] = la
+        ma |= mb; del self.members[lb]
+        ka, kb = self._key[la], self._key.pop(lb)
+        self._key[la] = None if ka is None or kb is None else (min(ka[0], kb[0]), min(ka[1], kb[1]))
+
+    def _split(self, lab, seeds):
+        """Lockstep BFS from each seed (all in component `lab`) over the current adjacency."""
+        adj = self._adj
+        seeds = list(dict.fromkeys(seeds))
+        owner = {s: i for i, s in enumerate(seeds)}; up = list(range(len(seeds)))
+        queues = [deque((s,)) for s in seeds]; seen = [[s] for s in seeds]
+        live = dict.fromkeys(range(len(seeds)))  # ordered set of search roots
+        def root(i):
+            while up[i] != i: up[i] = up[up[i]]; i = up[i]
+            return i
+        while len(live) > 1:
+            for i in list(live):
+                if i not in live: continue
+                if not queues[i]:  # search i exhausted its component before meeting any other
+                    del live[i]; self._relabel(lab, seen[i]); seen[i] = queues[i] = None
+                    if len(live) == 1: break
+                    continue
+                for v in adj[queues[i].popleft()]:
+                    o = owner.get(v)
+                    if o is None:
+                        owner[v] = i; queues[i].append(v); seen[i].append(v); continue
+                    j = root(o)
+                    if j == i: continue
+                    up[j] = i; del live[j]  # the searches met: same component
+                    if len(seen[j]) > len(seen[i]):
+                        seen[i], seen[j] = seen[j], seen[i]; queues[i], queues[j] = queues[j], queues[i]
+                    seen[i].extend(seen[j]); queues[i].extend(queues[j]); seen[j] = queues[j] = None
+                if len(live) == 1: break
+
+    def _relabel(self, lab, ids):
+        ids = set(ids)
+        self.members[lab] -= ids; self._key[lab] = None
+        self._new(ids)
+
+class ComponentPasses:
+    """The component passes of one GraphUnfoldingMachine.run(), applied by _next_step after the rules."""
+    def __init__(self, machine):
+        self.m = machine; self.tracker = ComponentTracker(machine.graph)
+        oc = machine.orphan_cleanup or {}
+        self.maintain = machine.maintain_single_component
+        self.orphans = bool(oc.get("enabled")) and not self.maintain
+        self.reseed = machine.reseed_isolated_A and not self.maintain and not self.orphans
+        t = oc.get("thresholds") or {}
+        self.thresholds = (int(t.get("size1", 5)), int(t.get("size2", 7)), int(t.get("others", 10)))
+
+    def static(self) -> bool:
+        """
+        True when no pass can act while the topology stays fixed (the vectorized CA path): components
+        then never change and parents_count never moves, so it suffices to check the start graph.
+        """
+        tr = self.tracker
+        if (self.maintain or self.orphans) and tr.count() > 1: return False
+        if self.reseed:
+            node = self.m.graph.node
+            if any(len(ms) == 1 and node(next(iter(ms)))["parents_count"] > 0 for ms in tr.members.values()): return False
+        return True
+
+    def after_step(self):
+        self._delete()  # nodes a Die rule marked (TS components already leave them out)
+        if self.orphans:
+            self._age_orphans(); self._delete()
+        elif self.reseed:
+            self._reseed()
+        if self.maintain and self.tracker.count() > 1:
+            keep = self.tracker.primary(); mark = self.m.graph.mark_deleted
+            for lab, ms in self.tracker.members.items():
+                if lab != keep:
+                    for v in ms: mark(v)
+            self._delete()
+
+    def _delete(self):
+        m = self.m; removed = m.graph.delete_marked()
+        if removed and m._fired is not None: m._fired.extend(removed)  # CycleDetector drops their hashes
+        self.tracker.sync(removed)
+
+    def _age_orphans(self):
+        tr = self.tracker; m = self.m
+        if tr.count() <= 1:
+            m.orphan_age.clear(); return
+        keep = tr.primary(); mark = m.graph.mark_deleted; old = m.orphan_age; ages = {}
+        s1, s2, others = self.thresholds
+        for lab, ms in tr.members.items():
+            if lab == keep: continue
+            th = s1 if len(ms) == 1 else s2 if len(ms) == 2 else others
+            for v in ms:
+                a = old.get(v, 0) + 1
+                if a >= th: mark(v)
+                else: ages[v] = a
+        m.orphan_age = ages
+
+    def _reseed(self):
+        g = self.m.graph
+        for ms in self.tracker.members.values():
+            if len(ms) != 1: continue
+            (v,) = ms; n = g.node(v)
+            if n["state"] != "A" or n["parents_count"] <= 0: continue
+            n["parents_count"] = 0; n["prior_state"] = "Unknown"
+            g.mark_dirty(v); self.tracker.reseeded(v)
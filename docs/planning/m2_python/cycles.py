@@ -0,0 +1,123 @@
+# docs/planning/m2_python/cycles.py  (reference only; periodic-state detection for GraphUnfoldingMachine)
+#
+#   machine = GraphUnfoldingMachine(g, ..., cycle_history=64); machine.run()
+#   machine.stop_reason, machine.cycle_period   # "cycle_detected", 2  (a blinker)
+#
+# Everything the next step depends on, at a step boundary, is: per node id its state, prior_state,
+# parents_count, rule_index (continuable only), marked_deleted flag and neighbor ids (saved_* fields and
+# marked_new are refreshed from these by the next snapshot), the machine's orphan_age, plus the RNG. So
+# when that state hashes equal to the state k steps earlier, the run has entered a cycle of period k
+# (k = 1: fixed point) and every further step only repeats it. Runs whose steps consume the RNG (random nearest tie-breaking)
+# are never reported. Hashes are 64-bit, so a false match is negligible but not impossible.
+#
+# Hashes do not depend on PYTHONHASHSEED (state names and the CA arrays go through blake2b), so the
+# history can be saved in a checkpoint and a resumed run (another process) still matches against it.
+
+import hashlib
+from collections import deque
+
+from python_implementation import OperationKind, TranscriptionWay
+
+_MASK = (1 << 64) - 1
+_NAME_CODES = {}  # state name -> stable 64-bit code
+
+def _digest(*parts) -> int:
+    h = hashlib.blake2b(digest_size=8)
+    for p in parts: h.update(p)
+    return int.from_bytes(h.digest(), "little")
+
+def _name_code(name):
+    c = _NAME_CODES.get(name)
+    if c is None: c = _NAME_CODES[name] = _digest(str(name).encode())
+    return c
+
+def uses_rng(machine) -> bool:
+    return (machine.nearest_tie_breaker == "random" and not machine.nearest_connect_all
+            and any(r.is_enabled and r.operation.kind == OperationKind.TryToConnectWithNearest for r in machine.change_table))
+
+class GraphStateHash:
+    """
+    Order-independent hash of the per-node step state: the sum (mod 2^64) of one hash per node, so a
+    step only rehashes the nodes it touched. An edge change touches both endpoints, which covers the
+    topology.
+    """
+    def __init__(self, machine):
+        self.g = machine.graph; self.continuable = machine.transcription == TranscriptionWay.continuable
+        self._h = {}; self.value = 0
+        self.update(self.g.node_ids())
+
+    def _node_hash(self, nid):
+        n = self.g.node(nid)
+        return hash((nid, _name_code(n["state"]), _name_code(n["prior_state"]), n["parents_count"],
+                     n["rule_index"] if self.continuable else 0, n["marked_deleted"], tuple(self.g.sorted_neighbors(nid))))
+
+    def update(self, ids):
+        h = self._h; v = self.value
+        for nid in ids:
+            old = h.pop(nid, None)
+            if old is not None: v -= old
+            if self.g.has_node(nid):
+                new = h[nid] = self._node_hash(nid); v += new
+        self.value = v & _MASK
+
+class CycleDetector:
+    """
+    Bounded history of step-state hashes. observe() after each step returns the period k when the
+    current state equals the one k <= history steps earlier, else None.
+
+    Scalar steps rehash the nodes touched in this step (the graph's pending refresh set), the ones
+    touched in the previous step (their prior_state moved now) and the ones a rule fired on
+    (rule_index, marked_deleted) or the component passes deleted. Vectorized CA steps hash the stepper's state/prior/rule_index arrays.
+
+    `saved` is an export_state() taken by a checkpoint between two steps, before that step was observed:
+    the history is restored and the current step observed now, so a resumed run stops where the
+    uninterrupted one does. Per-node hashes are rebuilt from the graph. A history saved by the other
+    kind of stepper (scalar vs vectorized) hashes different things and is dropped.
+    """
+    def __init__(self, machine, stepper, history, saved=None):
+        self.machine = machine; self.stepper = stepper
+        self.history = deque(maxlen=int(history)); self._last = {}  # hash -> latest step with it
+        self.period = None
+        if stepper is None:
+            self._state = GraphStateHash(machine); self._prev_dirty = set(machine.graph.pending_ids())
+            machine._fired = []
+        else:  # the stepper's codes index its own name list, which depends on the graph it started from
+            import numpy as np
+            self._codes = np.array([_name_code(name) for name in stepper.names], dtype=np.uint64)
+        if saved is not None and saved["vectorized"] == (stepper is not None):
+            for h, step in saved["history"]: self._remember(h, step)
+            self.observe(machine.passed_steps)
+        else:
+            self._remember(self._current(), machine.passed_steps)
+
+    def export_state(self) -> dict:
+        return {"vectorized": self.stepper is not None, "history": [[h, step] for h, step in self.history]}
+
+    def close(self):
+        self.machine._fired = None
+
+    def _current(self):
+        st = self.stepper
+        if st is not None:
+            codes = self._codes
+            return _digest(codes[st.state].tobytes(), codes[st.prior].tobytes(), st.rule_index.tobytes() if st.continuable else b"")
+        m = self.machine; dirty = set(m.graph.pending_ids())
+        self._state.update(dirty | self._prev_dirty | set(m._fired))
+        self._prev_dirty = dirty; m._fired.clear()
+        if m.orphan_age: return hash((self._state.value, frozenset(m.orphan_age.items())))
+        return self._state.value
+
+    def _remember(self, h, step):
+        if len(self.history) == self.history.maxlen:
+            old_h, old_step = self.history.popleft()
+            if self._last.get(old_h) == old_step: del self._last[old_h]
+        self.history.append((h, step)); self._last[h] = step
+
+    def observe(self, step):
+        h = self._current()
+        seen = self._last.get(h)
+        self._remember(h, step)
+        if seen is not None:
+            self.period = step - seen
+            return self.period
+        return None
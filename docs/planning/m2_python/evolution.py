@@ -0,0 +1,343 @@
+# docs/planning/m2_python/evolution.py  (reference only; Graph Evolution Lab: evolve rule tables on the Python engine)
+#
+#   python evolution.py ../../../data/genoms/quadmesh.yaml --fitness degree --param degree=4 --param target_nodes=100 \
+#          --population 64 --generations 50 --workers 8 --cache fitness.db --out best.yaml --log history.jsonl
+#
+#   lab = Evolution(load_genome("quadmesh.yaml"), fitness=("degree", {"degree": 4}), population=64, seed=1)
+#   for stats in lab.run(50): print(stats)   # {"generation": 0, "best": ..., "mean": ..., "evaluated": 41, "cache_hits": 23}
+#   lab.best_genome()                         # genome dict, ready for load_genome / machine_from_config
+#
+# An individual is a rule table (list of Rule); machine options and init_graph come from the base genome.
+# Each generation keeps the `elite` best tables, then fills the population with children of tournament
+# winners: one-point crossover of two parents' tables, then per-rule field mutation plus rule insertion,
+# deletion and swaps. Fitness functions take the machine after run() and return a float (FITNESS).
+#
+# Fitness is memoized under genome_key(): a hash of canonical_genome(), which drops disabled rules and
+# rules whose `current` state no node can ever hold, writes count bounds as the intervals they accept,
+# and keeps only the machine options that can affect the run, so equivalent tables share one entry.
+# FitnessCache is an in-memory LRU in front of an optional dbm file that outlives the process.
+
+import argparse
+import copy
+import dbm
+import hashlib
+import json
+import math
+import random
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from genome_loader import load_genome, machine_from_config, rule_to_config
+from python_implementation import (
+    Condition, Operation, OperationKind, Rule, TranscriptionWay, _int_bounds, _NO_BOUND, reachable_states,
+)
+
+# -- canonical form and key --
+
+def _bounds(ge, le, mode):
+    lo, hi = _int_bounds(ge, le, mode)
+    return [None if lo == -_NO_BOUND else lo, None if hi == _NO_BOUND else hi]
+
+def canonical_genome(cfg: dict) -> dict:
+    """
+    JSON-ready form of what determines a run of `cfg`: init graph in engine order, the rules that can
+    fire (as match intervals), and the machine options they can depend on.
+    """
+    m = machine_from_config(cfg)
+    g = m.graph; ids = g.node_ids(); pos = {nid: k for k, nid in enumerate(ids)}
+    nodes = [[n["state"], n["parents_count"], n["prior_state"], n["rule_index"]] for n in map(g.node, ids)]
+    edges = sorted(sorted((pos[a], pos[b])) for a, b in g.edges())
+    continuable = m.transcription == TranscriptionWay.continuable
+    rules = m.change_table
+    # continuable rule_index values set by the genome point into the full table: keep it whole then
+    if not (continuable and any(n[3] for n in nodes)):
+        reach = reachable_states((n[0] for n in nodes), rules)
+        rules = [r for r in rules if r.is_enabled and r.condition.current in reach]
+    table = []
+    for r in rules:
+        c = r.condition; op = r.operation
+        table.append([c.current, c.prior, c.conn_with_state, *_bounds(c.conn_ge, c.conn_le, m.count_compare),
+                      *_bounds(c.parents_ge, c.parents_le, m.count_compare), op.kind.value,
+                      None if op.kind == OperationKind.Die else op.operand, r.is_enabled])
+    kinds = {r.operation.kind for r in rules}
+    machine = {"transcription": m.transcription.value if len(rules) > 1 else None, "max_steps": m.max_steps,
+               "max_vertices": m.max_vertices, "cycle_history": m.cycle_history}
+    if kinds & {OperationKind.TryToConnectWith, OperationKind.TryToConnectWithNearest, OperationKind.DisconnectFrom}:
+        machine["topology_semantics"] = m.topology_semantics
+    if OperationKind.TryToConnectWithNearest in kinds:
+        pick = "all" if m.nearest_connect_all else "random" if m.nearest_tie_breaker == "random" else "min_id"
+        machine["nearest"] = [m.nearest_max_depth, pick]
+        if pick == "random": machine["rng_seed"] = (cfg.get("machine") or {}).get("rng_seed")
+    oc = m.orphan_cleanup or {}
+    if m.maintain_single_component: machine["components"] = "single"
+    elif oc.get("enabled"): machine["components"] = ["orphans", {k: (oc.get("thresholds") or {}).get(k) for k in ("size1", "size2", "others")}]
+    elif m.reseed_isolated_A: machine["components"] = "reseed"
+    return {"machine": machine, "nodes": nodes, "edges": edges, "rules": table}
+
+def genome_key(cfg: dict, salt="") -> str:
+    """Content hash of canonical_genome(cfg); `salt` separates e.g. different fitness functions."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(canonical_genome(cfg), sort_keys=True, separators=(",", ":")).encode())
+    h.update(str(salt).encode())
+    return h.hexdigest()
+
+# -- fitness --
+
+def degree_fitness(machine, degree=4, target_nodes=100) -> float:
+    """Share of nodes with exactly `degree` neighbors, scaled down while the graph is smaller than target_nodes."""
+    g = machine.graph; n = g.node_count()
+    if not n: return 0.0
+    hits = sum(1 for nid in g.node_ids() if len(g.sorted_neighbors(nid)) == degree)
+    return hits / n * min(1.0, n / target_nodes)
+
+def size_fitness(machine, target_nodes=100) -> float:
+    """1 at exactly target_nodes nodes, falling off with the relative distance."""
+    n = machine.graph.node_count()
+    return 1.0 - abs(n - target_nodes) / max(n, target_nodes, 1)
+
+FITNESS = {"degree": degree_fitness, "size": size_fitness}
+
+def evaluate(cfg: dict, fitness) -> float:
+    """Runs one genome and scores it; fitness = (name in FITNESS, params dict). A failing run scores -inf."""
+    name, params = fitness
+    try:
+        m = machine_from_config(cfg)
+        if m.max_steps < 0: raise ValueError("unbounded run (max_steps < 0)")
+        m.run()
+        return float(FITNESS[name](m, **params))
+    except Exception:
+        return -math.inf
+
+def _evaluate_task(args):
+    return evaluate(*args)
+
+class FitnessCache:
+    """
+    key -> fitness. An LRU of `capacity` entries in memory; with `path`, misses fall through to a dbm
+    file and every put() is written there too, so later runs (and other processes opening the same
+    file after this one) reuse it.
+    """
+    def __init__(self, path=None, capacity=100_000):
+        self.capacity = capacity; self._lru = OrderedDict()
+        self._db = dbm.open(str(path), "c") if path is not None else None
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        v = self._lru.get(key)
+        if v is None and self._db is not None:
+            raw = self._db.get(key)
+            if raw is not None: v = float(raw); self._remember(key, v)
+        if v is None: self.misses += 1; return None
+        self._lru.move_to_end(key); self.hits += 1
+        return v
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self._db is not None: self._db[key] = repr(float(value))
+
+    def _remember(self, key, value):
+        self._lru[key] = value; self._lru.move_to_end(key)
+        if len(self._lru) > self.capacity: self._lru.popitem(last=False)
+
+    def close(self):
+        if self._db is not None: self._db.close(); self._db = None
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+# -- variation and selection --
+
+_KINDS = list(OperationKind)
+_BOUND_MAX = 8
+
+def clone_rule(r: Rule) -> Rule:
+    c = r.condition
+    out = Rule(Condition(c.current, c.prior, c.conn_ge, c.conn_le, c.parents_ge, c.parents_le, c.conn_with_state),
+               Operation(r.operation.kind, r.operation.operand))
+    out.is_enabled = r.is_enabled
+    return out
+
+def random_rule(rng, states) -> Rule:
+    rule = Rule(Condition(rng.choice(states), rng.choice(["any", *states]), -1, -1, -1, -1),
+                Operation(rng.choice(_KINDS), rng.choice(states)))
+    for _ in range(2): _mutate_field(rule, rng, states, bounds_only=True)
+    return rule
+
+def _mutate_field(r: Rule, rng, states, bounds_only=False):
+    c = r.condition
+    field = rng.choice(("conn_ge", "conn_le", "parents_ge", "parents_le") if bounds_only else
+                       ("current", "prior", "conn_with_state", "conn_ge", "conn_le", "parents_ge", "parents_le",
+                        "kind", "operand", "enabled"))
+    if field == "current": c.current = rng.choice(states)
+    elif field == "prior": c.prior = rng.choice(["any", *states])
+    elif field == "conn_with_state": c.conn_with_state = rng.choice(["any", *states])
+    elif field == "kind": r.operation = Operation(rng.choice(_KINDS), r.operation.operand)
+    elif field == "operand": r.operation.operand = rng.choice(states)
+    elif field == "enabled": r.is_enabled = not r.is_enabled
+    else:
+        v = getattr(c, field)
+        v = -1 if rng.random() < 0.2 else max(-1, min(_BOUND_MAX, (v if v >= 0 else rng.randint(0, 3)) + rng.choice((-1, 1))))
+        setattr(c, field, v)
+
+def mutate(rules, rng, states, rate=0.1, structural=0.1, max_rules=64) -> list:
+    """Copy of `rules` with each rule's fields mutated with probability `rate`, plus an insert/delete/swap with probability `structural` each."""
+    out = [clone_rule(r) for r in rules]
+    for r in out:
+        if rng.random() < rate: _mutate_field(r, rng, states)
+    if rng.random() < structural and len(out) < max_rules: out.insert(rng.randint(0, len(out)), random_rule(rng, states))
+    if rng.random() < structural and len(out) > 1: del out[rng.randrange(len(out))]
+    if rng.random() < structural and len(out) > 1:
+        i, j = rng.randrange(len(out)), rng.randrange(len(out)); out[i], out[j] = out[j], out[i]
+    return out
+
+def crossover(a, b, rng) -> list:
+    """
+    One-point crossover: a prefix of `a` followed by a suffix of `b` (rule order is part of the genome).
+    Not empty unless both are: an empty prefix takes at least the last rule of `b`, and vice versa.
+    """
+    i = rng.randint(0, len(a)); j = rng.randint(0, len(b) - 1 if i == 0 and b else len(b))
+    if i == 0 and j == len(b): i = len(a)  # b is empty
+    return [clone_rule(r) for r in a[:i] + b[j:]]
+
+def tournament(population, scores, rng, k=3):
+    """The best of k individuals drawn with replacement."""
+    best = max((rng.randrange(len(population)) for _ in range(k)), key=scores.__getitem__)
+    return population[best]
+
+# -- driver --
+
+class Evolution:
+    """
+    Generational GA over the rule table of `base` (a genome dict). fitness = (name in FITNESS, params).
+    max_steps/max_vertices override the base genome's limits for every evaluation. States for mutation
+    default to every state the base genome mentions.
+    """
+    def __init__(self, base: dict, fitness, *, population=32, elite=2, tournament_size=3, crossover_rate=0.7,
+                 mutation_rate=0.1, structural_rate=0.1, max_rules=64, seed=None, workers=1, cache=None,
+                 max_steps=None, max_vertices=None, states=None):
+        self.base = copy.deepcopy(base); mb = self.base.setdefault("machine", {})
+        if max_steps is not None: mb["max_steps"] = max_steps
+        if max_vertices is not None: mb["max_vertices"] = max_vertices
+        meta = self.base.get("meta")
+        if isinstance(meta, dict): meta.pop("activity_scheme", None)  # already applied to the seed table
+        self.base.pop("activity_scheme", None)
+        seed_rules = machine_from_config(base).change_table
+        self.fitness = (fitness[0], dict(fitness[1] or {}))
+        if self.fitness[0] not in FITNESS: raise ValueError(f"unknown fitness {self.fitness[0]!r} (known: {', '.join(FITNESS)})")
+        self.salt = json.dumps(self.fitness, sort_keys=True)
+        self.size = int(population); self.elite = int(elite); self.tournament_size = int(tournament_size)
+        self.crossover_rate = crossover_rate; self.mutation_rate = mutation_rate; self.structural_rate = structural_rate
+        self.max_rules = max_rules; self.rng = random.Random(seed); self.workers = workers
+        self.cache = cache if cache is not None else FitnessCache()
+        self.states = sorted(states or self._genome_states(seed_rules))
+        self.population = [seed_rules] + [self._mutant(seed_rules) for _ in range(self.size - 1)]
+        self.scores = None; self.generation = 0
+        self.best = (-math.inf, seed_rules)
+
+    def _genome_states(self, rules):
+        found = {str((self.base.get("machine") or {}).get("start_state", "A"))}
+        for n in (self.base.get("init_graph") or {}).get("nodes") or []:
+            s = n.get("state") if isinstance(n, dict) else n
+            if isinstance(s, str) and s != "-": found.add(s)
+        for r in rules:
+            c = r.condition
+            found.update(s for s in (c.current, c.prior, c.conn_with_state, r.operation.operand) if s not in (None, "any", "Unknown"))
+        return found
+
+    def _mutant(self, rules):
+        return mutate(rules, self.rng, self.states, self.mutation_rate, self.structural_rate, self.max_rules)
+
+    def genome(self, rules) -> dict:
+        return {**self.base, "rules": [rule_to_config(r) for r in rules]}
+
+    def best_genome(self) -> dict:
+        return self.genome(self.best[1])
+
+    def _score(self, pool, population):
+        """Fitness per individual; only genomes whose key is neither cached nor already queued are run."""
+        genomes = [self.genome(rules) for rules in population]
+        keys = [genome_key(cfg, self.salt) for cfg in genomes]
+        scores = {}; todo = {}
+        for key, cfg in zip(keys, genomes):
+            if key in scores or key in todo: continue
+            v = self.cache.get(key)
+            if v is None: todo[key] = cfg
+            else: scores[key] = v
+        tasks = [(cfg, self.fitness) for cfg in todo.values()]
+        results = pool.map(_evaluate_task, tasks, chunksize=max(1, len(tasks) // (4 * self.workers))) if pool else map(_evaluate_task, tasks)
+        for key, v in zip(todo, results):
+            scores[key] = v; self.cache.put(key, v)
+        return [scores[k] for k in keys], len(todo)
+
+    def step(self, pool=None) -> dict:
+        """Scores the current population, records its stats and breeds the next one."""
+        hits0 = self.cache.hits
+        scores, evaluated = self._score(pool, self.population)
+        order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        if scores[order[0]] > self.best[0]: self.best = (scores[order[0]], self.population[order[0]])
+        finite = [s for s in scores if s > -math.inf]
+        stats = {"generation": self.generation, "best": scores[order[0]], "mean": sum(finite) / len(finite) if finite else None,
+                 "evaluated": evaluated, "cache_hits": self.cache.hits - hits0, "best_ever": self.best[0],
+                 "rules": len(self.population[order[0]])}
+        nxt = [self.population[i] for i in order[:self.elite]]
+        while len(nxt) < self.size:
+            a = tournament(self.population, scores, self.rng, self.tournament_size)
+            if self.rng.random() < self.crossover_rate:
+                b = tournament(self.population, scores, self.rng, self.tournament_size)
+                a = crossover(a, b, self.rng)
+            nxt.append(self._mutant(a))
+        self.population = nxt; self.scores = scores; self.generation += 1
+        return stats
+
+    def run(self, generations):
+        """Yields the stats of each generation; processes are only started when workers > 1."""
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for _ in range(generations): yield self.step(pool)
+        else:
+            for _ in range(generations): yield self.step()
+
+def _param(text):
+    k, _, v = text.partition("=")
+    try: return k, json.loads(v)
+    except ValueError: return k, v
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Evolve the rule table of a genome on the Python engine.")
+    ap.add_argument("genome", help="base genome .yaml (machine options, init_graph and the seed rule table)")
+    ap.add_argument("--fitness", default="degree", choices=sorted(FITNESS))
+    ap.add_argument("--param", action="append", default=[], type=_param, help="fitness parameter, e.g. degree=4 (repeatable)")
+    ap.add_argument("--population", type=int, default=32)
+    ap.add_argument("--generations", type=int, default=20)
+    ap.add_argument("--elite", type=int, default=2)
+    ap.add_argument("--tournament", type=int, default=3)
+    ap.add_argument("--mutation-rate", type=float, default=0.1)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--max-steps", type=int, default=None)
+    ap.add_argument("--max-vertices", type=int, default=None)
+    ap.add_argument("--cache", default=None, help="on-disk fitness cache (dbm), shared across runs")
+    ap.add_argument("--log", default=None, help="per-generation stats JSONL")
+    ap.add_argument("--out", default=None, help="best genome as YAML")
+    args = ap.parse_args(argv)
+
+    with FitnessCache(args.cache) as cache:
+        lab = Evolution(load_genome(args.genome), (args.fitness, dict(args.param)), population=args.population,
+                        elite=args.elite, tournament_size=args.tournament, mutation_rate=args.mutation_rate, seed=args.seed,
+                        workers=args.workers, cache=cache, max_steps=args.max_steps, max_vertices=args.max_vertices)
+        log = open(args.log, "w", encoding="utf-8") if args.log else None
+        try:
+            for stats in lab.run(args.generations):
+                print(json.dumps(stats), file=sys.stderr)
+                if log: log.write(json.dumps(stats) + "\n"); log.flush()
+        finally:
+            if log: log.close()
+    if args.out:
+        import yaml  # optional dependency, only needed for YAML files
+        with open(args.out, "w", encoding="utf-8") as f:
+            yaml.safe_dump(lab.best_genome(), f, sort_keys=False, allow_unicode=True)
+    print(json.dumps({"best": lab.best[0], "cache_hits": cache.hits, "cache_misses": cache.misses}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
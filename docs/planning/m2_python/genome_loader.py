@@ -0,0 +1,223 @@
+# docs/planning/m2_python/genome_loader.py  (reference only; YAML genome -> GraphUnfoldingMachine, mirrors src/genomeLoader.ts)
+
+import functools
+import hashlib
+import os
+import re
+from pathlib import Path
+
+from python_implementation import (
+    Condition, GraphUnfoldingMachine, GUMGraph, Operation, Rule,
+)
+
+_LEGACY_KINDS = {"DisconectFrom": "DisconnectFrom"}
+
+# Fast path for big init graphs: a flow-style `nodes: [A, B, ...]` list of state letters and a block
+# `edges:` list of `- [a, b]` lines are read with regexes; YAML only parses what is left. Anything the
+# regexes are not sure about (quoted or long-form nodes, comments inside the edge block, ...) falls
+# back to a full YAML parse, so the result always equals yaml.safe_load.
+_INIT_GRAPH = re.compile(r"^init_graph:[ \t]*(?:#[^\n]*)?$", re.M)
+_TOP_LEVEL = re.compile(r"^[^\s#]", re.M)
+_FLOW_NODES = re.compile(r"^([ \t]+)nodes:[ \t]*\[([^\]]*)\]", re.M)
+_NODE_TOKEN = re.compile(r"[A-Za-z]|Unknown|-")
+_INT = r"-?(?:0|[1-9][0-9]*)"  # no leading zeros: YAML 1.1 reads 010 as octal
+_EDGE_LINE = rf"[ \t]*-[ \t]*\[[ \t]*{_INT}[ \t]*,[ \t]*{_INT}[ \t]*\][ \t]*(?:#[^\n\[]*)?(?:\n|$)"
+_BLOCK_EDGES = re.compile(rf"^([ \t]+)edges:[ \t]*\n((?:{_EDGE_LINE})+)", re.M)
+_EDGE_PAIR = re.compile(rf"\[[ \t]*({_INT})[ \t]*,[ \t]*({_INT})[ \t]*\]")
+
+def _yaml_loader():
+    import yaml  # optional dependency, only needed for YAML files
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def _fast_parse(text: str):
+    """yaml.safe_load(text) via the init_graph fast path, or None when the fast path does not apply."""
+    import yaml
+    m = _INIT_GRAPH.search(text)
+    if m is None: return None
+    end = _TOP_LEVEL.search(text, m.end() + 1)
+    block_start, block_end = m.end(), (end.start() if end else len(text))
+    block = text[block_start:block_end]
+    nodes = edges = None
+    nm = _FLOW_NODES.search(block)
+    if nm:
+        tokens = re.sub(r"#[^\n]*", "", nm.group(2)).split(",")
+        if tokens and not tokens[-1].strip(): tokens.pop()  # trailing comma
+        nodes = [t.strip() for t in tokens]
+        if not all(_NODE_TOKEN.fullmatch(t) for t in nodes): return None
+        block = block[:nm.start()] + nm.group(1) + "nodes: []" + block[nm.end():]
+    em = _BLOCK_EDGES.search(block)
+    if em:
+        rest = re.sub(r"^[ \t]*(?:#[^\n]*)?\n", "", block[em.end():], flags=re.M).lstrip(" \t")
+        if rest.startswith("-"): return None  # block list continues with entries the regex did not take
+        edges = [[int(a), int(b)] for a, b in _EDGE_PAIR.findall(em.group(2))]
+        block = block[:em.start()] + em.group(1) + "edges: []\n" + block[em.end():]
+    if nodes is None and edges is None: return None
+    try:
+        cfg = yaml.load(text[:block_start] + block + text[block_end:], Loader=_yaml_loader()) or {}
+    except yaml.YAMLError:
+        return None
+    ig = cfg.get("init_graph") if isinstance(cfg, dict) else None
+    if not isinstance(ig, dict): return None
+    for key, value in (("nodes", nodes), ("edges", edges)):
+        if value is not None:
+            if ig.get(key) != []: return None
+            ig[key] = value
+    return cfg
+
+def parse_genome(text: str) -> dict:
+    cfg = _fast_parse(text)
+    if cfg is None:
+        import yaml
+        cfg = yaml.load(text, Loader=_yaml_loader())
+    return cfg or {}
+
+def load_genome(path, *, cache_dir=None) -> dict:
+    """Genome dict from a YAML (or .gumb) file; with cache_dir, a content-hash .gumb cache skips YAML parsing."""
+    if cache_dir is not None or str(path).endswith(".gumb"):
+        b = open_genome_binary(path, cache_dir)
+        if b is not None: return b.to_config()
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_genome(f.read())
+
+_CACHE_TAG = "g1"  # bump when parsing or the .gumb layout changes meaning
+
+def cached_binary_path(path, cache_dir) -> Path:
+    """<cache_dir>/<content hash>.<tag>.gumb for the genome file at `path`."""
+    with open(path, "rb") as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    return Path(cache_dir) / f"{digest}.{_CACHE_TAG}.gumb"
+
+@functools.lru_cache(maxsize=64)
+def _open_binary(gumb_path: str):
+    from gum_binary import GumBinary
+    return GumBinary(gumb_path)
+
+def open_genome_binary(path, cache_dir=None):
+    """
+    GumBinary for a genome file: .gumb files are opened directly; YAML files are parsed once and stored
+    under cache_dir keyed by content hash, then memory-mapped on later calls (in any process). Opened
+    files are memoized per process. Returns None when NumPy is missing or the genome is not
+    JSON-representable, so callers fall back to the YAML path.
+    """
+    try:
+        import gum_binary
+    except ImportError:  # NumPy not installed
+        return None
+    if str(path).endswith(".gumb"): return _open_binary(str(path))
+    if cache_dir is None: return None
+    target = cached_binary_path(path, cache_dir)
+    if not target.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = parse_genome(f.read())
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            gum_binary.genome_to_binary(cfg, tmp)
+        except ValueError:
+            tmp.unlink(missing_ok=True); return None
+        os.replace(tmp, target)  # atomic: concurrent workers may race to fill the same entry
+    return _open_binary(str(target))
+
+def parse_activity_scheme(s) -> set:
+    """"4x9x18xx" => skip 4 inactive, 1 active, skip 9, 1 active, skip 18, 2 active; returns active rule indices."""
+    active = set(); idx = 0
+    for t in re.findall(r"\d+|x", re.sub(r"\s+", "", str(s or ""))):
+        if t == "x": active.add(idx); idx += 1
+        else: idx += int(t)
+    return active
+
+def _first(d, *keys, default=None):
+    for k in keys:
+        if d.get(k) is not None: return d[k]
+    return default
+
+def rule_from_config(r: dict) -> Rule:
+    c = r.get("condition") or {}
+    o = _first(r, "op", "operation", default={})
+    cond = Condition(
+        _first(c, "current", default="Unknown"), _first(c, "prior", default="any"),
+        _first(c, "conn_ge", "allConnectionsCount_GE", default=-1), _first(c, "conn_le", "allConnectionsCount_LE", default=-1),
+        _first(c, "parents_ge", "parentsCount_GE", default=-1), _first(c, "parents_le", "parentsCount_LE", default=-1),
+        _first(c, "conn_with_state", default="any"),
+    )
+    kind = str(o.get("kind"))
+    rule = Rule(cond, Operation(_LEGACY_KINDS.get(kind, kind), o.get("operand")))
+    enabled = _first(r, "enabled", "is_enabled", "isEnabled")
+    rule.is_enabled = enabled if isinstance(enabled, bool) else True
+    return rule
+
+def rule_to_config(r: Rule) -> dict:
+    """Inverse of rule_from_config, in the YAML genome's field names."""
+    c = r.condition
+    return {"condition": {"current": c.current, "prior": c.prior, "conn_ge": c.conn_ge, "conn_le": c.conn_le,
+                          "parents_ge": c.parents_ge, "parents_le": c.parents_le, "conn_with_state": c.conn_with_state},
+            "op": {"kind": r.operation.kind.value, "operand": r.operation.operand}, "enabled": r.is_enabled}
+
+def rules_from_config(cfg: dict) -> list:
+    raw = list(cfg.get("rules") or [])
+    scheme = (cfg.get("meta") or {}).get("activity_scheme", cfg.get("activity_scheme"))
+    if scheme:
+        active = parse_activity_scheme(scheme)
+        kept = [r for i, r in enumerate(raw) if i in active]
+        if kept: raw = kept
+    return [rule_from_config(r) for r in raw]
+
+def graph_from_config(cfg: dict, graph=None):
+    """
+    Seeds init_graph into `graph` (GUMGraph by default). Genome ids (explicit `id`, or 1..N for the
+    short form) are added in ascending order, so engine ids keep the same relative order; returns
+    (graph, {genome_id: engine_id}). Short-form '-' entries are holes (generate_graphs.py quad meshes):
+    the id is used but holds no node, and edges to it are dropped, as in gum_binary.graph_from_binary.
+    """
+    g = graph if graph is not None else GUMGraph()
+    m = cfg.get("machine") or {}
+    start = str(m.get("start_state", "A"))
+    ig = cfg.get("init_graph") or {}
+    rows = []
+    for i, n in enumerate(ig.get("nodes") or []):
+        if isinstance(n, dict):
+            rows.append((int(_first(n, "id", default=i + 1)), n))
+        elif n != "-":
+            rows.append((i + 1, {"state": n}))
+    ids = {}
+    for gid, n in sorted(rows, key=lambda t: t[0]):
+        nid = g.add_vertex(str(_first(n, "state", default=start)), parents_count=int(n.get("parents_count") or 0), mark_new=True)
+        node = g.node(nid)
+        if n.get("rule_index") is not None: node["rule_index"] = int(n["rule_index"])
+        if n.get("prior_state") is not None: node["prior_state"] = str(n["prior_state"])
+        ids[gid] = nid
+    for e in ig.get("edges") or []:
+        if isinstance(e, dict): a, b = e.get("source"), e.get("target")
+        else: a, b = e[0], e[1]
+        if a in ids and b in ids: g.add_edge(ids[a], ids[b])
+    return g, ids
+
+def load_machine(path, *, cache_dir=None, graph=None, **overrides) -> GraphUnfoldingMachine:
+    """machine_from_config for a genome file; .gumb files and cache hits bulk-load the init graph from the memmap."""
+    b = open_genome_binary(path, cache_dir)
+    if b is not None:
+        from gum_binary import machine_from_binary
+        return machine_from_binary(b, graph=graph, **overrides)
+    return machine_from_config(load_genome(path), graph=graph, **overrides)
+
+def machine_from_config(cfg: dict, *, graph=None, **overrides) -> GraphUnfoldingMachine:
+    """Builds a ready-to-run machine; `overrides` replace GraphUnfoldingMachine keyword args (e.g. max_steps)."""
+    m = cfg.get("machine") or {}
+    ns = m.get("nearest_search") or {}
+    g, _ = graph_from_config(cfg, graph)
+    kw = dict(
+        start_state=str(m.get("start_state", "A")),
+        transcription=m.get("transcription", "resettable"), count_compare=m.get("count_compare", "range"),
+        max_vertices=int(m.get("max_vertices", 2000)), max_steps=int(m.get("max_steps", 120)),
+        nearest_max_depth=int(ns.get("max_depth", 2)), nearest_tie_breaker=str(ns.get("tie_breaker", "stable")),
+        nearest_connect_all=bool(ns.get("connect_all", False)), rng_seed=m.get("rng_seed"),
+        topology_semantics=str(m.get("topology_semantics", "snapshot")), cycle_history=int(m.get("cycle_history", 0)),
+        prune_rules=bool(m.get("prune_rules", False)),
+        # TS loader defaults (src/genomeLoader.ts)
+        maintain_single_component=bool(m.get("maintain_single_component", True)),
+        orphan_cleanup=m.get("orphan_cleanup") or {"enabled": False}, reseed_isolated_A=bool(m.get("reseed_isolated_A", True)),
+    )
+    kw.update({k: v for k, v in overrides.items() if v is not None})
+    machine = GraphUnfoldingMachine(g, **kw)
+    machine.change_table = rules_from_config(cfg)
+    return machine
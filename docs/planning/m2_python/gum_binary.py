@@ -0,0 +1,200 @@
+# docs/planning/m2_python/gum_binary.py  (reference only; binary genome/substrate container, .gumb)
+#
+#   python gum_binary.py ../../../data/genoms/conways_game_of_life_torus.yaml torus.gumb   # YAML -> binary
+#   python gum_binary.py torus.gumb torus.yaml                                             # binary -> YAML
+#
+# Layout (little-endian):
+#   header   64 bytes: magic "GUMB", version u16, flags u16, n_nodes u64, n_edges u64, meta_len u64,
+#            states_off u64, edges_off u64, meta_off u64, zero padding
+#   states   n_nodes bytes: init_graph node i (genome id i+1) as a NodeState byte code, HOLE for '-'
+#   edges    n_edges * 2 int32 (8-byte aligned): [a, b] pairs of genome ids, file order
+#   meta     UTF-8 JSON: the rest of the genome (machine, rules, ...). init_graph.nodes / .edges are the
+#            placeholders "@states" / "@edges" when they live in the arrays above; lists that would not
+#            round-trip exactly (long-form nodes, {source, target} edges, state aliases) stay in the JSON.
+
+import json
+import struct
+import sys
+
+import numpy as np
+
+from compact_graph import STATE_CODES, encode_state
+
+MAGIC = b"GUMB"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHQQQQQQ")
+HEADER_SIZE = 64
+HOLE = 255  # '-' cell in generated substrates: the id exists but holds no node
+STATES_REF, EDGES_REF = "@states", "@edges"
+_CHUNK = 1 << 16
+
+_NAMES = [None] * 256  # byte code -> state name
+for _name, _code in STATE_CODES.items(): _NAMES[_code] = _name
+_NAMES[HOLE] = "-"
+
+def _align(n, k=8): return (n + k - 1) // k * k
+
+def _compact_states(nodes):
+    """Byte codes for a short-form node list, or None when some entry would not decode back unchanged."""
+    codes = bytearray(len(nodes))
+    for i, s in enumerate(nodes):
+        if s == "-": codes[i] = HOLE; continue
+        if not isinstance(s, str) or s not in STATE_CODES: return None
+        codes[i] = STATE_CODES[s]
+    return bytes(codes)
+
+def _compact_edges(edges):
+    for e in edges:
+        if not (isinstance(e, list) and len(e) == 2 and all(type(v) is int and -2**31 <= v < 2**31 for v in e)):
+            return False
+    return True
+
+def write_binary(path, states, edges, meta: dict) -> None:
+    """
+    Low-level writer. states: state names ('-' = hole) or a bytes-like of codes; edges: an (E, 2) int
+    array or any iterable of (a, b) genome ids, consumed in chunks; meta: JSON-serializable dict.
+    """
+    codes = bytes(states) if isinstance(states, (bytes, bytearray, memoryview, np.ndarray)) else \
+        bytes(HOLE if s == "-" else encode_state(s) for s in states)
+    blob = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    states_off = HEADER_SIZE; edges_off = _align(states_off + len(codes))
+    with open(path, "wb") as f:
+        f.write(bytes(HEADER_SIZE)); f.write(codes); f.write(bytes(edges_off - states_off - len(codes)))
+        n_edges = 0
+        if isinstance(edges, np.ndarray):
+            arr = np.ascontiguousarray(edges, dtype="<i4").reshape(-1, 2); arr.tofile(f); n_edges = len(arr)
+        else:
+            it = iter(edges)
+            while True:
+                chunk = np.fromiter((v for _, e in zip(range(_CHUNK), it) for v in e), dtype="<i4")
+                if not chunk.size: break
+                chunk.tofile(f); n_edges += chunk.size // 2
+        meta_off = edges_off + 8 * n_edges
+        f.write(blob)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(codes), n_edges, len(blob), states_off, edges_off, meta_off))
+
+class GumBinary:
+    """
+    An opened .gumb file. states / edges are read-only views into one numpy.memmap of the file, so
+    opening is O(1) in the graph size and nothing is parsed or copied until it is used.
+    """
+    def __init__(self, path):
+        self.path = str(path)
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(self._mm) < HEADER_SIZE: raise ValueError(f"{path}: not a .gumb file (too short)")
+        magic, version, _flags, n, e, meta_len, s_off, e_off, m_off = _HEADER.unpack(self._mm[:_HEADER.size].tobytes())
+        if magic != MAGIC: raise ValueError(f"{path}: not a .gumb file (magic {magic!r})")
+        if version > VERSION: raise ValueError(f"{path}: .gumb version {version} is newer than supported ({VERSION})")
+        self.states = self._mm[s_off:s_off + n]
+        self.edges = self._mm[e_off:e_off + 8 * e].view("<i4").reshape(e, 2)
+        self.meta = json.loads(self._mm[m_off:m_off + meta_len].tobytes().decode("utf-8"))
+
+    def _init_graph(self):
+        ig = self.meta.get("init_graph")
+        return ig if isinstance(ig, dict) else {}
+
+    def state_names(self) -> list:
+        return [_NAMES[c] for c in self.states.tolist()]
+
+    def to_config(self) -> dict:
+        """The genome dict the file was written from (placeholders expanded back into lists)."""
+        cfg = json.loads(json.dumps(self.meta))
+        ig = cfg.get("init_graph")
+        if isinstance(ig, dict):
+            if ig.get("nodes") == STATES_REF: ig["nodes"] = self.state_names()
+            if ig.get("edges") == EDGES_REF: ig["edges"] = self.edges.tolist()
+        return cfg
+
+def genome_to_binary(cfg: dict, path) -> None:
+    """Lossless: binary_to_genome(path) == cfg for any JSON-representable genome dict."""
+    meta = json.loads(json.dumps(cfg))
+    if meta != cfg: raise ValueError("genome is not JSON-representable (non-string keys or non-JSON values)")
+    states, edges = b"", ()
+    ig = meta.get("init_graph")
+    if isinstance(ig, dict):
+        if isinstance(ig.get("nodes"), list):
+            codes = _compact_states(ig["nodes"])
+            if codes is not None: states = codes; ig["nodes"] = STATES_REF
+        if isinstance(ig.get("edges"), list) and _compact_edges(ig["edges"]):
+            edges = ig["edges"]; ig["edges"] = EDGES_REF
+    write_binary(path, states, edges, meta)
+
+def binary_to_genome(path) -> dict:
+    return GumBinary(path).to_config()
+
+def graph_from_binary(src, graph=None):
+    """
+    Seeds the init graph of a .gumb (path or GumBinary) into `graph` (GUMGraph by default) and returns
+    (graph, {genome_id: engine_id}), like genome_loader.graph_from_config. Short-form substrates are
+    bulk-loaded with graph.add_substrate straight from the memory-mapped arrays (holes skipped, edges to
+    missing ids dropped, duplicates collapsed); anything kept in the JSON goes through graph_from_config.
+    """
+    from genome_loader import graph_from_config
+    from python_implementation import GUMGraph
+    b = src if isinstance(src, GumBinary) else GumBinary(src)
+    g = graph if graph is not None else GUMGraph()
+    ig = b._init_graph()
+    if ig.get("nodes") != STATES_REF:
+        return graph_from_config(b.to_config(), g)
+    names = b.state_names()
+    keep = b.states != HOLE
+    gids = np.flatnonzero(keep) + 1
+    pos = np.full(len(names) + 2, -1, dtype=np.int64); pos[gids] = np.arange(len(gids))
+    pairs = np.empty((0, 2), dtype=np.int64)
+    if ig.get("edges") == EDGES_REF and len(b.edges):
+        e = b.edges.astype(np.int64)
+        e = e[((e >= 1) & (e <= len(names))).all(axis=1)]
+        pairs = pos[e]; pairs = pairs[(pairs >= 0).all(axis=1)]
+    new_ids = g.add_substrate([names[i - 1] for i in gids.tolist()], pairs.tolist())
+    ids = dict(zip(gids.tolist(), new_ids))
+    if ig.get("edges") not in (None, EDGES_REF):  # non-compact edge list kept in the JSON
+        for e in ig["edges"]:
+            a, c = (e.get("source"), e.get("target")) if isinstance(e, dict) else (e[0], e[1])
+            if a in ids and c in ids: g.add_edge(ids[a], ids[c])
+    return g, ids
+
+def machine_from_binary(src, *, graph=None, **overrides):
+    """genome_loader.machine_from_config for a .gumb: machine/rules from the JSON, init graph bulk-loaded."""
+    from genome_loader import machine_from_config
+    b = src if isinstance(src, GumBinary) else GumBinary(src)
+    g, _ = graph_from_binary(b, graph)
+    cfg = dict(b.meta); cfg.pop("init_graph", None)
+    return machine_from_config(cfg, graph=g, **overrides)
+
+def write_genome_yaml(cfg: dict, path) -> None:
+    """YAML writer for decoded genomes: flow-style node rows and one `- [a, b]` line per edge, like generate_graphs."""
+    import yaml  # optional dependency, only needed for YAML files
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        for key, value in cfg.items():
+            ig = value if key == "init_graph" and isinstance(value, dict) else None
+            big = ig is not None and (isinstance(ig.get("nodes"), list) or isinstance(ig.get("edges"), list))
+            if not big:
+                f.write(yaml.safe_dump({key: value}, sort_keys=False, allow_unicode=True)); continue
+            f.write("init_graph:\n")
+            for k, v in ig.items():
+                if k == "nodes" and isinstance(v, list) and _compact_states(v) is not None:
+                    f.write("  nodes: [\n")
+                    for i in range(0, len(v), 20):
+                        f.write("    " + ", ".join(v[i:i + 20]) + ("," if i + 20 < len(v) else "") + "\n")
+                    f.write("  ]\n")
+                elif k == "edges" and isinstance(v, list) and _compact_edges(v):
+                    f.write("  edges:\n" if v else "  edges: []\n")
+                    f.writelines(f"  - [{a}, {c}]\n" for a, c in v)
+                else:
+                    f.write("".join("  " + line + "\n" for line in yaml.safe_dump({k: v}, sort_keys=False, allow_unicode=True).splitlines()))
+
+def main(argv=None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="Convert genomes between YAML and the .gumb binary container (by file suffix).")
+    ap.add_argument("src"); ap.add_argument("dst")
+    args = ap.parse_args(argv)
+    if args.src.endswith(".gumb"):
+        write_genome_yaml(binary_to_genome(args.src), args.dst)
+    else:
+        from genome_loader import load_genome
+        genome_to_binary(load_genome(args.src), args.dst)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# docs/planning/m2_python/multiseed.py  (reference only; one genome, many rng_seed values)
+#
+#   python multiseed.py ../../../data/genoms/dumbbell.yaml --seeds 0-99 --workers 8 --out seeds.jsonl
+#
+#   genome = CompiledGenome.from_path("genome.yaml")
+#   records = run_seeds(genome, range(100), workers=8)
+#   summarize(records)   # {"seeds": 100, "nodes": {"mean": ..., "std": ..., "min": ..., "max": ...}, ...}
+#
+# The genome is parsed once into a picklable CompiledGenome (options, rule table, init graph as state
+# columns + position edges); each seed gets a fresh graph bulk-loaded from it. Workers receive the
+# compiled genome once through the pool initializer, so a task is just a list of seeds.
+# The rule table is compiled into one RuleIndex that every seed's machine binds to its own rule copies.
+# A genome whose run never draws from the RNG (no TryToConnectWithNearest with random tie-breaking, as
+# configured after the overrides) gives the same result for every seed: it is run once and that record
+# is reported for all seeds, flagged "shared". Per-seed runs diverge in topology after the first random pick, so seeds are not
+# interleaved into one array layout; each seed runs on its own graph (dict or compact backend).
+
+import copy
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from genome_loader import graph_from_config, load_genome, machine_from_config, rules_from_config
+from python_implementation import GUMGraph
+
+class CompiledGenome:
+    """A genome reduced to what building a machine needs; cheap to pickle and to instantiate per seed."""
+    def __init__(self, cfg: dict):
+        self.machine_cfg = {k: v for k, v in cfg.items() if k != "init_graph"}
+        self.rules = rules_from_config(cfg)  # prototypes, copied per machine (runs mutate rule flags)
+        g, _ = graph_from_config(cfg, GUMGraph())
+        ids = g.node_ids(); pos = {nid: k for k, nid in enumerate(ids)}
+        nodes = [g.node(nid) for nid in ids]
+        self.states = [n["state"] for n in nodes]
+        self.edges = [(pos[a], pos[b]) for a, b in g.edges()]
+        # long-form init nodes may carry non-default fields
+        self.extra = [(k, n["parents_count"], n["prior_state"], n["rule_index"]) for k, n in enumerate(nodes)
+                      if (n["parents_count"], n["prior_state"], n["rule_index"]) != (0, "Unknown", 0)]
+        self._indexes = {}; self._sensitive = {}
+        self._compiled(machine_from_config(self.machine_cfg, graph=self._graph("dict")))  # pickled to the workers
+        self.seed_sensitive = self.sensitive_to_seed()
+
+    def _compiled(self, m):
+        """(RuleIndex, RuleAnalysis) for machines compiled like `m`, built on the first seed that asks."""
+        key = (m.count_compare, m.transcription, m.prune_rules)
+        if key not in self._indexes:
+            m.change_table = self.rules; m.compiled_rules = None
+            self._indexes[key] = (m.compile_rules(), m.rule_analysis)
+        return self._indexes[key]
+
+    def sensitive_to_seed(self, **overrides) -> bool:
+        """Whether a run with these machine overrides draws from the RNG (e.g. nearest_tie_breaker="random")."""
+        key = repr(sorted(overrides.items()))
+        if key not in self._sensitive:
+            from cycles import uses_rng
+            probe = machine_from_config(self.machine_cfg, graph=GUMGraph(), **overrides); probe.change_table = self.rules
+            self._sensitive[key] = uses_rng(probe)
+        return self._sensitive[key]
+
+    @classmethod
+    def from_path(cls, path, *, cache_dir=None):
+        return cls(load_genome(path, cache_dir=cache_dir))
+
+    def _graph(self, backend):
+        if backend == "compact":
+            from compact_graph import CompactGUMGraph
+            g = CompactGUMGraph()
+        else:
+            g = GUMGraph()
+        ids = g.add_substrate(self.states, self.edges)
+        for k, parents, prior, rule_index in self.extra:
+            n = g.node(ids[k]); n["parents_count"] = parents; n["prior_state"] = prior; n["rule_index"] = rule_index
+        return g
+
+    def machine(self, seed, *, backend="dict", **overrides):
+        """Fresh GraphUnfoldingMachine for one seed; overrides as in genome_loader.machine_from_config."""
+        m = machine_from_config(self.machine_cfg, graph=self._graph(backend), rng_seed=seed, **overrides)
+        m.compiled_rules, m.rule_analysis = self._compiled(m)
+        m.change_table = [copy.copy(r) for r in self.rules]
+        return m
+
+def seed_stats(machine, seconds) -> dict:
+    g = machine.graph
+    rec = {"steps": machine.passed_steps, "stop_reason": machine.stop_reason, "nodes": g.node_count(),
+           "edges": g.edge_count(), "states": dict(Counter(n["state"] for n in g.nodes())),
+           "seconds": round(seconds, 6)}
+    if machine.cycle_period is not None: rec["cycle_period"] = machine.cycle_period
+    return rec
+
+def _run_one(genome, seed, backend, overrides):
+    t0 = time.perf_counter()
+    try:
+        m = genome.machine(seed, backend=backend, **overrides)
+        if m.max_steps < 0: raise ValueError("unbounded run (max_steps < 0); pass max_steps")
+        m.run()
+        return {"seed": seed, **seed_stats(m, time.perf_counter() - t0)}
+    except Exception as e:
+        return {"seed": seed, "error": f"{type(e).__name__}: {e}", "seconds": round(time.perf_counter() - t0, 6)}
+
+_worker_genome = None
+
+def _init_worker(genome):
+    global _worker_genome
+    _worker_genome = genome
+
+def _run_chunk(seeds, backend, overrides):
+    return [_run_one(_worker_genome, s, backend, overrides) for s in seeds]
+
+def run_seeds(genome, seeds, *, workers=1, backend="dict", chunk_size=None, **overrides) -> list:
+    """
+    Per-seed result records (in `seeds` order) for a CompiledGenome (or a genome dict / path).
+    overrides (max_steps, max_vertices, cycle_history, ...) apply to every seed.
+    """
+    if not isinstance(genome, CompiledGenome):
+        genome = CompiledGenome(genome) if isinstance(genome, dict) else CompiledGenome.from_path(genome)
+    seeds = list(seeds)
+    if not seeds: return []
+    if not genome.sensitive_to_seed(**overrides):
+        rec = _run_one(genome, seeds[0], backend, overrides)
+        return [{**rec, "seed": s, "shared": True} for s in seeds]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(seeds)))
+    if workers == 1:
+        return [_run_one(genome, s, backend, overrides) for s in seeds]
+    chunk_size = chunk_size or max(1, math.ceil(len(seeds) / (4 * workers)))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(genome,)) as pool:
+        return [rec for part in pool.map(_run_chunk, chunks, [backend] * len(chunks), [overrides] * len(chunks)) for rec in part]
+
+def summarize(records) -> dict:
+    """Spread of the per-seed results: mean/std/min/max of steps, nodes and edges, stop reasons, errors."""
+    ok = [r for r in records if "error" not in r]
+    out = {"seeds": len(records), "errors": len(records) - len(ok),
+           "stop_reasons": dict(Counter(r["stop_reason"] for r in ok))}
+    for key in ("steps", "nodes", "edges"):
+        vals = [r[key] for r in ok]
+        if not vals: continue
+        mean = sum(vals) / len(vals)
+        out[key] = {"mean": mean, "std": math.sqrt(sum((v - mean) ** 2 for v in vals) / len(vals)),
+                    "min": min(vals), "max": max(vals)}
+    return out
+
+def _parse_seeds(text):
+    """'0-99' or '1,5,9' or '0-9,42'."""
+    seeds = []
+    for part in filter(None, text.split(",")):
+        a, _, b = part.partition("-")
+        seeds.extend(range(int(a), int(b) + 1) if b else [int(a)])
+    return seeds
+
+def main(argv=None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="Run one genome under many rng_seed values.")
+    ap.add_argument("genome", help="genome .yaml or .gumb")
+    ap.add_argument("--seeds", default="0-15", help="e.g. 0-99 or 1,2,3")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--backend", choices=("dict", "compact"), default="dict")
+    ap.add_argument("--max-steps", type=int, default=None)
+    ap.add_argument("--max-vertices", type=int, default=None)
+    ap.add_argument("--cycle-history", type=int, default=None)
+    ap.add_argument("--cache-dir", default=None)
+    ap.add_argument("--out", default=None, help="per-seed JSONL records")
+    args = ap.parse_args(argv)
+    genome = CompiledGenome.from_path(args.genome, cache_dir=args.cache_dir)
+    records = run_seeds(genome, _parse_seeds(args.seeds), workers=args.workers, backend=args.backend,
+                        max_steps=args.max_steps, max_vertices=args.max_vertices, cycle_history=args.cycle_history)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+    print(json.dumps(summarize(records), indent=1))
+    return 1 if any("error" in r for r in records) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
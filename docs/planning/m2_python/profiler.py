@@ -0,0 +1,170 @@
+# docs/planning/m2_python/profiler.py  (reference only; opt-in step profiler for GraphUnfoldingMachine)
+#
+#   python profiler.py ../../../data/genoms/dumbbell.yaml --trace dumbbell.jsonl
+#
+#   machine.profiler = StepProfiler(trace="run.jsonl"); machine.run(); print(machine.profiler.format_summary())
+#
+# Trace: one JSON object per step ("step" is the machine's passed_steps before it, so a resumed run
+# keeps counting from its checkpoint), then a final {"summary": {...}} line:
+#   {"step": 0, "seconds": ..., "phases": {"snapshot": s, "lookup": s, "apply": s, "other": s},
+#    "apply": {"GiveBirthConnected": s, ...}, "rule_hits": {"3": 12, ...}, "bfs_expansions": k,
+#    "active": true, "nodes": n, "edges": e}
+
+import json
+import sys
+import time
+from pathlib import Path
+
+_clock = time.perf_counter
+
+class StepProfiler:
+    """
+    Per-step wall time split by phase (snapshot, rule lookup, apply per OperationKind, other loop work),
+    rule hit counts, BFS expansions (nodes a TryToConnectWithNearest search expanded, the graph's
+    bfs_expansions counter; balls reused from this step's NeighborhoodCache are not expanded again) and
+    node/edge counts; delete_marked at the end of run() is timed separately (mid-run deletions by the
+    component passes are a "delete" phase of their step).
+
+    GraphUnfoldingMachine.run() attaches the profiler only when machine.profiler is set: the hooks are
+    instance attributes shadowing the machine/graph methods for the duration of that run, so an
+    unprofiled machine executes exactly the same code as before. Steps taken by the vectorized CA
+    stepper cannot be split and are timed as one "ca_step" phase. Timings include the hook overhead
+    (two clock reads per rule lookup and per applied operation), so compare profiled runs with each other.
+    """
+    def __init__(self, trace=None, *, count_edges=True):
+        self.trace = trace  # JSONL path or writable text file; None keeps the records in memory only
+        self.count_edges = count_edges  # per-step edge counts (the graph's cached edge_count())
+        self.records = []
+        self.delete_seconds = 0.0
+        self._patched = []; self._sink = None; self._own_sink = False
+
+    # -- wiring (called by GraphUnfoldingMachine.run) --
+
+    def attach(self, machine, step, stepper=None):
+        """
+        Installs the hooks on `machine` and its graph; returns `step` wrapped to record one step per call.
+        `stepper` is the VectorCAStepper driving `step` (None for the scalar engine, whatever wraps it).
+        """
+        self.records = []; self.delete_seconds = 0.0
+        g = machine.graph
+        cur = {"snapshot": 0.0, "lookup": 0.0, "delete": 0.0, "apply": {}, "in_step": False}
+        find, apply, snap, delete = machine._find_rule_for, machine._apply, g.snapshot_nodes, g.delete_marked
+
+        def find_rule_for(node):
+            t = _clock(); r = find(node); cur["lookup"] += _clock() - t; return r
+        def apply_op(node, rule):
+            k = rule.operation.kind.value; t = _clock(); apply(node, rule)
+            a = cur["apply"]; a[k] = a.get(k, 0.0) + (_clock() - t)
+        def snapshot_nodes(*a, **kw):
+            t = _clock(); r = snap(*a, **kw); cur["snapshot"] += _clock() - t; return r
+        def delete_marked():
+            t = _clock(); gone = delete(); dt = _clock() - t
+            if cur["in_step"]: cur["delete"] += dt
+            else: self.delete_seconds += dt
+            return gone
+
+        hooks = [(machine, "_find_rule_for", find_rule_for), (machine, "_apply", apply_op),
+                 (g, "snapshot_nodes", snapshot_nodes), (g, "delete_marked", delete_marked)]
+        for obj, name, fn in hooks: setattr(obj, name, fn)
+        self._patched = [(obj, name) for obj, name, _ in hooks]
+        if isinstance(self.trace, (str, Path)):
+            self._sink = open(self.trace, "w", encoding="utf-8"); self._own_sink = True
+        else:
+            self._sink = self.trace; self._own_sink = False
+
+        rules = machine.change_table
+        vectorized = stepper is not None
+        def profiled_step():
+            cur.update(snapshot=0.0, lookup=0.0, delete=0.0, apply={}, in_step=True)
+            before = [r.last_activation_index for r in rules]; bfs = g.bfs_expansions
+            t = _clock(); did = step(); total = _clock() - t; cur["in_step"] = False
+            hits = {str(i): r.last_activation_index - b if b >= 0 else r.last_activation_index + 1
+                    for i, (r, b) in enumerate(zip(rules, before)) if r.last_activation_index != b}
+            if vectorized:
+                phases = {"ca_step": total}
+            else:
+                spent = cur["snapshot"] + cur["lookup"] + sum(cur["apply"].values()) + cur["delete"]
+                phases = {"snapshot": cur["snapshot"], "lookup": cur["lookup"], "apply": sum(cur["apply"].values()),
+                          "other": max(0.0, total - spent)}
+                if cur["delete"]: phases["delete"] = cur["delete"]
+            rec = {"step": machine.passed_steps, "seconds": total, "phases": phases, "apply": dict(cur["apply"]),
+                   "rule_hits": hits, "bfs_expansions": g.bfs_expansions - bfs, "active": bool(did), "nodes": g.node_count()}
+            if self.count_edges: rec["edges"] = g.edge_count()  # CA steps keep the topology
+            self.records.append(rec)
+            if self._sink is not None: self._sink.write(json.dumps(rec) + "\n")
+            return did
+        self._rules = [(r.operation.kind.value, r.operation.operand) for r in rules]
+        return profiled_step
+
+    def detach(self):
+        """Removes the hooks and finishes the trace with the summary line."""
+        for obj, name in self._patched:
+            obj.__dict__.pop(name, None)
+        self._patched = []
+        if self._sink is not None:
+            self._sink.write(json.dumps({"summary": self.summary()}) + "\n")
+            if self._own_sink: self._sink.close()
+            else: self._sink.flush()
+        self._sink = None
+
+    # -- results --
+
+    def summary(self) -> dict:
+        recs = self.records
+        phases, apply, hits = {}, {}, {}
+        for r in recs:
+            for k, v in r["phases"].items(): phases[k] = phases.get(k, 0.0) + v
+            for k, v in r["apply"].items(): apply[k] = apply.get(k, 0.0) + v
+            for k, v in r["rule_hits"].items(): hits[k] = hits.get(k, 0) + v
+        phases["delete_marked"] = self.delete_seconds
+        slowest = max(recs, key=lambda r: r["seconds"], default=None)
+        out = {
+            "steps": len(recs), "seconds": sum(phases.values()), "phases": phases, "apply": apply,
+            "rule_hits": dict(sorted(hits.items(), key=lambda kv: (-kv[1], int(kv[0])))),
+            "bfs_expansions": sum(r["bfs_expansions"] for r in recs),
+            "nodes": recs[-1]["nodes"] if recs else None, "peak_nodes": max((r["nodes"] for r in recs), default=None),
+            "slowest_step": slowest["step"] if slowest else None,
+        }
+        if recs and "edges" in recs[-1]: out["edges"] = recs[-1]["edges"]
+        return out
+
+    def format_summary(self, top=10) -> str:
+        s = self.summary(); total = s["seconds"] or 1e-12
+        lines = [f"steps {s['steps']}  total {s['seconds']:.4f}s  ({1e3 * s['seconds'] / max(1, s['steps']):.3f} ms/step)"
+                 f"  nodes {s['nodes']} (peak {s['peak_nodes']})"
+                 + (f"  edges {s['edges']}" if "edges" in s else "") + f"  bfs expansions {s['bfs_expansions']}",
+                 f"{'phase':<28}{'seconds':>10}{'share':>8}"]
+        for name, sec in s["phases"].items():
+            lines.append(f"{name:<28}{sec:>10.4f}{100 * sec / total:>7.1f}%")
+            if name == "apply":
+                for kind, ks in sorted(s["apply"].items(), key=lambda kv: -kv[1]):
+                    lines.append(f"  {kind:<26}{ks:>10.4f}{100 * ks / total:>7.1f}%")
+        if s["rule_hits"]:
+            lines.append(f"{'rule':>5}  {'operation':<36}{'hits':>10}")
+            for idx, n in list(s["rule_hits"].items())[:top]:
+                kind, operand = self._rules[int(idx)]
+                lines.append(f"{idx:>5}  {kind + (' ' + operand if operand else ''):<36}{n:>10}")
+        return "\n".join(lines)
+
+def main(argv=None) -> int:
+    import argparse
+    from genome_loader import load_machine
+    ap = argparse.ArgumentParser(description="Run one genome under StepProfiler and print the summary table.")
+    ap.add_argument("genome", help="genome .yaml or .gumb")
+    ap.add_argument("--trace", default=None, help="per-step JSONL trace path")
+    ap.add_argument("--max-steps", type=int, default=None)
+    ap.add_argument("--compact", action="store_true", help="run on CompactGUMGraph")
+    ap.add_argument("--no-edges", action="store_true", help="skip per-step edge counts")
+    ap.add_argument("--top", type=int, default=10, help="rules listed in the summary")
+    args = ap.parse_args(argv)
+    graph = None
+    if args.compact:
+        from compact_graph import CompactGUMGraph
+        graph = CompactGUMGraph()
+    prof = StepProfiler(trace=args.trace, count_edges=not args.no_edges)
+    load_machine(args.genome, graph=graph, max_steps=args.max_steps, profiler=prof).run()
+    print(prof.format_summary(args.top))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
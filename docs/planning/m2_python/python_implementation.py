@@ -2,6 +2,7 @@
 
 from enum import Enum
 from collections import deque
+from bisect import bisect_left
 
 class TranscriptionWay(str, Enum):
     resettable = "resettable"
@@ -23,11 +24,13 @@ class OperationKind(str, Enum):
 class Condition:
     # - values < 0 mean "ignore" for *_ge/*_le (range mode)
     # - prior: "any" means ignore
-    def __init__(self, current, prior="any", conn_ge=-1, conn_le=-1, parents_ge=-1, parents_le=-1):
+    # - conn_with_state: conn_* count only neighbors with that saved state ("any" = full degree)
+    def __init__(self, current, prior="any", conn_ge=-1, conn_le=-1, parents_ge=-1, parents_le=-1, conn_with_state="any"):
         self.current = str(current)
         self.prior = "any" if prior is None else str(prior)
         self.conn_ge, self.conn_le = int(conn_ge), int(conn_le)
         self.parents_ge, self.parents_le = int(parents_ge), int(parents_le)
+        self.conn_with_state = "any" if conn_with_state is None else str(conn_with_state)
 
 class Operation:
     def __init__(self, kind: OperationKind, operand=None):
@@ -55,19 +58,155 @@ def _match_int(val: int, ge: int, le: int, mode: CountCompare) -> bool:
         return False
     return True
 
-def rule_matches(saved_state, prior_state, degree, parents_count, rule: Rule, cmp_mode: CountCompare) -> bool:
+def rule_matches(saved_state, prior_state, degree, parents_count, rule: Rule, cmp_mode: CountCompare, conn_by_state=None) -> bool:
     if not rule.is_enabled:
         return False
     c = rule.condition
     if c.current != saved_state: return False
     if c.prior not in ("any", None) and c.prior != prior_state: return False
+    if c.conn_with_state != "any": degree = (conn_by_state or {}).get(c.conn_with_state, 0)
     if not _match_int(degree, c.conn_ge, c.conn_le, cmp_mode): return False
     if not _match_int(parents_count, c.parents_ge, c.parents_le, cmp_mode): return False
     return True
 
+_NO_BOUND = 1 << 62
+
+def _int_bounds(ge: int, le: int, mode: CountCompare):
+    """(lo, hi) such that lo <= val <= hi iff _match_int(val, ge, le, mode)."""
+    if ge < 0 and le < 0: return -_NO_BOUND, _NO_BOUND
+    if mode == CountCompare.exact and ge >= 0: return ge, ge
+    return (ge if ge >= 0 else -_NO_BOUND), (le if le >= 0 else _NO_BOUND)
+
+_GROWTH_OPS = (OperationKind.TurnToState, OperationKind.GiveBirth, OperationKind.GiveBirthConnected)
+
+def reachable_states(init_states, rules):
+    """init_states closed under the TurnToState/GiveBirth* operands of enabled rules whose current state is reachable."""
+    states = set(init_states)
+    rules = [r for r in rules if r.is_enabled and r.operation.kind in _GROWTH_OPS and r.operation.operand]
+    grew = True
+    while grew:
+        grew = False
+        for r in rules:
+            if r.condition.current in states and r.operation.operand not in states:
+                states.add(r.operation.operand); grew = True
+    return states
+
+class RuleIndex:
+    """
+    Change table compiled once per run: enabled rules bucketed by (current, prior), with
+    degree/parents bounds stored as int ranges. A node's candidates are its (state, prior)
+    bucket merged with (state, "any") in table order, so first-match order (resettable) and
+    wrap-around order (continuable) are the same as a linear rule_matches scan.
+    Recompile after editing the table or toggling is_enabled. Indices in `skip` (rules that can never be
+    the first match, see rule_analysis) are left out; the others keep their table index. bind() reuses
+    the compiled buckets for another list of the same rules (e.g. per-run copies of one genome's table).
+    """
+    def __init__(self, rules, cmp_mode: CountCompare, skip=()):
+        self.rules = rules; self._buckets = {}; self._merged = {}; self.uses_conn_with_state = False
+        for i, r in enumerate(rules):
+            if not r.is_enabled or i in skip: continue
+            c = r.condition
+            prior = "any" if c.prior in ("any", None) else c.prior
+            cws = None if c.conn_with_state == "any" else c.conn_with_state
+            self.uses_conn_with_state |= cws is not None
+            self._buckets.setdefault((c.current, prior), []).append(
+                (i, cws, *_int_bounds(c.conn_ge, c.conn_le, cmp_mode), *_int_bounds(c.parents_ge, c.parents_le, cmp_mode)))
+
+    def bind(self, rules):
+        """This index over `rules`, a table whose conditions and is_enabled flags equal the compiled one; O(1)."""
+        other = object.__new__(RuleIndex); other.__dict__.update(self.__dict__); other.rules = rules
+        return other
+
+    def candidates(self, state, prior):
+        m = self._merged.get((state, prior))
+        if m is None:
+            own = self._buckets.get((state, prior), []) if prior != "any" else []
+            entries = sorted(own + self._buckets.get((state, "any"), []), key=lambda e: e[0])
+            m = self._merged[(state, prior)] = (entries, [e[0] for e in entries])
+        return m
+
+    def find(self, state, prior, degree, parents, conn_by_state=None, start=0, wrap=False):
+        entries, idxs = self.candidates(state, prior)
+        lo = bisect_left(idxs, start) if start > 0 else 0
+        for k in range(lo, len(entries)):
+            i, cws, dlo, dhi, plo, phi = entries[k]
+            if plo <= parents <= phi and dlo <= (degree if cws is None else conn_by_state.get(cws, 0)) <= dhi: return self.rules[i], i
+        if wrap and start > 0:
+            for k in range(lo):
+                i, cws, dlo, dhi, plo, phi = entries[k]
+                if plo <= parents <= phi and dlo <= (degree if cws is None else conn_by_state.get(cws, 0)) <= dhi: return self.rules[i], i
+        return None, -1
+
+class NeighborhoodCache:
+    """
+    Per-step memo of depth-limited balls under a fixed (step-start) topology:
+    ball(v, d) = {v} ∪ ⋃ ball(w, d-1) for w in N(v), so searches from neighboring nodes share work.
+    expansions counts the neighbor lists fetched, one per ball computed.
+    """
+    def __init__(self, neighbors_of): self._nb = neighbors_of; self._balls = {}; self.expansions = 0
+    def ball(self, v, d):
+        if d <= 0: return frozenset((v,))
+        b = self._balls.get((v, d))
+        if b is None:
+            self.expansions += 1
+            if d == 1: b = frozenset(self._nb(v)).union((v,))
+            else: b = frozenset((v,)).union(*[self.ball(w, d-1) for w in self._nb(v)])
+            self._balls[(v, d)] = b
+        return b
+
+def nearest_candidates(u_id, max_depth, neighbors_of, eligible, cache=None):
+    """
+    (found, expansions): the eligible nodes at the first BFS depth (1..max_depth) that has any, and the
+    number of nodes whose neighbor list the search fetched. Plain BFS returns them in discovery order
+    (random tie-breaking depends on it); with a NeighborhoodCache each depth is a ball difference,
+    returned sorted by id, and only balls not already cached this step count as expansions.
+    """
+    if cache is not None:
+        start = cache.expansions
+        inner = cache.ball(u_id, 0)
+        for d in range(1, max_depth+1):
+            outer = cache.ball(u_id, d)
+            if len(outer) == len(inner): break  # component exhausted
+            found = sorted(v for v in outer - inner if eligible(v))
+            if found: return found, cache.expansions-start
+            inner = outer
+        return [], cache.expansions-start
+    visited={u_id}; q=deque([(u_id,0)]); found_depth=None; found=[]; expanded=0
+    while q:
+        nid,d=q.popleft()
+        if found_depth is not None and d>found_depth: break
+        if 0<d<=max_depth and eligible(nid):
+            found_depth=d; found.append(nid); continue
+        if d<max_depth:
+            expanded+=1
+            for nb in neighbors_of(nid):
+                if nb not in visited: visited.add(nb); q.append((nb,d+1))
+    return found, expanded
+
 class GUMGraph:
-    """Integer node ids; each node has .state, .prior_state, .neighbors set, .parents_count, and step-snapshot fields."""
-    def __init__(self): self._nodes = {}; self._next = 0
+    """
+    Integer node ids; each node has .state, .prior_state, .neighbors set, .parents_count, and step-snapshot fields.
+    Mutations mark the touched nodes dirty and snapshot_nodes() refreshes only those, so change state through
+    set_state() (or call mark_dirty() after editing a node dict by hand). state_counts() is kept incrementally.
+    Sorted neighbor tuples are cached per node and dropped when its adjacency changes; the step-start
+    topology (snapshot_neighbors) is kept copy-on-write: a node's old tuple is saved on its first change.
+    Node ids are also indexed by saved_state (refreshed by the snapshot), so set saved_state by hand only
+    through set_saved_state(). delete_marked() removes, in one pass, the ids mark_deleted() collected
+    (whose flag is still set). Flags set by hand are picked up by sync_marked(). run() calls it before
+    its first step and before its final delete_marked(), so a flag written by hand mid-run is honored
+    when the run ends. Use mark_deleted() to have it honored at the next step, as CompactGUMGraph does.
+    edge_count() is kept incrementally. bfs_expansions counts the nodes expanded by
+    try_connect_with_nearest searches (read by profiler.StepProfiler). export_state() / restore_state()
+    carry the between-step state, bookkeeping included, for checkpoint.py. pending_ids() and next_id
+    expose the snapshot refresh set and the id counter to the passes, cycle hashing and the recorder.
+    """
+    def __init__(self):
+        self._nodes = {}; self._next = 0
+        self._dirty = set(); self._state_count = {}; self._conn_by_state_fresh = False
+        self._sorted_adj = {}; self._step_adj = {}; self._nbhd = NeighborhoodCache(self.snapshot_neighbors)
+        self._by_saved_state = {}  # saved_state -> set of node ids
+        self._marked = set(); self._edge_count = 0  # ids flagged by mark_deleted(); number of edges
+        self.bfs_expansions = 0
     def add_vertex(self, state, parents_count=0, mark_new=True):
         nid = self._next; self._next += 1
         self._nodes[nid] = {
@@ -75,44 +214,212 @@ class GUMGraph:
             "neighbors": set(), "parents_count": parents_count,
             "marked_new": mark_new, "marked_deleted": False,
             # step snapshot
-            "saved_state": None, "saved_parents": 0, "saved_degree": 0,
+            "saved_state": None, "saved_parents": 0, "saved_degree": 0, "saved_conn_by_state": None,
             "rule_index": 0
         }
+        self._dirty.add(nid); self._count_state(state, 1)
         return nid
+    def add_substrate(self, states, edges, mark_new=True):
+        """
+        Bulk add_vertex/add_edge for large init graphs: one vertex per entry of `states`, then the (i, j)
+        edges given as positions in `states` (self-loops ignored). Returns the new ids, in order.
+        """
+        base=self._next; ids=range(base, base+len(states)); self._next+=len(states)
+        for nid, st in zip(ids, states):
+            self._nodes[nid]={
+                "id": nid, "state": st, "prior_state": "Unknown", "neighbors": set(), "parents_count": 0,
+                "marked_new": mark_new, "marked_deleted": False,
+                "saved_state": None, "saved_parents": 0, "saved_degree": 0, "saved_conn_by_state": None, "rule_index": 0
+            }
+            self._count_state(st, 1)
+        for i, j in edges:
+            if i!=j and base+j not in self._nodes[base+i]["neighbors"]:
+                self._nodes[base+i]["neighbors"].add(base+j); self._nodes[base+j]["neighbors"].add(base+i)
+                self._edge_count+=1
+        self._dirty.update(ids)
+        return list(ids)
     def add_edge(self, a,b):
-        if a in self._nodes and b in self._nodes and a!=b:
+        if a in self._nodes and b in self._nodes and a!=b and b not in self._nodes[a]["neighbors"]:
+            self._touch_adj(a); self._touch_adj(b)
             self._nodes[a]["neighbors"].add(b)
             self._nodes[b]["neighbors"].add(a)
+            self._dirty.add(a); self._dirty.add(b); self._edge_count+=1
     def remove_edge(self, a,b):
-        if a in self._nodes: self._nodes[a]["neighbors"].discard(b)
-        if b in self._nodes: self._nodes[b]["neighbors"].discard(a)
+        if a in self._nodes and b in self._nodes[a]["neighbors"]:
+            self._touch_adj(a); self._touch_adj(b)
+            self._nodes[a]["neighbors"].discard(b)
+            self._nodes[b]["neighbors"].discard(a)
+            self._dirty.add(a); self._dirty.add(b); self._edge_count-=1
     def remove_vertex(self, nid):
-        if nid in self._nodes:
-            for nb in list(self._nodes[nid]["neighbors"]):
+        if nid in self._nodes: self._remove_vertices((nid,))
+    def _remove_vertices(self, ids):
+        """Drops the nodes `ids` (all present); only edges to surviving neighbors are unlinked one by one."""
+        gone=set(ids); inner=0
+        for nid in ids:
+            n=self._nodes.pop(nid)
+            for nb in n["neighbors"]:
+                if nb in gone: inner+=1; continue
+                self._touch_adj(nb)
                 self._nodes[nb]["neighbors"].discard(nid)
-            del self._nodes[nid]
+                self._dirty.add(nb); self._edge_count-=1
+            self._count_state(n["state"], -1); self._index_saved(nid, n["saved_state"], None)
+            self._dirty.discard(nid); self._sorted_adj.pop(nid,None); self._step_adj.pop(nid,None)
+        self._edge_count-=inner//2; self._marked-=gone
+    def mark_deleted(self, nid):
+        n=self._nodes.get(nid)
+        if n is not None: n["marked_deleted"]=True; self._marked.add(nid)
+    def sync_marked(self):
+        """Collects nodes whose "marked_deleted" flag was set by hand (one scan of the flags)."""
+        self._marked.update(nid for nid,n in self._nodes.items() if n["marked_deleted"])
+    def marked_ids(self): return sorted(nid for nid in self._marked if self._nodes[nid]["marked_deleted"])
+    def set_state(self, nid, state):
+        n=self._nodes[nid]
+        if n["state"]==state: return
+        self._count_state(n["state"], -1); self._count_state(state, 1)
+        n["state"]=state; self._dirty.add(nid)
+    def set_saved_state(self, nid, state):
+        n=self._nodes[nid]
+        self._index_saved(nid, n["saved_state"], state); n["saved_state"]=state
+    def mark_dirty(self, nid):
+        if nid in self._nodes: self._dirty.add(nid)
+    def pending_ids(self):
+        """Ids touched since the last snapshot_nodes(), i.e. the ones it will refresh (the live set: copy it to keep it)."""
+        return self._dirty
+    @property
+    def next_id(self):
+        """The id the next add_vertex() hands out."""
+        return self._next
+    def state_counts(self): return dict(self._state_count)
+    def sorted_neighbors(self, nid):
+        t=self._sorted_adj.get(nid)
+        if t is None: t=self._sorted_adj[nid]=tuple(sorted(self._nodes[nid]["neighbors"]))
+        return t
+    def snapshot_neighbors(self, nid):
+        """Sorted neighbors as of the last snapshot_nodes() (nodes born since then have none)."""
+        t=self._step_adj.get(nid)
+        return t if t is not None else self.sorted_neighbors(nid)
+    def snapshot_adjacent(self, a, b):
+        t=self._step_adj.get(a)
+        return b in self._nodes[a]["neighbors"] if t is None else b in t
+    def _touch_adj(self, nid):
+        if nid not in self._step_adj: self._step_adj[nid]=self.sorted_neighbors(nid)
+        self._sorted_adj.pop(nid,None)
+    def _index_saved(self, nid, old, new):
+        if old==new: return
+        if old is not None:
+            ids=self._by_saved_state[old]; ids.discard(nid)
+            if not ids: del self._by_saved_state[old]
+        if new is not None: self._by_saved_state.setdefault(new,set()).add(nid)
+    def _count_state(self, state, d):
+        c=self._state_count.get(state,0)+d
+        if c: self._state_count[state]=c
+        else: self._state_count.pop(state,None)
     def nodes(self): return list(self._nodes.values())
+    # O(1) lookup by id and a stable id snapshot (safe to iterate while the graph mutates)
+    def node(self, nid): return self._nodes.get(nid)
+    def has_node(self, nid): return nid in self._nodes
+    def node_ids(self): return list(self._nodes)
+    def node_count(self): return len(self._nodes)
+    def edge_count(self): return self._edge_count
     def edges(self):
-        seen=set()
-        for n in self._nodes.values():
+        """Each edge once, as (a, b) with a < b, from its smaller endpoint (so in ascending order of a)."""
+        for nid, n in self._nodes.items():
             for nb in n["neighbors"]:
-                a,b=(n["id"],nb) if n["id"]<nb else (nb,n["id"])
-                if (a,b) not in seen: seen.add((a,b)); yield (a,b)
-    def snapshot_nodes(self):
-        for n in self._nodes.values():
+                if nid<nb: yield (nid,nb)
+    def snapshot_nodes(self, conn_by_state=False):
+        """Refreshes saved_* fields; returns the ids whose snapshot (incl. conn_by_state) may have changed."""
+        # only nodes touched since the last snapshot can have stale saved_* fields
+        dirty=self._dirty; self._dirty=set()
+        self._step_adj={}; self._nbhd=NeighborhoodCache(self.snapshot_neighbors)
+        for nid in dirty:
+            n=self._nodes[nid]
             n["marked_new"]=False
-            n["saved_state"]=n["state"]
+            self._index_saved(nid, n["saved_state"], n["state"]); n["saved_state"]=n["state"]
             n["saved_parents"]=n["parents_count"]
             n["saved_degree"]=len(n["neighbors"])
+        if conn_by_state:  # per-state neighbor counts, only when some rule uses conn_with_state
+            if self._conn_by_state_fresh:  # a node's counts change when it or a neighbor is touched
+                todo=set(dirty)
+                for nid in dirty: todo.update(self._nodes[nid]["neighbors"])
+            else:
+                todo=set(self._nodes)
+            for n in map(self._nodes.__getitem__, todo):
+                counts={}
+                for nb in n["neighbors"]:
+                    st=self._nodes[nb]["saved_state"]; counts[st]=counts.get(st,0)+1
+                n["saved_conn_by_state"]=counts
+            dirty=todo
+        self._conn_by_state_fresh=conn_by_state
+        return dirty
     def delete_marked(self):
-        for nid in list(self._nodes.keys()):
-            if self._nodes[nid]["marked_deleted"]:
-                self.remove_vertex(nid)
+        gone=self.marked_ids()
+        if gone: self._remove_vertices(gone)
+        self._marked.clear()  # the rest had their flag cleared by hand
+        return gone
+
+    _STATE_COLUMNS = ("state", "prior_state", "saved_state")
+    _INT_COLUMNS = ("parents_count", "saved_parents", "saved_degree", "rule_index")
+    def export_state(self) -> dict:
+        """
+        Between-step state as plain lists (checkpoint.py stores it as JSON): the id counter, ids in
+        iteration order, per-node columns (state names interned in "names", saved_state -1 before the
+        first snapshot), marked_new | marked_deleted << 1 flags, a flat edge list, ids awaiting a snapshot.
+        """
+        ids=self.node_ids(); nodes=[self.node(nid) for nid in ids]
+        names=[]; code={}
+        def intern(st):
+            if st is None: return -1
+            k=code.get(st)
+            if k is None: k=code[st]=len(names); names.append(st)
+            return k
+        out={"next": self._next, "ids": ids, "names": names}
+        for key in self._STATE_COLUMNS: out[key]=[intern(n[key]) for n in nodes]
+        for key in self._INT_COLUMNS: out[key]=[int(n[key]) for n in nodes]
+        out["flags"]=[int(n["marked_new"]) | int(n["marked_deleted"])<<1 for n in nodes]
+        out["edges"]=[v for e in self.edges() for v in e]
+        out["dirty"]=sorted(self.pending_ids())
+        return out
+    def restore_state(self, st: dict):
+        """Rebuilds an export_state() dict into this (empty) graph, with the same ids; returns self."""
+        if self.node_count(): raise ValueError("restore_state needs an empty graph")
+        names=st["names"]
+        for k, nid in enumerate(st["ids"]):
+            self._next=nid  # add_vertex hands out _next
+            self.add_vertex(names[st["state"][k]], parents_count=st["parents_count"][k], mark_new=bool(st["flags"][k] & 1))
+            n=self.node(nid)
+            n["prior_state"]=names[st["prior_state"][k]]
+            if st["saved_state"][k]>=0: self.set_saved_state(nid, names[st["saved_state"][k]])
+            for key in ("saved_parents", "saved_degree", "rule_index"): n[key]=st[key][k]
+            if st["flags"][k] & 2: self.mark_deleted(nid)
+        e=st["edges"]
+        for i in range(0, len(e), 2): self.add_edge(e[i], e[i+1])
+        self._next=st["next"]
+        self._dirty=set(st["dirty"]); self._step_adj={}; self._conn_by_state_fresh=False
+        return self
+
+    def try_connect_with(self, u_id, state, *, snapshot=False):
+        """
+        TryToConnectWith: connects u to every node whose saved_state is `state` (not u, not born or marked
+        deleted this step). Only the indexed ids are visited, and the ones u is already adjacent to (live, or
+        at step start when snapshot=True) are dropped with one set difference.
+        """
+        cands=self._by_saved_state.get(state)
+        if not cands or u_id not in self._nodes: return
+        t=self._step_adj.get(u_id) if snapshot else None
+        todo=cands.difference(self._nodes[u_id]["neighbors"] if t is None else t); todo.discard(u_id)
+        for v in sorted(todo):
+            o=self._nodes[v]
+            if not (o["marked_new"] or o["marked_deleted"]): self.add_edge(u_id,v)
 
     # Deterministic nearest with options (matches repo):
-    def try_connect_with_nearest(self, u_id, *, required_state=None, max_depth=2, tie_breaker="stable", connect_all=False, rng=None):
+    #   snapshot=True searches the step-start topology (TS topology_semantics: snapshot) and, unless the
+    #   pick depends on BFS order (random tie-break), reuses this step's NeighborhoodCache.
+    def try_connect_with_nearest(self, u_id, *, required_state=None, max_depth=2, tie_breaker="stable", connect_all=False, rng=None, snapshot=False):
         if u_id not in self._nodes or self._nodes[u_id]["marked_deleted"]: return
-        nbrs_u = set(self._nodes[u_id]["neighbors"])
+        if snapshot:
+            neighbors_of=self.snapshot_neighbors; nbrs_u=frozenset(self.snapshot_neighbors(u_id))
+        else:
+            neighbors_of=self.sorted_neighbors; nbrs_u=self._nodes[u_id]["neighbors"]  # not mutated until the search ends
         def candidate_state(v):
             st = self._nodes[v].get("saved_state")
             return st if st is not None else self._nodes[v]["state"]
@@ -122,27 +429,18 @@ class GUMGraph:
             if required_state is None: return True
             st = candidate_state(v)
             return st is not None and str(st)==str(required_state)
-        # BFS until first depth with candidates
-        visited={u_id}; q=deque([(u_id,0)]); found_depth=None; found=[]
-        while q:
-            nid,d=q.popleft()
-            if found_depth is not None and d>found_depth: break
-            if 0<d<=max_depth and eligible(nid):
-                found_depth=d; found.append(nid); continue
-            if d<max_depth:
-                for nb in sorted(self._nodes[nid]["neighbors"]):
-                    if nb not in visited: visited.add(nb); q.append((nb,d+1))
+        ordered = tie_breaker=="random" and not connect_all
+        found, expanded = nearest_candidates(u_id, max_depth, neighbors_of, eligible, self._nbhd if snapshot and not ordered else None)
+        self.bfs_expansions += expanded
         if not found: return
-        def _safe_add(a,b):
-            if a!=b and a in self._nodes and b in self._nodes and b not in self._nodes[a]["neighbors"]:
-                self._nodes[a]["neighbors"].add(b); self._nodes[b]["neighbors"].add(a)
         if connect_all:
-            for v in found: _safe_add(u_id,v); return
+            for v in found: self.add_edge(u_id,v)
+            return
         if tie_breaker=="random" and rng is not None:
             v = rng.choice(found)
         else:
             v = min(found)  # stable/by_id/by_creation => minimal id
-        _safe_add(u_id,v)
+        self.add_edge(u_id,v)
 
 class GraphUnfoldingMachine:
     """
@@ -152,78 +450,175 @@ class GraphUnfoldingMachine:
       - Stop on max_steps or two consecutive empty steps; then delete marked nodes.
       - TranscriptionWay.resettable: scan rules from 0 each time.
         TranscriptionWay.continuable: resume from next rule after last match (per-node).
+      - Fixed-topology genomes (only TurnToState can ever fire) run on ca_engine.VectorCAStepper
+        when NumPy is available; results are identical to _next_step. vectorize_ca=False disables it.
+      - topology_semantics: "live" (default here) lets neighbor-based ops see edges changed earlier in
+        the same step; "snapshot" (the TS/YAML default) makes TryToConnectWith/WithNearest and
+        DisconnectFrom use the step-start topology.
+      - frontier=True: each step only evaluates nodes that matched a rule last time, nodes the
+        snapshot refreshed (own state/degree, or neighbor states for conn_with_state), and nodes
+        whose prior_state just moved. Everything else had no matching rule under an unchanged
+        match key, so skipping it changes neither the result nor the empty-step count.
+      - profiler: an optional profiler.StepProfiler; run() attaches it for the duration of the run
+        (per-phase timings, rule hits, BFS expansions, node/edge counts). None costs nothing.
+      - recorder: an optional trajectory.TrajectoryRecorder, attached the same way; it writes each
+        step's state changes, births, edge changes and deletions as a delta frame, plus keyframes.
+      - cycle_history=k > 0: also stop when the step state repeats one of the last k states
+        (cycles.CycleDetector); stop_reason is then "cycle_detected" and cycle_period the period.
+        Other runs end with stop_reason "max_steps" or "quiescent" (two empty steps). cycle_state holds
+        the detector's history as of the last checkpoint callback; checkpoint.py saves it, and
+        run(resume=True) continues that history.
+      - maintain_single_component / orphan_cleanup / reseed_isolated_A: the TS engine's per-step
+        component passes (components.ComponentPasses), run after the rules of each step. While any
+        is on, marked nodes are deleted at the end of every step, as the TS engine does, rather than
+        once after the run. orphan_age holds the steps each orphaned node has spent outside the
+        primary component. All off (the default here) leaves the step unchanged.
+      - prune_rules=True: compile_rules() leaves out the rules rule_analysis finds dead (unreachable
+        states, empty bounds) or shadowed (resettable), judged from the graph at compile time. The
+        change table and rule indices stay as they are, so results are unchanged.
+      - compiled_rules (attribute, not a keyword): a RuleIndex compiled from an equal change table;
+        compile_rules() then binds it to change_table instead of compiling again. The caller vouches
+        that conditions and is_enabled flags match (multiseed.CompiledGenome sets it for every seed).
     """
     def __init__(self, graph: GUMGraph, *, start_state="A", transcription=TranscriptionWay.resettable,
                  count_compare=CountCompare.range, max_vertices=0, max_steps=100,
-                 nearest_max_depth=2, nearest_tie_breaker="stable", nearest_connect_all=False, rng_seed=None):
+                 nearest_max_depth=2, nearest_tie_breaker="stable", nearest_connect_all=False, rng_seed=None, vectorize_ca=True, frontier=False, topology_semantics="live", profiler=None, cycle_history=0,
+                 maintain_single_component=False, orphan_cleanup=None, reseed_isolated_A=False, prune_rules=False, recorder=None):
         import random
         self.graph=graph; self.transcription=TranscriptionWay(transcription)
         self.count_compare=CountCompare(count_compare)
         self.max_vertices=int(max_vertices); self.max_steps=int(max_steps)
         self.nearest_max_depth=int(nearest_max_depth); self.nearest_tie_breaker=str(nearest_tie_breaker)
         self.nearest_connect_all=bool(nearest_connect_all); self.rng = random.Random(rng_seed)
+        self.vectorize_ca=bool(vectorize_ca); self.frontier=bool(frontier)
+        self.profiler=profiler; self.recorder=recorder; self.cycle_history=int(cycle_history)
+        self.maintain_single_component=bool(maintain_single_component); self.orphan_cleanup=orphan_cleanup
+        self.reseed_isolated_A=bool(reseed_isolated_A); self.orphan_age={}
+        self.prune_rules=bool(prune_rules); self.rule_analysis=None  # rule_analysis.RuleAnalysis of the last compile
+        self._components=None  # components.ComponentPasses while run() is going
+        if topology_semantics not in ("live", "snapshot"): raise ValueError(f"topology_semantics: {topology_semantics!r}")
+        self.topology_semantics=topology_semantics
+        self._awake=set(); self._prior_moved=set()  # frontier scheduling state
         self.change_table = []  # list[Rule]
-        if not self.graph.nodes():
+        self._rule_index = None  # RuleIndex, compiled from change_table by run()
+        self.compiled_rules = None  # RuleIndex of an equal table (multiseed.CompiledGenome): run() binds it instead
+        if not self.graph.node_count():
             self.graph.add_vertex(start_state, parents_count=0, mark_new=True)
         self.passed_steps=0; self._empty_iters=0
+        self.stop_reason=None; self.cycle_period=None; self.cycle_state=None; self._fired=None  # _fired: nodes a rule fired on (or deleted mid-run), for CycleDetector
 
-    def run(self):
-        self.passed_steps=0; self._empty_iters=0
-        while self.max_steps<0 or self.passed_steps<self.max_steps:
-            if not self._next_step(): self._empty_iters+=1
+    def compile_rules(self):
+        if self.compiled_rules is not None:
+            self._rule_index = self.compiled_rules.bind(self.change_table)
+            self._awake=set(self.graph.node_ids()); self._prior_moved=set()
+            return self._rule_index
+        skip=()
+        if self.prune_rules:
+            from rule_analysis import analyze_machine
+            self.rule_analysis=analyze_machine(self); skip=self.rule_analysis.prunable
+        self._rule_index = RuleIndex(self.change_table, self.count_compare, skip)
+        self._awake=set(self.graph.node_ids()); self._prior_moved=set()  # no-match knowledge is per table
+        return self._rule_index
+
+    def _vector_stepper(self):
+        if not self.vectorize_ca: return None
+        try:
+            from ca_engine import VectorCAStepper
+        except ImportError:  # NumPy not installed: scalar path only
+            return None
+        return VectorCAStepper.build(self)
+
+    def run(self, *, resume=False, checkpoint=None, checkpoint_every=0):
+        """
+        resume=True continues from passed_steps/_empty_iters (e.g. a machine from checkpoint.load_checkpoint)
+        instead of starting over. checkpoint(machine) is called after every checkpoint_every-th step, with
+        the graph holding the between-step state (see checkpoint.Checkpointer); a callback that flags nodes for
+        deletion should use graph.mark_deleted() (see GUMGraph: hand-set flags are collected at run start and end).
+        """
+        if not resume: self.passed_steps=0; self._empty_iters=0; self.cycle_state=None
+        self.compile_rules(); self.graph.sync_marked()
+        passes=None
+        if self.maintain_single_component or (self.orphan_cleanup or {}).get("enabled") or self.reseed_isolated_A:
+            from components import ComponentPasses
+            passes=ComponentPasses(self)
+        stepper=self._vector_stepper() if passes is None or passes.static() else None
+        if stepper and passes is not None: passes=None; self.orphan_age.clear()  # fixed topology, one component
+        self._components=passes
+        step=stepper.step if stepper else self._next_step
+        rec=self.recorder; prof=self.profiler
+        if rec is not None: step=rec.attach(self, step, stepper)
+        if prof is not None: step=prof.attach(self, step, stepper)
+        cycles=None; self.stop_reason=None; self.cycle_period=None
+        if self.cycle_history>0:
+            from cycles import CycleDetector, uses_rng
+            if not uses_rng(self):
+                cycles=CycleDetector(self, stepper, self.cycle_history, self.cycle_state if self._empty_iters<2 else None)
+                if cycles.period is not None: self.stop_reason="cycle_detected"; self.cycle_period=cycles.period
+        self.cycle_state=None
+        while (self.max_steps<0 or self.passed_steps<self.max_steps) and self._empty_iters<2 and self.stop_reason is None:
+            if not step(): self._empty_iters+=1
             else: self._empty_iters=0
             self.passed_steps+=1
-            if self._empty_iters>=2: break
-        self.graph.delete_marked()
+            if checkpoint_every and self.passed_steps%checkpoint_every==0:
+                if stepper: stepper.write_back()
+                if cycles is not None: self.cycle_state=cycles.export_state()
+                checkpoint(self)
+            if cycles is not None and self._empty_iters<2 and cycles.observe(self.passed_steps):
+                self.stop_reason="cycle_detected"; self.cycle_period=cycles.period; break
+        if cycles is not None: cycles.close()
+        if self.stop_reason is None: self.stop_reason="quiescent" if self._empty_iters>=2 else "max_steps"
+        if stepper: stepper.write_back()
+        self._components=None
+        self.graph.sync_marked(); self.graph.delete_marked()
+        if rec is not None: rec.detach()
+        if prof is not None: prof.detach()
 
     def _find_rule_for(self, node):
-        rules=self.change_table; start=0 if self.transcription==TranscriptionWay.resettable else node["rule_index"]
-        n=len(rules)
-        def _scan(lo,hi):
-            for i in range(lo,hi):
-                r=rules[i]
-                if rule_matches(node["saved_state"], node["prior_state"], node["saved_degree"], node["saved_parents"], r, self.count_compare):
-                    return r,i
-            return None,-1
-        r,i=_scan(start,n)
-        if r is None and self.transcription==TranscriptionWay.continuable and start>0:
-            r,i=_scan(0,start)
-        return r,i
+        index=self._rule_index or self.compile_rules()
+        if self.transcription==TranscriptionWay.resettable:
+            return index.find(node["saved_state"], node["prior_state"], node["saved_degree"], node["saved_parents"], node["saved_conn_by_state"])
+        return index.find(node["saved_state"], node["prior_state"], node["saved_degree"], node["saved_parents"], node["saved_conn_by_state"],
+                          start=node["rule_index"], wrap=True)
 
     def _next_step(self):
-        self.graph.snapshot_nodes(); did=False
-        for nid in [n["id"] for n in self.graph.nodes()]:
-            if nid not in [m["id"] for m in self.graph.nodes()]: continue
-            n = [m for m in self.graph.nodes() if m["id"]==nid][0]
-            if n["marked_deleted"]: continue
+        index=self._rule_index or self.compile_rules()
+        changed=self.graph.snapshot_nodes(conn_by_state=index.uses_conn_with_state); did=False; fired=self._fired
+        if self.frontier:
+            ids=sorted(self._awake | changed | self._prior_moved); self._awake=set(); self._prior_moved=set()
+        else:
+            ids=self.graph.node_ids()
+        for nid in ids:
+            n = self.graph.node(nid)
+            if n is None or n["marked_deleted"]: continue
             r,idx = self._find_rule_for(n)
             if r:
                 self._apply(n, r); did=True
+                if fired is not None: fired.append(nid)
                 r.is_active=True; r.was_active=True
                 r.last_activation_index = (r.last_activation_index+1) if r.last_activation_index>=0 else 0
                 if self.transcription==TranscriptionWay.continuable:
                     n["rule_index"] = (idx+1) % max(1,len(self.change_table))
+            if self.frontier:
+                if r: self._awake.add(nid)
+                if n["prior_state"]!=n["saved_state"]: self._prior_moved.add(nid)
             n["prior_state"]=n["saved_state"]
+        if self._components is not None: self._components.after_step()
         return did
 
     def _apply(self, node, rule: Rule):
         k=rule.operation.kind; op=rule.operation.operand
         if k==OperationKind.TurnToState and op:
-            node["state"]=op; return
+            self.graph.set_state(node["id"], op); return
         if k==OperationKind.GiveBirth and op:
-            if self.max_vertices==0 or len(self.graph.nodes())<self.max_vertices:
+            if self.max_vertices==0 or self.graph.node_count()<self.max_vertices:
                 self.graph.add_vertex(op, parents_count=node["parents_count"]+1, mark_new=True); return
         if k==OperationKind.GiveBirthConnected and op:
-            if self.max_vertices==0 or len(self.graph.nodes())<self.max_vertices:
+            if self.max_vertices==0 or self.graph.node_count()<self.max_vertices:
                 nid=self.graph.add_vertex(op, parents_count=node["parents_count"]+1, mark_new=True)
                 self.graph.add_edge(node["id"], nid); return
+        snapshot = self.topology_semantics=="snapshot"
         if k==OperationKind.TryToConnectWith and op:
-            for other in self.graph.nodes():
-                if other["id"]==node["id"] or other["marked_new"] or other["marked_deleted"]: continue
-                if other["saved_state"]!=op: continue
-                if other["id"] not in node["neighbors"]:
-                    self.graph.add_edge(node["id"], other["id"])
-            return
+            self.graph.try_connect_with(node["id"], op, snapshot=snapshot); return
         if k==OperationKind.TryToConnectWithNearest:
             self.graph.try_connect_with_nearest(
                 node["id"],
@@ -231,13 +626,14 @@ class GraphUnfoldingMachine:
                 max_depth=self.nearest_max_depth,
                 tie_breaker=self.nearest_tie_breaker,
                 connect_all=self.nearest_connect_all,
-                rng=self.rng
+                rng=self.rng,
+                snapshot=snapshot
             ); return
         if k==OperationKind.DisconnectFrom and op:
-            for nb in list(node["neighbors"]):
-                other = [m for m in self.graph.nodes() if m["id"]==nb][0]
+            for nb in (tuple(self.graph.snapshot_neighbors(node["id"])) if snapshot else list(node["neighbors"])):
+                other = self.graph.node(nb)
                 if (not other["marked_new"]) and other["saved_state"]==op and (not node["marked_deleted"]):
                     self.graph.remove_edge(node["id"], nb); 
             return
         if k==OperationKind.Die:
-            node["marked_deleted"]=True; return
+            self.graph.mark_deleted(node["id"]); return
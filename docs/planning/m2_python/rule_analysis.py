@@ -0,0 +1,155 @@
+# docs/planning/m2_python/rule_analysis.py  (reference only; static dead/shadowed rule analysis of a change table)
+#
+#   python rule_analysis.py ../../../data/genoms/dumbbell.yaml               # report as JSON
+#   python rule_analysis.py genome.yaml --out pruned.yaml                     # genome with the pruned table
+#
+#   report = analyze_machine(machine); report.prunable   # table indices that can never fire
+#   prune_machine(machine)                                # drops them from machine.change_table
+#   GraphUnfoldingMachine(..., prune_rules=True)          # or: RuleIndex skips them, table untouched
+#
+# A rule is dead when no node can ever satisfy its condition: it is disabled, one of its count bounds
+# accepts no value, its `current` (or `prior`) state is unreachable, or it counts neighbors in an
+# unreachable conn_with_state and 0 is outside its conn bounds. Reachable states are the graph's states
+# closed under the TurnToState/GiveBirth* operands of rules that are not dead; a node's prior state is
+# "Unknown", a state it was created with, or a reachable state.
+#
+# In resettable mode a live rule is also shadowed when an earlier live rule has the same `current`, the
+# same or "any" `prior`, and count intervals that contain its own (conn intervals only compare for the
+# same conn_with_state, unless the earlier rule accepts any degree): whenever it matches, the earlier
+# rule matched first. Continuable scans start at the node's rule_index, so there only dead rules go.
+#
+# Neither kind can ever be the first match of a lookup, so dropping them changes no run.
+
+import argparse
+import json
+import sys
+from bisect import bisect_left
+
+from python_implementation import CountCompare, TranscriptionWay, _int_bounds, _NO_BOUND, reachable_states
+
+_FULL = (-_NO_BOUND, _NO_BOUND)
+
+class RuleAnalysis:
+    """
+    Result of analyze_rules(): reachable `states` and `priors`, `dead` {index: reason}, `shadowed`
+    {index: index of the earlier rule that covers it}, `live` (indices kept, in table order).
+    """
+    def __init__(self, n_rules, states, priors, dead, shadowed):
+        self.n_rules = n_rules; self.states = states; self.priors = priors
+        self.dead = dead; self.shadowed = shadowed
+        self.prunable = frozenset(dead) | frozenset(shadowed)
+        self.live = [i for i in range(n_rules) if i not in self.prunable]
+
+    def to_dict(self) -> dict:
+        return {"rules": self.n_rules, "live": len(self.live), "states": sorted(self.states),
+                "dead": {str(i): why for i, why in sorted(self.dead.items())},
+                "shadowed": {str(i): by for i, by in sorted(self.shadowed.items())}}
+
+def _dead_reason(r, states, priors, cmp_mode):
+    if not r.is_enabled: return "disabled"
+    c = r.condition
+    conn, parents = _int_bounds(c.conn_ge, c.conn_le, cmp_mode), _int_bounds(c.parents_ge, c.parents_le, cmp_mode)
+    if conn[0] > conn[1] or parents[0] > parents[1]: return "empty_bounds"
+    if c.current not in states: return "unreachable_current"
+    if c.prior not in ("any", None) and c.prior not in priors: return "unreachable_prior"
+    if c.conn_with_state not in ("any", None) and c.conn_with_state not in states and not conn[0] <= 0 <= conn[1]:
+        return "unreachable_conn_state"
+    return None
+
+def _covers(a, b, cmp_mode):
+    """True when every (prior, degree, parents, conn_by_state) that matches rule b also matches rule a (same current)."""
+    ca, cb = a.condition, b.condition
+    if ca.prior not in ("any", None) and ca.prior != cb.prior: return False
+    alo, ahi = _int_bounds(ca.parents_ge, ca.parents_le, cmp_mode); blo, bhi = _int_bounds(cb.parents_ge, cb.parents_le, cmp_mode)
+    if not (alo <= blo and bhi <= ahi): return False
+    alo, ahi = _int_bounds(ca.conn_ge, ca.conn_le, cmp_mode)
+    if (alo, ahi) == _FULL: return True
+    if (ca.conn_with_state or "any") != (cb.conn_with_state or "any"): return False
+    blo, bhi = _int_bounds(cb.conn_ge, cb.conn_le, cmp_mode)
+    return alo <= blo and bhi <= ahi
+
+def analyze_rules(rules, init_states, *, init_priors=(), count_compare=CountCompare.range,
+                  transcription=TranscriptionWay.resettable) -> RuleAnalysis:
+    """
+    Dead and shadowed rules of `rules` for nodes starting in `init_states` (with prior states
+    `init_priors`; "Unknown" is always possible).
+    """
+    cmp_mode = CountCompare(count_compare)
+    states = set(init_states); priors = set(init_priors) | {"Unknown"}
+    while True:
+        priors |= states
+        dead = {}
+        for i, r in enumerate(rules):
+            why = _dead_reason(r, states, priors, cmp_mode)
+            if why: dead[i] = why
+        grown = reachable_states(states, [r for i, r in enumerate(rules) if i not in dead]) - states
+        if not grown: break
+        states |= grown
+    shadowed = {}
+    if TranscriptionWay(transcription) == TranscriptionWay.resettable:
+        earlier = {}  # current -> live, unshadowed rule indices so far
+        for i, r in enumerate(rules):
+            if i in dead: continue
+            bucket = earlier.setdefault(r.condition.current, [])
+            by = next((k for k in bucket if _covers(rules[k], r, cmp_mode)), None)
+            if by is None: bucket.append(i)
+            else: shadowed[i] = by
+    return RuleAnalysis(len(rules), states, priors, dead, shadowed)
+
+def analyze_machine(machine) -> RuleAnalysis:
+    """analyze_rules() for machine.change_table from the machine's current graph (a fresh or resumed run)."""
+    g = machine.graph; states = set(); priors = set()
+    for nid in g.node_ids():
+        n = g.node(nid)
+        states.add(n["state"]); priors.add(n["prior_state"])
+        if n["saved_state"] is not None: states.add(n["saved_state"])
+    return analyze_rules(machine.change_table, states, init_priors=priors,
+                         count_compare=machine.count_compare, transcription=machine.transcription)
+
+def pruned_table(machine, analysis=None) -> list:
+    """The rules of machine.change_table that can fire, in order."""
+    a = analysis or analyze_machine(machine)
+    return [machine.change_table[i] for i in a.live]
+
+def prune_machine(machine, analysis=None) -> RuleAnalysis:
+    """
+    Replaces machine.change_table with pruned_table(). Continuable rule_index values are moved to the
+    first kept rule at or after them (wrapping), which resumes every scan at the same rule.
+    """
+    a = analysis or analyze_machine(machine)
+    machine.change_table = [machine.change_table[i] for i in a.live]
+    if machine.transcription == TranscriptionWay.continuable:
+        g = machine.graph; keep = a.live; n = max(1, len(keep))
+        for nid in g.node_ids():
+            node = g.node(nid); node["rule_index"] = bisect_left(keep, node["rule_index"]) % n
+    machine.compile_rules()
+    return a
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Report dead and shadowed rules of a genome; optionally write it pruned.")
+    ap.add_argument("genome", help="genome .yaml or .gumb")
+    ap.add_argument("--out", default=None, help="write the genome with only the live rules (YAML)")
+    args = ap.parse_args(argv)
+
+    from genome_loader import load_genome, machine_from_config, rule_to_config
+    cfg = load_genome(args.genome)
+    m = machine_from_config(cfg)
+    a = analyze_machine(m)
+    print(json.dumps(a.to_dict(), indent=2))
+    if args.out:
+        import yaml  # optional dependency, only needed for YAML files
+        out = {k: v for k, v in cfg.items() if k not in ("rules", "activity_scheme")}
+        if isinstance(out.get("meta"), dict): out["meta"] = {k: v for k, v in out["meta"].items() if k != "activity_scheme"}
+        out["rules"] = [rule_to_config(r) for r in pruned_table(m, a)]
+        if m.transcription == TranscriptionWay.continuable:  # init rule_index values point into the full table
+            nodes = [dict(n) if isinstance(n, dict) else n for n in (out.get("init_graph") or {}).get("nodes") or []]
+            for n in nodes:
+                if isinstance(n, dict) and n.get("rule_index") is not None:
+                    n["rule_index"] = bisect_left(a.live, int(n["rule_index"])) % max(1, len(a.live))
+            if nodes: out["init_graph"] = {**out["init_graph"], "nodes": nodes}
+        with open(args.out, "w", encoding="utf-8") as f:
+            yaml.safe_dump(out, f, sort_keys=False, allow_unicode=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+# docs/planning/m2_python/shared_substrate.py  (reference only; one read-only substrate shared by pool workers)
+#
+#   with SharedSubstrate.create(states, edges) as sub:        # or SharedSubstrate.from_genome("torus.yaml")
+#       pool = ProcessPoolExecutor(initializer=attach_worker, initargs=(sub.handle,))
+#       ...  # in a task: machine_from_config(cfg_without_init_graph, graph=worker_substrate().graph())
+#
+#   python batch_runner.py genomes/ --substrate torus_1000x1000.yaml --workers 8
+#
+# The substrate (a large init graph, e.g. a generate_graphs.py torus or quad mesh) is written once into
+# one multiprocessing.shared_memory block: NodeState byte codes, then CSR adjacency (int64 row offsets,
+# int32 sorted neighbor positions). A task only pickles the small SubstrateHandle. Workers map the block
+# read-only and build a SharedSubstrateGraph on it: node columns (states, parents, flags, ...) are
+# private copies, O(n) bytes, while a node's adjacency row is read from the block until the first edge
+# change at that node copies it. Runs that rewire a few nodes pay only for those rows. Substrate node k
+# has id k and slot k, so the id -> slot map, the pending-refresh set and the conn_by_state rows hold
+# only what changed. What stays per node and per worker: the ~21 bytes of node columns, and from the
+# first step on the saved-state index (a set entry and an int object per node, about 80 bytes in CPython).
+#
+# Attach only from processes started by the creator (pool workers): they share its resource tracker,
+# which unlinks the block if the creator dies without closing it.
+
+from array import array
+from itertools import chain, filterfalse
+from multiprocessing import shared_memory
+
+from compact_graph import CompactGUMGraph, encode_state
+
+def _align(n, k=8): return (n + k - 1) // k * k
+
+class SubstrateHandle:
+    """What a worker needs to attach: the block name and the array lengths."""
+    __slots__ = ("name", "n_nodes", "n_entries")
+    def __init__(self, name, n_nodes, n_entries): self.name = name; self.n_nodes = n_nodes; self.n_entries = n_entries
+    def __getstate__(self): return (self.name, self.n_nodes, self.n_entries)
+    def __setstate__(self, st): self.name, self.n_nodes, self.n_entries = st
+    def __repr__(self): return f"SubstrateHandle({self.name!r}, n_nodes={self.n_nodes}, n_entries={self.n_entries})"
+
+class SharedSubstrate:
+    """
+    Read-only views of a substrate block: `states` (memoryview 'B'), `offsets` ('q', n + 1) and
+    `neighbors` ('i'), with neighbors[offsets[i]:offsets[i + 1]] the sorted neighbor positions of node i.
+    The creating process owns the block: leaving the `with` block (or close()) unlinks it; drop the
+    graphs built on it first, since their rows still point into the block.
+    """
+    def __init__(self, shm, handle, owner):
+        self._shm = shm; self.handle = handle; self.owner = owner
+        n, m = handle.n_nodes, handle.n_entries
+        buf = shm.buf.toreadonly(); off = _align(n)
+        self.states = buf[:n]
+        self.offsets = buf[off:off + 8 * (n + 1)].cast("q")
+        off += 8 * (n + 1)
+        self.neighbors = buf[off:off + 4 * m].cast("i")
+
+    @classmethod
+    def create(cls, states, edges):
+        """Writes states (names) and edges (0-based position pairs; self-loops and duplicates dropped) to a new block."""
+        n = len(states)
+        codes = array("B", map(encode_state, states))
+        adj = [set() for _ in range(n)]
+        if hasattr(edges, "tolist"): edges = edges.tolist()  # NumPy edge arrays from generate_graphs
+        for i, j in edges:
+            if i != j: adj[i].add(j); adj[j].add(i)
+        offsets = array("q", [0]); neighbors = array("i")
+        for nb in adj:
+            neighbors.extend(sorted(nb)); offsets.append(len(neighbors))
+        del adj
+        size = _align(n) + 8 * (n + 1) + 4 * len(neighbors)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        buf = shm.buf; off = _align(n)
+        buf[:n] = codes.tobytes()
+        buf[off:off + 8 * (n + 1)] = offsets.tobytes(); off += 8 * (n + 1)
+        buf[off:off + 4 * len(neighbors)] = neighbors.tobytes()
+        return cls(shm, SubstrateHandle(shm.name, n, len(neighbors)), owner=True)
+
+    @classmethod
+    def from_genome(cls, genome):
+        """create() from a genome's init_graph (dict or path), nodes in engine order."""
+        from genome_loader import graph_from_config, load_genome
+        from python_implementation import GUMGraph
+        cfg = genome if isinstance(genome, dict) else load_genome(genome)
+        g, _ = graph_from_config(cfg, GUMGraph())
+        ids = g.node_ids(); pos = {nid: k for k, nid in enumerate(ids)}
+        return cls.create([g.node(nid)["state"] for nid in ids], [(pos[a], pos[b]) for a, b in g.edges()])
+
+    @classmethod
+    def attach(cls, handle: SubstrateHandle):
+        return cls(shared_memory.SharedMemory(name=handle.name), handle, owner=False)
+
+    def graph(self, mark_new=True):
+        """A fresh SharedSubstrateGraph over this substrate (node ids 0..n-1 in substrate order)."""
+        return SharedSubstrateGraph(self, mark_new)
+
+    def close(self):
+        if self._shm is None: return
+        for v in (self.neighbors, self.offsets, self.states): v.release()
+        self._shm.close()
+        if self.owner: self._shm.unlink()
+        self._shm = None
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+class _CopyOnWriteRows:
+    """
+    CompactGUMGraph._adj over a SharedSubstrate: rows of substrate slots are memoryview slices of the
+    shared CSR until own(slot) copies them into a private array('i'); later slots (births) are private.
+    """
+    __slots__ = ("_off", "_nb", "_n", "_own", "_extra")
+    def __init__(self, sub: SharedSubstrate):
+        self._off = sub.offsets; self._nb = sub.neighbors; self._n = sub.handle.n_nodes
+        self._own = {}; self._extra = []
+    def __len__(self): return self._n + len(self._extra)
+    def __getitem__(self, s):
+        if s >= self._n: return self._extra[s - self._n]
+        row = self._own.get(s, self)
+        return self._nb[self._off[s]:self._off[s + 1]] if row is self else row
+    def __setitem__(self, s, row):
+        if s >= self._n: self._extra[s - self._n] = row
+        else: self._own[s] = row
+    def append(self, row): self._extra.append(row)
+    def extend(self, rows): self._extra.extend(rows)
+    def own(self, s):
+        if s < self._n and s not in self._own: self._own[s] = array("i", self[s])
+    @property
+    def copied(self): return len(self._own)
+
+class _PrefixSlots:
+    """
+    CompactGUMGraph._slot over a SharedSubstrate: substrate node k has id k and slot k, so only the
+    removed substrate ids and the nodes born later (ids >= n, possibly in reused slots) are stored.
+    Iterates in id order, like the dict it stands in for.
+    """
+    __slots__ = ("_n", "_gone", "_born")
+    def __init__(self, n): self._n = n; self._gone = set(); self._born = {}
+    def get(self, nid, default=None):
+        if nid < self._n: return default if nid in self._gone else nid  # ids are >= 0
+        return self._born.get(nid, default)
+    def __getitem__(self, nid):
+        if nid < self._n and nid not in self._gone: return nid
+        return self._born[nid]  # KeyError for removed substrate ids too (never born)
+    def __contains__(self, nid): return nid not in self._gone if nid < self._n else nid in self._born
+    def __setitem__(self, nid, s): self._born[nid] = s
+    def update(self, pairs): self._born.update(pairs)
+    def pop(self, nid):
+        if nid < self._n:
+            if nid in self._gone: raise KeyError(nid)
+            self._gone.add(nid); return nid
+        return self._born.pop(nid)
+    def __len__(self): return self._n - len(self._gone) + len(self._born)
+    def _prefix(self):
+        return filterfalse(self._gone.__contains__, range(self._n)) if self._gone else range(self._n)
+    def __iter__(self): return chain(self._prefix(), self._born)
+    def items(self): return chain(zip(self._prefix(), self._prefix()), self._born.items())
+
+class _SparseRows(dict):
+    """CompactGUMGraph._saved_cbs stand-in: slot -> conn_by_state counts, None where never set."""
+    __slots__ = ()
+    def __missing__(self, s): return None
+    def append(self, row):
+        if row is not None: raise ValueError("rows are appended empty")
+    def extend(self, rows): pass
+
+class SharedSubstrateGraph(CompactGUMGraph):
+    """
+    CompactGUMGraph whose initial nodes and adjacency come from a SharedSubstrate. Node columns are
+    copied; adjacency rows are shared until an edge change touches them (the step-start topology
+    snapshot already hooks every such change, so that is where a row is copied). Substrate ids map to
+    slots implicitly (_PrefixSlots). Every node starts pending a snapshot refresh; that set is only
+    built when first read (normally by the first snapshot, which then empties it).
+    """
+    def __init__(self, substrate: SharedSubstrate, mark_new=True):
+        super().__init__()
+        self.substrate = substrate
+        n = substrate.handle.n_nodes
+        self._adj = _CopyOnWriteRows(substrate); self._slot = _PrefixSlots(n); self._saved_cbs = _SparseRows()
+        self._append_columns(substrate.states, mark_new); self._edge_count = substrate.handle.n_entries // 2
+        self._all_pending = True  # _dirty holds only the ids touched since; every node is pending
+    def pending_ids(self):
+        if self._all_pending: self._dirty.update(self._slot); self._all_pending = False
+        return self._dirty
+    def snapshot_nodes(self, conn_by_state=False):
+        self.pending_ids()
+        return super().snapshot_nodes(conn_by_state)
+    def copied_rows(self) -> int:
+        """Substrate adjacency rows no longer read from the shared block: copied on an edge change, or dropped with their node."""
+        return self._adj.copied
+    def _touch_adj(self, nid, s):
+        super()._touch_adj(nid, s); self._adj.own(s)
+
+_worker_substrate = None
+
+def attach_worker(handle):
+    """Pool initializer: attaches this worker to the substrate once."""
+    global _worker_substrate
+    _worker_substrate = SharedSubstrate.attach(handle)
+
+def worker_substrate() -> SharedSubstrate:
+    if _worker_substrate is None: raise RuntimeError("no shared substrate attached in this process")
+    return _worker_substrate
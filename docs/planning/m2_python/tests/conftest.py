@@ -0,0 +1,68 @@
+# docs/planning/m2_python/tests  (behavior checks for the reference engine; run: python -m pytest docs/planning/m2_python/tests)
+#
+# The modules import each other by bare name (they are run as scripts from their own directory), so the
+# engine directory goes on sys.path here. NumPy-only paths are skipped when NumPy is missing.
+
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ENGINE = Path(__file__).resolve().parent.parent
+GENOMES = ENGINE.parents[2] / "data" / "genoms"
+SCRIPTS = ENGINE.parents[2] / "scripts"
+sys.path.insert(0, str(ENGINE))
+
+from python_implementation import Condition, GraphUnfoldingMachine, GUMGraph, Operation, OperationKind, Rule  # noqa: E402
+
+GENOME_PATHS = sorted(GENOMES.glob("*.yaml"))
+STATES = "ABCD"
+
+def genome_ids(paths): return [p.stem for p in paths]
+
+def load_script(filename, name):
+    """A module from scripts/ (whose file names need not be importable), registered as `name`."""
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, SCRIPTS / filename)
+        module = sys.modules[name] = importlib.util.module_from_spec(spec); spec.loader.exec_module(module)
+    return sys.modules[name]
+
+def final_graph(machine):
+    """What a run produced: steps taken, (id, state, parents_count) per node, edges, rule activation counters."""
+    g = machine.graph
+    return (machine.passed_steps, [(nid, g.node(nid)["state"], g.node(nid)["parents_count"]) for nid in g.node_ids()],
+            sorted(g.edges()), [r.last_activation_index for r in machine.change_table])
+
+def random_case(seed):
+    """(rules, init states, init edges, machine kwargs) of a small random genome; every OperationKind can occur."""
+    rng = random.Random(seed); rules = []
+    for _ in range(rng.randint(1, 10)):
+        kind = rng.choice(list(OperationKind))
+        cond = Condition(rng.choice(STATES), rng.choice(["any", *STATES]), rng.choice([-1, 0, 1, 2, 3]),
+                         rng.choice([-1, 1, 2, 4]), rng.choice([-1, 0, 1]), rng.choice([-1, 2, 5]),
+                         rng.choice(["any", "any", *STATES]))
+        r = Rule(cond, Operation(kind, None if kind == OperationKind.Die else rng.choice(STATES)))
+        r.is_enabled = rng.random() < 0.9; rules.append(r)
+    n = rng.randint(1, 6)
+    states = [rng.choice(STATES) for _ in range(n)]
+    edges = [(rng.randrange(n), rng.randrange(n)) for _ in range(rng.randint(0, n))]
+    kw = dict(transcription=rng.choice(["resettable", "continuable"]), count_compare=rng.choice(["range", "exact"]),
+              max_vertices=rng.choice([0, 30]), max_steps=rng.randint(1, 25), nearest_max_depth=rng.choice([1, 2, 3]),
+              nearest_tie_breaker=rng.choice(["stable", "random"]), rng_seed=7)
+    return rules, states, edges, kw
+
+def random_machine(seed, graph=None, **extra):
+    rules, states, edges, kw = random_case(seed)
+    g = graph if graph is not None else GUMGraph()
+    ids = [g.add_vertex(s) for s in states]
+    for a, b in edges: g.add_edge(ids[a], ids[b])
+    m = GraphUnfoldingMachine(g, **{**kw, **extra})
+    m.change_table = rules
+    return m
+
+@pytest.fixture(params=GENOME_PATHS, ids=genome_ids(GENOME_PATHS))
+def genome(request):
+    from genome_loader import load_genome
+    return load_genome(request.param)
@@ -0,0 +1,58 @@
+# run_batch gives the same record a run in this process gives, whatever the chunking, and reports bad genomes.
+
+import copy
+
+import pytest
+
+from batch_runner import run_batch, tasks_from_population
+from conftest import GENOMES
+from genome_loader import load_genome, machine_from_config
+
+def _direct(cfg, **limits):
+    m = machine_from_config(cfg, **limits); m.run()
+    return dict(steps=m.passed_steps, stop_reason=m.stop_reason, nodes=m.graph.node_count(), edges=m.graph.edge_count())
+
+def _by_name(records):
+    return {r["name"]: r for r in records}
+
+def test_per_task_limits_override_the_batch_ones():
+    cfg = load_genome(GENOMES / "dumbbell.yaml")
+    tasks = [{"name": "batch", "genome": cfg}, {"name": "steps", "genome": cfg, "max_steps": 4},
+             {"name": "vertices", "genome": cfg, "max_vertices": 5}]
+    recs = _by_name(run_batch(tasks, workers=2, chunk_size=1, max_steps=9, max_vertices=400))
+    want = {"batch": _direct(cfg, max_steps=9, max_vertices=400), "steps": _direct(cfg, max_steps=4, max_vertices=400),
+            "vertices": _direct(cfg, max_steps=9, max_vertices=5)}
+    assert {name: {k: rec[k] for k in want[name]} for name, rec in recs.items()} == want
+    assert recs["steps"]["steps"] == 4 and recs["vertices"]["nodes"] <= 5
+
+@pytest.mark.parametrize("chunk_size, max_in_flight", [(1, 1), (3, 2), (5, 4)])
+def test_chunks_and_in_flight_limit(chunk_size, max_in_flight):
+    cfg = load_genome(GENOMES / "dumbbell.yaml"); n = 30; pulled = [0]  # whole chunks for every chunk_size
+    def tasks():
+        for t in tasks_from_population([cfg] * n):
+            pulled[0] += 1; yield t
+    seen = []; bound = chunk_size * max_in_flight
+    for rec in run_batch(tasks(), workers=2, chunk_size=chunk_size, max_in_flight=max_in_flight, max_steps=6):
+        done = len(seen) // chunk_size * chunk_size  # records of the chunks finished before this one
+        assert pulled[0] <= done + bound  # never more than max_in_flight chunks queued
+        assert pulled[0] % chunk_size == 0  # tasks are taken a whole chunk at a time
+        seen.append(rec)
+    assert sorted(rec["name"] for rec in seen) == [f"g{i:05d}" for i in range(n)]
+    want = _direct(cfg, max_steps=6)
+    assert all({k: rec[k] for k in want} == want for rec in seen)
+
+def test_unloadable_genome_gives_an_error_record(tmp_path):
+    (tmp_path / "bad.yaml").write_text("machine: [unclosed\n", encoding="utf-8")
+    good = GENOMES / "dumbbell.yaml"
+    tasks = [{"name": "bad", "path": str(tmp_path / "bad.yaml")}, {"name": "missing", "path": str(tmp_path / "nope.yaml")},
+             {"name": "good", "path": str(good)}]
+    recs = _by_name(run_batch(tasks, workers=2, chunk_size=2, max_steps=5))
+    assert set(recs) == {"bad", "missing", "good"}
+    assert recs["bad"]["error"] and recs["missing"]["error"].startswith("FileNotFoundError")
+    assert "error" not in recs["good"] and recs["good"]["steps"] == _direct(load_genome(good), max_steps=5)["steps"]
+
+def test_unbounded_run_is_rejected():
+    cfg = copy.deepcopy(load_genome(GENOMES / "dumbbell.yaml")); cfg["machine"]["max_steps"] = -1
+    recs = _by_name(run_batch([{"name": "open", "genome": cfg}, {"name": "capped", "genome": cfg, "max_steps": 3}], workers=1))
+    assert recs["open"]["error"].startswith("ValueError: unbounded run") and "steps" not in recs["open"]
+    assert recs["capped"]["steps"] == 3
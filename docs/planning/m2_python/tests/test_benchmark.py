@@ -0,0 +1,50 @@
+# benchmark.py end to end on one shipped genome and one tiny substrate, each case in its own interpreter.
+
+import json
+
+import pytest
+
+import benchmark
+from conftest import GENOMES
+from genome_loader import load_genome, machine_from_config
+
+FIELDS = {"case", "steps", "nodes", "edges", "load_seconds", "time_to_first_step", "seconds", "seconds_all",
+          "steps_per_sec", "node_steps_per_sec", "peak_rss_mb", "digest"}
+
+@pytest.fixture(scope="module")
+def report(tmp_path_factory):
+    out = tmp_path_factory.mktemp("bench") / "run.json"
+    argv = ["--pattern", "dumbbell.yaml", "--sizes", "6x8", "--substrates", "torus", "--substrate-steps", "12",
+            "--repeat", "1", "--timeout", "120", "--out", str(out)]
+    assert benchmark.main(argv) == 0
+    return out, json.loads(out.read_text(encoding="utf-8"))
+
+def test_report_fields(report):
+    _, rep = report
+    assert set(rep) == {"environment", "settings", "results"}
+    assert {"python", "numpy", "cpus", "commit"} <= set(rep["environment"]) and rep["settings"]["repeat"] == 1
+    genome, torus = rep["results"]
+    assert (genome["case"], torus["case"]) == ("genome:dumbbell", "substrate:torus:6x8")
+    for rec in (genome, torus):
+        assert set(rec) == FIELDS and len(rec["seconds_all"]) == 1 and rec["seconds"] == rec["seconds_all"][0]
+        assert rec["time_to_first_step"] >= rec["load_seconds"] > 0
+    m = machine_from_config(load_genome(GENOMES / "dumbbell.yaml"), rng_seed=0); m.run()
+    assert (genome["steps"], genome["nodes"], genome["edges"], genome["digest"]) == \
+        (m.passed_steps, m.graph.node_count(), m.graph.edge_count(), benchmark._digest(m.graph))
+    assert (torus["steps"], torus["nodes"], torus["edges"]) == (12, 48, 4 * 48)
+
+def test_node_steps_count_every_step_of_the_best_run(report):
+    _, rep = report
+    torus = rep["results"][1]  # Life on a torus keeps its 48 nodes, so node-steps = 48 * steps
+    assert torus["node_steps_per_sec"] * torus["seconds"] == pytest.approx(48 * torus["steps"], rel=1e-2)
+    m = machine_from_config(load_genome(GENOMES / "dumbbell.yaml"), rng_seed=0)
+    counts = [m.graph.node_count()]
+    m.run(checkpoint=lambda mm: counts.append(mm.graph.node_count()), checkpoint_every=1)
+    genome = rep["results"][0]
+    assert genome["node_steps_per_sec"] * genome["seconds"] == pytest.approx(sum(counts[:m.passed_steps]), rel=1e-2)
+
+def test_diff_of_a_report_with_itself(report, capsys):
+    out, rep = report
+    assert benchmark.main(["--diff", str(out), str(out)]) == 0
+    table = capsys.readouterr().out
+    assert "RESULT CHANGED" not in table and all(r["case"] in table for r in rep["results"])
@@ -0,0 +1,72 @@
+# A run resumed from a checkpoint ends exactly where the uninterrupted run does (RNG state included).
+
+import pytest
+
+from checkpoint import load_checkpoint, save_checkpoint
+from compact_graph import CompactGUMGraph
+from conftest import final_graph, random_machine
+from genome_loader import machine_from_config
+
+def _resumed(make, at, tmp_path, graph=None):
+    path = tmp_path / "run.ckpt"
+    def cut(machine):
+        if machine.passed_steps == at: save_checkpoint(machine, path)
+    make().run(checkpoint=cut, checkpoint_every=1)
+    if not path.exists(): return None  # the run ended before `at`
+    m = load_checkpoint(path, graph=graph() if graph else None); m.run(resume=True)
+    return final_graph(m)
+
+@pytest.mark.parametrize("graph", [None, CompactGUMGraph], ids=["dict", "compact"])
+def test_resume_matches_one_run(genome, graph, tmp_path):
+    make = lambda: machine_from_config(genome, max_steps=30, max_vertices=400, graph=graph() if graph else None)
+    ref = make(); ref.run()
+    got = _resumed(make, 12, tmp_path, graph)
+    if got is None: pytest.skip("run ends before the checkpoint")
+    assert got == final_graph(ref)
+
+@pytest.mark.parametrize("seed", range(60))
+def test_resume_random_tables(seed, tmp_path):
+    ref = random_machine(seed); ref.run()
+    got = _resumed(lambda: random_machine(seed), max(1, ref.passed_steps // 2), tmp_path)
+    if got is not None: assert got == final_graph(ref)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_export_state_round_trips_across_backends(seed):
+    from python_implementation import GUMGraph
+    m = random_machine(seed, graph=CompactGUMGraph()); m.max_steps = max(1, m.max_steps // 2); m.run()
+    st = m.graph.export_state()
+    for graph in (GUMGraph(), CompactGUMGraph()):
+        assert graph.restore_state(st).export_state() == st
+
+CYCLE_GENOMES = ["quadmesh", "hexagon_replicator", "brians_brain_CA_torus_with_spikes"]
+
+def _stop(m): return final_graph(m), m.stop_reason, m.cycle_period
+
+@pytest.mark.parametrize("name", CYCLE_GENOMES)
+@pytest.mark.parametrize("vectorize", [True, False], ids=["vector", "scalar"])
+def test_resume_keeps_cycle_history(name, vectorize, tmp_path):
+    from conftest import GENOMES
+    from genome_loader import load_genome
+    cfg = load_genome(GENOMES / f"{name}.yaml")
+    make = lambda: machine_from_config(cfg, cycle_history=64, max_steps=100, vectorize_ca=vectorize)
+    ref = make(); ref.run()
+    assert ref.stop_reason == "cycle_detected"
+    path = tmp_path / "run.ckpt"
+    for at in range(1, ref.passed_steps + 1):
+        make().run(checkpoint=lambda m: m.passed_steps == at and save_checkpoint(m, path), checkpoint_every=1)
+        m = load_checkpoint(path); m.run(resume=True)
+        assert _stop(m) == _stop(ref), at
+
+def test_cycle_history_survives_another_hash_seed(tmp_path):
+    """The checkpoint is written by a process with another PYTHONHASHSEED; its saved hashes must still match."""
+    import os, subprocess, sys
+    from conftest import ENGINE, GENOMES
+    path = tmp_path / "run.ckpt"
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); from checkpoint import save_checkpoint; "
+            "from genome_loader import load_genome, machine_from_config; "
+            "m = machine_from_config(load_genome(sys.argv[2]), cycle_history=64, max_steps=100, vectorize_ca=False); "
+            "m.run(checkpoint=lambda m: m.passed_steps == 55 and save_checkpoint(m, sys.argv[3]), checkpoint_every=1)")
+    subprocess.run([sys.executable, "-c", code, str(ENGINE), str(GENOMES / "quadmesh.yaml"), str(path)], check=True,
+                   env={**os.environ, "PYTHONHASHSEED": "12345"})
+    m = load_checkpoint(path); m.run(resume=True)
+    assert (m.passed_steps, m.stop_reason, m.cycle_period) == (56, "cycle_detected", 2)
@@ -0,0 +1,180 @@
+# The component passes follow the TS engine (src/gum.ts, runOneStep) step by step.
+
+import random
+
+import pytest
+
+from compact_graph import CompactGUMGraph
+from components import ComponentPasses, ComponentTracker
+from conftest import random_machine
+from python_implementation import Condition, GraphUnfoldingMachine, GUMGraph, Operation, OperationKind, Rule
+
+OPTIONS = {"orphans": dict(orphan_cleanup={"enabled": True, "thresholds": {"size1": 2, "size2": 3, "others": 4}}),
+           "reseed": dict(reseed_isolated_A=True), "single": dict(maintain_single_component=True)}
+
+def _graph_now(g):
+    return ({nid: (g.node(nid)["state"], g.node(nid)["parents_count"]) for nid in g.node_ids()}, sorted(g.edges()))
+
+def _ts_components(g):
+    """getConnectedComponents: BFS over the nodes not marked deleted, through unmarked neighbors only."""
+    live = [nid for nid in g.node_ids() if not g.node(nid)["marked_deleted"]]; seen = set(); comps = []
+    for s in live:
+        if s in seen: continue
+        comp = [s]; seen.add(s)
+        for u in comp:
+            for v in g.sorted_neighbors(u):
+                if v not in seen and not g.node(v)["marked_deleted"]: seen.add(v); comp.append(v)
+        comps.append(comp)
+    return comps
+
+def _ts_primary(g, comps):
+    return min(range(len(comps)), key=lambda i: (min(g.node(v)["parents_count"] for v in comps[i]), min(comps[i])))
+
+def _ts_passes(m, ages):
+    """cleanupOrphansIfEnabled, removeMarkedNodes, reseedIsolatedANodesIfEnabled, enforceSingleComponentIfEnabled."""
+    g = m.graph; oc = m.orphan_cleanup or {}
+    if oc.get("enabled") and not m.maintain_single_component:
+        comps = _ts_components(g)
+        if len(comps) <= 1: ages.clear()
+        else:
+            keep = _ts_primary(g, comps); t = oc["thresholds"]
+            for i, comp in enumerate(comps):
+                th = t["size1"] if len(comp) == 1 else t["size2"] if len(comp) == 2 else t["others"]
+                for v in comp:
+                    if i == keep: ages.pop(v, None); continue
+                    ages[v] = ages.get(v, 0) + 1
+                    if ages[v] >= th: g.mark_deleted(v)
+    for v in g.delete_marked(): ages.pop(v, None)
+    if m.reseed_isolated_A and not m.maintain_single_component and not oc.get("enabled"):
+        for comp in _ts_components(g):
+            n = g.node(comp[0])
+            if len(comp) == 1 and n["state"] == "A" and n["parents_count"] > 0:
+                n["parents_count"] = 0; n["prior_state"] = "Unknown"; g.mark_dirty(comp[0])
+    if m.maintain_single_component:
+        comps = _ts_components(g)
+        if len(comps) > 1:
+            keep = _ts_primary(g, comps)
+            for i, comp in enumerate(comps):
+                if i != keep:
+                    for v in comp: g.mark_deleted(v)
+            g.delete_marked()
+
+def _ts_sequence(make, steps):
+    """The graph after each TS step: the rules as in _next_step, then the TS passes in their order."""
+    m = make(); opts = (m.maintain_single_component, m.orphan_cleanup, m.reseed_isolated_A)
+    m.maintain_single_component, m.orphan_cleanup, m.reseed_isolated_A = False, None, False
+    m.compile_rules(); m.graph.sync_marked()
+    m.maintain_single_component, m.orphan_cleanup, m.reseed_isolated_A = opts
+    ages = {}; seq = []
+    for _ in range(steps):
+        m._next_step(); _ts_passes(m, ages); seq.append(_graph_now(m.graph))
+    return seq
+
+def _python_sequence(make, steps):
+    seq = []
+    for k in range(1, steps + 1):
+        m = make(); m.max_steps = k; m.run()
+        if m.passed_steps < k: break  # the run went quiescent
+        seq.append(_graph_now(m.graph))
+    return seq
+
+def _chain(**kw):
+    """A - D - B with a Die rule on D: D's death cuts B off the primary component."""
+    g = GUMGraph(); a, d, b = (g.add_vertex(s) for s in "ADB")
+    g.add_edge(a, d); g.add_edge(d, b)
+    m = GraphUnfoldingMachine(g, max_steps=10, vectorize_ca=False, **kw)
+    m.change_table = [Rule(Condition("D"), Operation(OperationKind.Die))]
+    return m
+
+def test_die_then_orphan_follows_ts_sequence():
+    make = lambda: _chain(orphan_cleanup={"enabled": True, "thresholds": {"size1": 2, "size2": 3, "others": 4}})
+    ts = _ts_sequence(make, 3); py = _python_sequence(make, 3)
+    assert py == ts[:len(py)]
+    # step 1: D dies; getConnectedComponents already skips it, so B is a size-1 orphan of age 1. Step 2: age 2, gone.
+    assert sorted(ts[0][0]) == [0, 2] and sorted(ts[1][0]) == [0]
+
+@pytest.mark.parametrize("option", OPTIONS)
+@pytest.mark.parametrize("seed", range(60))
+def test_random_tables_follow_ts_sequence(seed, option):
+    make = lambda: random_machine(seed, vectorize_ca=False, **OPTIONS[option])
+    py = _python_sequence(make, 12)
+    assert py == _ts_sequence(make, 12)[:len(py)]
+
+# -- ComponentTracker and the passes on their own --
+
+def _bfs_components(g):
+    seen = set(); comps = set()
+    for s in g.node_ids():
+        if s in seen: continue
+        comp = [s]; seen.add(s)
+        for u in comp:
+            for v in g.sorted_neighbors(u):
+                if v not in seen: seen.add(v); comp.append(v)
+        comps.add(frozenset(comp))
+    return comps
+
+@pytest.mark.parametrize("backend", ["dict", "compact"])
+@pytest.mark.parametrize("seed", range(30))
+def test_tracker_matches_full_bfs(seed, backend):
+    rng = random.Random(seed)
+    g = CompactGUMGraph() if backend == "compact" else GUMGraph()
+    ids = [g.add_vertex("A", parents_count=rng.randint(0, 3)) for _ in range(rng.randint(1, 25))]
+    for _ in range(rng.randint(0, 30)): g.add_edge(rng.choice(ids), rng.choice(ids))
+    tr = ComponentTracker(g)
+    for _ in range(40):
+        g.snapshot_nodes()
+        for _ in range(rng.randint(1, 6)):
+            live = g.node_ids(); op = rng.random()
+            if op < 0.4 and live: g.add_edge(rng.choice(live), rng.choice(live))
+            elif op < 0.7:
+                edges = list(g.edges())
+                if edges: g.remove_edge(*rng.choice(edges))
+            elif op < 0.85 and live: g.mark_deleted(rng.choice(live))
+            else: g.add_vertex("A", parents_count=rng.randint(0, 3))
+        tr.sync(g.delete_marked())
+        want = _bfs_components(g)
+        assert {frozenset(ms) for ms in tr.members.values()} == want
+        if want:
+            key = lambda ms: (min(g.node(v)["parents_count"] for v in ms), min(ms))
+            assert tr.members[tr.primary()] == min(want, key=key)
+
+def _passes(states, edges, parents, **opts):
+    g = GUMGraph(); ids = [g.add_vertex(s, parents_count=p) for s, p in zip(states, parents)]
+    for a, b in edges: g.add_edge(ids[a], ids[b])
+    m = GraphUnfoldingMachine(g, **opts)
+    return m, ComponentPasses(m)
+
+def test_orphans_age_and_go_at_their_size_threshold():
+    # primary 0-1, a single 2, a pair 3-4, a triple 5-6-7
+    m, passes = _passes("AAAAAAAA", [(0, 1), (3, 4), (5, 6), (6, 7)], [0, 1, 5, 5, 5, 5, 5, 5],
+                        orphan_cleanup={"enabled": True, "thresholds": {"size1": 2, "size2": 3, "others": 4}})
+    passes.after_step(); assert m.orphan_age == {v: 1 for v in range(2, 8)}
+    passes.after_step(); assert m.orphan_age == {v: 2 for v in range(3, 8)} and not m.graph.has_node(2)
+    passes.after_step(); assert m.orphan_age == {5: 3, 6: 3, 7: 3} and not m.graph.has_node(3)
+    passes.after_step(); assert m.orphan_age == {} and m.graph.node_ids() == [0, 1]
+
+def test_reattached_orphan_loses_its_age():
+    m, passes = _passes("AAA", [(0, 1)], [0, 1, 4], orphan_cleanup={"enabled": True, "thresholds": {"size1": 3}})
+    passes.after_step(); passes.after_step(); assert m.orphan_age == {2: 2}
+    m.graph.add_edge(1, 2)
+    passes.after_step(); assert m.orphan_age == {} and m.graph.node_ids() == [0, 1, 2]
+
+def test_reseed_turns_isolated_A_with_parents_into_a_root():
+    # 0-1 primary, 2: isolated A with parents, 3: isolated B with parents, 4: isolated A root, 5-6: A pair with parents
+    m, passes = _passes("AABBAAA", [(0, 1), (5, 6)], [0, 1, 3, 3, 0, 2, 2], reseed_isolated_A=True)
+    g = m.graph; g.node(2)["prior_state"] = "B"; g.node(2)["state"] = "A"
+    passes.after_step()
+    assert (g.node(2)["parents_count"], g.node(2)["prior_state"]) == (0, "Unknown")
+    assert [g.node(v)["parents_count"] for v in (3, 4, 5, 6)] == [3, 0, 2, 2]
+    assert passes.tracker.key(passes.tracker.label(2)) == (0, 2)
+
+def test_reseed_is_off_under_the_other_passes():
+    _, passes = _passes("AA", [], [0, 2], reseed_isolated_A=True, orphan_cleanup={"enabled": True})
+    assert not passes.reseed
+    _, passes = _passes("AA", [], [0, 2], reseed_isolated_A=True, maintain_single_component=True)
+    assert not passes.reseed and not passes.orphans
+
+def test_single_component_keeps_the_primary():
+    m, passes = _passes("AAAA", [(0, 1), (2, 3)], [1, 1, 0, 2], maintain_single_component=True)
+    passes.after_step()
+    assert m.graph.node_ids() == [2, 3] and passes.tracker.count() == 1
@@ -0,0 +1,78 @@
+# scripts/01_convert_xml_genes_to_json.py: legacy XAML ChangeTables become genomes the loader accepts.
+
+import json
+
+import pytest
+
+from conftest import load_script
+from genome_loader import load_genome, machine_from_config
+
+conv = load_script("01_convert_xml_genes_to_json.py", "convert_xml_genes")
+
+XAML = """<ResourceDictionary xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation"
+    xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml" xmlns:g="clr-namespace:GUM">
+  <g:ChangeTable x:Key="my gene" Capacity="300">
+    <g:ChangeTableItem>
+      <g:OperationCondition CurrentState="A" PriorState="Min" AllConnectionsCount_GE="0" AllConnectionsCount_LE="2"
+                            ParentsCount_GE="1" ParentsCount_LE="3"/>
+      <g:Operation Kind="TurnToState" OperandNodeState="B"/>
+    </g:ChangeTableItem>
+    <g:ChangeTableItem>
+      <g:OperationCondition CurrentState="B" PriorState="Ignored" AllConnectionsCount_GE="" ParentsCount_LE="1"/>
+      <g:Operation Kind="DisconectFrom" OperandNodeState="Ignored"/>
+    </g:ChangeTableItem>
+    <g:ChangeTableItem>
+      <g:Operation Kind="Die"/>
+    </g:ChangeTableItem>
+  </g:ChangeTable>
+  <g:ChangeTable x:Key="my/gene">
+    <g:ChangeTableItem>
+      <g:OperationCondition CurrentState="C"/>
+      <g:Operation Kind="GiveBirthConnected" OperandNodeState="A"/>
+    </g:ChangeTableItem>
+  </g:ChangeTable>
+</ResourceDictionary>
+"""
+
+@pytest.fixture
+def xaml(tmp_path):
+    path = tmp_path / "dictGens.xaml"; path.write_text(XAML, encoding="utf-8")
+    return path
+
+def _ndjson(xaml, capsys, *extra):
+    assert conv.main([str(xaml), "--ndjson", "-", *extra]) == 0
+    out, err = capsys.readouterr()
+    return [json.loads(line) for line in out.splitlines()], err
+
+def test_tables_convert_to_genomes(xaml, capsys):
+    recs, err = _ndjson(xaml, capsys, "--max-steps", "50")
+    assert [r["name"] for r in recs] == ["my gene", "my/gene"]
+    first, second = recs[0]["genome"], recs[1]["genome"]
+    assert first["rules"] == [
+        {"condition": {"current": "A", "prior": "any", "conn_ge": 0, "conn_le": 2, "parents_ge": 1, "parents_le": 3},
+         "op": {"kind": "TurnToState", "operand": "B"}},
+        {"condition": {"current": "B", "prior": "any", "conn_ge": -1, "conn_le": -1, "parents_ge": -1, "parents_le": 1},
+         "op": {"kind": "DisconnectFrom", "operand": "any"}}]
+    assert first["machine"]["max_vertices"] == 300 and second["machine"]["max_vertices"] == 2000  # Capacity, else --max-vertices
+    assert first["machine"]["max_steps"] == second["machine"]["max_steps"] == 50
+    assert "converted 2 genomes, skipped 1 incomplete items" in err  # the item without a condition
+    for r in recs:
+        m = machine_from_config(r["genome"]); m.run()
+        assert len(m.change_table) == len(r["genome"]["rules"])
+
+def test_yaml_out_dir_names_and_loads(xaml, tmp_path, capsys):
+    out = tmp_path / "genomes"
+    assert conv.main([str(xaml), "--out-dir", str(out), "--infer-start-state"]) == 0
+    recs, _ = _ndjson(xaml, capsys, "--infer-start-state")
+    assert sorted(p.name for p in out.iterdir()) == ["my_gene.yaml", "my_gene_2.yaml"]  # both keys sanitize to my_gene
+    for path, rec in zip((out / "my_gene.yaml", out / "my_gene_2.yaml"), recs):
+        assert path.read_text(encoding="utf-8").startswith(f"# converted from legacy gene dictionary: {rec['name']}\n")
+        cfg = load_genome(path)
+        assert cfg == rec["genome"]
+        m = machine_from_config(cfg)
+        assert m.max_vertices == cfg["machine"]["max_vertices"] and m.graph.node(0)["state"] == cfg["machine"]["start_state"]
+    assert load_genome(out / "my_gene_2.yaml")["machine"]["start_state"] == "C"
+
+def test_safe_filename():
+    used = {}
+    assert [conv.safe_filename(n, used) for n in ("a b", "a/b", "a b", "..", "")] == ["a_b", "a_b_2", "a_b_3", "gene", "gene_2"]
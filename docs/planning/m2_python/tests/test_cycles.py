@@ -0,0 +1,62 @@
+# cycle_history stops a run at the first exact repeat of the full step state, found by brute force.
+
+import pytest
+
+from compact_graph import CompactGUMGraph
+from conftest import final_graph, random_machine
+from cycles import uses_rng
+from genome_loader import machine_from_config
+from python_implementation import TranscriptionWay
+
+HISTORY = 8
+VARIANTS = {"dict": dict(vectorize_ca=False), "compact": dict(graph=CompactGUMGraph, vectorize_ca=False), "vector": dict()}
+
+def _full_state(m):
+    """Everything the next step reads, spelled out (no hashing)."""
+    g = m.graph; cont = m.transcription == TranscriptionWay.continuable
+    nodes = tuple((nid, n["state"], n["prior_state"], n["parents_count"], n["rule_index"] if cont else 0,
+                   n["marked_deleted"], tuple(sorted(g.sorted_neighbors(nid)))) for nid, n in ((i, g.node(i)) for i in g.node_ids()))
+    return nodes, tuple(sorted(m.orphan_age.items()))
+
+def _first_repeat(make, history):
+    """(step, period) of the first state equal to one of the `history` states before it, from a run without detection."""
+    m = make(); m.cycle_history = 0
+    seen = [_full_state(m)]; hit = []
+    def observe(mm):
+        if hit or mm._empty_iters >= 2: return
+        st = _full_state(mm); t = mm.passed_steps
+        for s in range(t - 1, max(-1, t - 1 - history), -1):
+            if seen[s] == st: hit.append((t, t - s)); break
+        seen.append(st)
+    m.run(checkpoint=observe, checkpoint_every=1)
+    return (hit[0] if hit else None), m
+
+def _check(make):
+    want, straight = _first_repeat(make, HISTORY)
+    m = make(); m.run()
+    if uses_rng(m): want = None  # runs that consume the RNG are never reported
+    if want is None:
+        assert m.stop_reason != "cycle_detected" and final_graph(m) == final_graph(straight)
+    else:
+        assert (m.stop_reason, (m.passed_steps, m.cycle_period)) == ("cycle_detected", want)
+        cut = make(); cut.cycle_history = 0; cut.max_steps = want[0]; cut.run()
+        assert final_graph(m)[1:3] == final_graph(cut)[1:3]
+
+def _kw(variant):
+    kw = dict(VARIANTS[variant]); graph = kw.pop("graph", None)
+    return (graph() if graph else None), kw
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_shipped_genomes_stop_at_first_repeat(genome, variant):
+    def make():
+        graph, kw = _kw(variant)
+        return machine_from_config(genome, graph=graph, max_steps=80, max_vertices=400, cycle_history=HISTORY, **kw)
+    _check(make)
+
+@pytest.mark.parametrize("variant", VARIANTS)
+@pytest.mark.parametrize("seed", range(80))
+def test_random_tables_stop_at_first_repeat(seed, variant):
+    def make():
+        graph, kw = _kw(variant)
+        return random_machine(seed, graph=graph, cycle_history=HISTORY, max_steps=40, max_vertices=60, **kw)
+    _check(make)
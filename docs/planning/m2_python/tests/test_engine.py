@@ -0,0 +1,102 @@
+# Backends and schedulers of GraphUnfoldingMachine must not change a run: dict vs CompactGUMGraph,
+# frontier scheduling, and the NumPy CA stepper against the scalar step. RuleIndex, which they all share, is
+# checked against a linear rule_matches scan.
+
+import random
+
+import pytest
+
+from conftest import STATES, final_graph, random_case, random_machine
+from compact_graph import CompactGUMGraph
+from genome_loader import machine_from_config
+from python_implementation import CountCompare, RuleIndex, rule_matches
+
+RUN = dict(max_steps=40, max_vertices=400)
+VARIANTS = {"compact": dict(graph=CompactGUMGraph), "frontier": dict(frontier=True), "scalar": dict(vectorize_ca=False),
+            "compact_frontier": dict(graph=CompactGUMGraph, frontier=True)}
+
+def _run(cfg, graph=None, **kw):
+    m = machine_from_config(cfg, graph=graph() if graph else None, **RUN, **kw); m.run()
+    return final_graph(m)
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_shipped_genome_variants_match(genome, variant):
+    assert _run(genome, **VARIANTS[variant]) == _run(genome)
+
+def test_vector_stepper_matches_scalar(genome):
+    pytest.importorskip("numpy")
+    from ca_engine import is_fixed_topology
+    m = machine_from_config(genome, maintain_single_component=False, reseed_isolated_A=False, **RUN)
+    if not is_fixed_topology(m): pytest.skip("not a fixed-topology genome")
+    m.run()
+    assert final_graph(m) == _run(genome, maintain_single_component=False, reseed_isolated_A=False, vectorize_ca=False)
+
+@pytest.mark.parametrize("seed", range(150))
+def test_random_tables_match_across_variants(seed):
+    ref = random_machine(seed, vectorize_ca=False); ref.run()
+    for name, kw in VARIANTS.items():
+        kw = dict(kw); graph = kw.pop("graph", None)
+        m = random_machine(seed, graph=graph() if graph else None, **kw); m.run()
+        assert final_graph(m) == final_graph(ref), name
+
+def _linear_find(rules, mode, state, prior, degree, parents, conn_by_state, start):
+    """The change-table scan RuleIndex replaces: first match from `start`, then (start > 0) wrap around to it."""
+    for lo, hi in ((start, len(rules)), (0, start)):
+        for i in range(lo, hi):
+            if rule_matches(state, prior, degree, parents, rules[i], mode, conn_by_state): return rules[i], i
+    return None, -1
+
+@pytest.mark.parametrize("mode", list(CountCompare))
+@pytest.mark.parametrize("seed", range(100))
+def test_rule_index_finds_the_first_linear_match(seed, mode):
+    """Checked against rule_matches directly: every variant above shares RuleIndex, so they cannot catch its bugs."""
+    rules = random_case(seed)[0]; rng = random.Random(seed)
+    index = RuleIndex(rules, mode)
+    for _ in range(200):
+        state, prior = rng.choice(STATES), rng.choice(["Unknown", *STATES])
+        degree, parents = rng.randint(0, 6), rng.randint(0, 6)
+        conn_by_state = {s: rng.randint(0, 4) for s in STATES if rng.random() < 0.6}
+        assert index.find(state, prior, degree, parents, conn_by_state) == \
+            _linear_find(rules, mode, state, prior, degree, parents, conn_by_state, 0)  # resettable
+        start = rng.randrange(len(rules))
+        assert index.find(state, prior, degree, parents, conn_by_state, start=start, wrap=True) == \
+            _linear_find(rules, mode, state, prior, degree, parents, conn_by_state, start)  # continuable
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("single", [False, True])
+def test_hand_set_deletion_flags_match_across_backends(seed, single):
+    runs = []
+    for graph in (None, CompactGUMGraph()):
+        m = random_machine(seed, graph=graph, maintain_single_component=single, vectorize_ca=False)
+        for nid in m.graph.node_ids()[::2]: m.graph.node(nid)["marked_deleted"] = True
+        m.run(); runs.append(final_graph(m))
+        assert not m.graph.marked_ids()
+    assert runs[0] == runs[1]
+
+@pytest.mark.parametrize("graph", [None, CompactGUMGraph], ids=["dict", "compact"])
+def test_delete_marked_follows_the_flags(graph):
+    m = random_machine(0, graph=graph() if graph else None); g = m.graph
+    a, b, c = (g.add_vertex("A") for _ in range(3))
+    g.mark_deleted(a); g.mark_deleted(b); g.node(b)["marked_deleted"] = False
+    g.node(c)["marked_deleted"] = True; g.sync_marked()
+    assert g.marked_ids() == [a, c]
+    assert g.delete_marked() == [a, c] and not g.marked_ids() and b in g.node_ids()
+
+@pytest.mark.parametrize("graph", [None, CompactGUMGraph], ids=["dict", "compact"])
+def test_hand_set_flags_mid_run(graph):
+    """A flag set by hand mid-run is honored by the end of the run on both backends, as are mark_deleted() and sync_marked()."""
+    for seed in range(40):
+        m = random_machine(seed, graph=graph() if graph else None, max_steps=3, max_vertices=30,
+                           maintain_single_component=False, vectorize_ca=False)
+        if len(m.graph.node_ids()) >= 3: break
+    picked = []
+    def flag(mm):
+        if mm.passed_steps != 1: return
+        g = mm.graph; by_hand, routed, synced = [nid for nid in g.node_ids() if not g.node(nid)["marked_deleted"]][:3]
+        g.node(synced)["marked_deleted"] = True; g.sync_marked()
+        g.node(by_hand)["marked_deleted"] = True; g.mark_deleted(routed)
+        picked.extend((by_hand, routed, synced))
+    m.run(checkpoint=flag, checkpoint_every=1)
+    by_hand, routed, synced = picked; g = m.graph
+    assert not g.has_node(routed) and not g.has_node(synced) and not g.has_node(by_hand)
+    assert not g.marked_ids()
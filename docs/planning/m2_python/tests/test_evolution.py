@@ -0,0 +1,87 @@
+# genome_key merges equivalent rule tables only; FitnessCache evicts and persists; variation keeps tables non-empty.
+
+import copy
+import math
+import random
+
+import pytest
+
+from conftest import GENOMES, STATES
+from evolution import FitnessCache, crossover, genome_key, mutate, random_rule
+from genome_loader import load_genome, rule_to_config
+from python_implementation import Condition, Operation, OperationKind, Rule
+
+def _rule(current, kind="TurnToState", operand="B", prior="any", conn_ge=-1, conn_le=-1, enabled=True):
+    r = Rule(Condition(current, prior, conn_ge, conn_le), Operation(OperationKind(kind), operand)); r.is_enabled = enabled
+    return rule_to_config(r)
+
+def _genome(rules, **machine):
+    return {"machine": {"max_steps": 10, "max_vertices": 50, **machine}, "init_graph": {"nodes": ["A", "A"], "edges": [[1, 2]]},
+            "rules": rules}
+
+BASE = [_rule("A", operand="B"), _rule("B", "GiveBirthConnected", "C", conn_ge=1, conn_le=3)]
+
+EQUIVALENT = {  # case -> (genome, genome it must share a key with)
+    "disabled rule": (_genome(BASE[:1] + [_rule("C", "Die", None, enabled=False)] + BASE[1:]), _genome(BASE)),
+    "unreachable current": (_genome(BASE + [_rule("D", "GiveBirth", "A")]), _genome(BASE)),
+    "nearest options without nearest rules": (_genome(BASE, nearest_search={"max_depth": 5, "tie_breaker": "random"}), _genome(BASE)),
+    "rng seed without random picks": (_genome(BASE, rng_seed=99), _genome(BASE)),
+    "topology semantics without neighbor ops": (_genome(BASE, topology_semantics="live"), _genome(BASE)),
+    "transcription of a one-rule table": (_genome(BASE[:1], transcription="continuable"), _genome(BASE[:1])),
+}
+
+DIFFERENT = {
+    "operand": _genome([_rule("A", operand="C"), BASE[1]]),
+    "rule order": _genome([_rule("A", "GiveBirth", "B"), _rule("A", operand="B"), BASE[1]]),
+    "bounds": _genome([BASE[0], _rule("B", "GiveBirthConnected", "C", conn_ge=1, conn_le=4)]),
+    "prior": _genome([_rule("A", operand="B", prior="B"), BASE[1]]),
+    "max_steps": _genome(BASE, max_steps=11),
+    "init graph": {**_genome(BASE), "init_graph": {"nodes": ["A", "B"], "edges": [[1, 2]]}},
+    "components": _genome(BASE, maintain_single_component=False),
+}
+
+@pytest.mark.parametrize("case", EQUIVALENT)
+def test_equivalent_tables_share_a_key(case):
+    a, b = EQUIVALENT[case]
+    assert genome_key(a) == genome_key(b)
+
+def test_exact_and_range_bounds_share_a_key():
+    exact = _genome([BASE[0], _rule("B", "GiveBirthConnected", "C", conn_ge=2)], count_compare="exact")
+    rng = _genome([BASE[0], _rule("B", "GiveBirthConnected", "C", conn_ge=2, conn_le=2)], count_compare="range")
+    assert genome_key(exact) == genome_key(rng)
+    assert genome_key(exact) != genome_key(_genome([BASE[0], _rule("B", "GiveBirthConnected", "C", conn_ge=2)]))
+
+@pytest.mark.parametrize("case", DIFFERENT)
+def test_different_tables_get_different_keys(case):
+    assert genome_key(DIFFERENT[case]) != genome_key(_genome(BASE))
+
+def test_salt_and_shipped_genomes():
+    keys = {genome_key(load_genome(p)) for p in sorted(GENOMES.glob("*.yaml"))}
+    assert len(keys) == len(list(GENOMES.glob("*.yaml")))
+    cfg = _genome(BASE)
+    assert genome_key(cfg, "degree") != genome_key(cfg, "size") and genome_key(copy.deepcopy(cfg)) == genome_key(cfg)
+
+def test_cache_evicts_least_recently_used():
+    c = FitnessCache(capacity=2)
+    c.put("a", 1.0); c.put("b", 2.0); assert c.get("a") == 1.0
+    c.put("c", 3.0)  # "b" is the least recently used now
+    assert c.get("b") is None and c.get("a") == 1.0 and c.get("c") == 3.0
+    assert (c.hits, c.misses) == (3, 1)
+
+def test_cache_falls_through_to_dbm(tmp_path):
+    path = tmp_path / "fitness.db"
+    with FitnessCache(path, capacity=1) as c:
+        c.put("bad", -math.inf); c.put("good", 0.25)
+        assert c.get("bad") == -math.inf  # evicted from the LRU, read back from the file
+    with FitnessCache(path) as c:
+        assert c.get("bad") == -math.inf and c.get("good") == 0.25 and c.get("other") is None
+        assert (c.hits, c.misses) == (2, 1)
+
+@pytest.mark.parametrize("seed", range(200))
+def test_variation_never_empties_a_table(seed):
+    rng = random.Random(seed); states = list(STATES)
+    a = [random_rule(rng, states) for _ in range(rng.randint(1, 4))]
+    b = [random_rule(rng, states) for _ in range(rng.randint(1, 4))]
+    for _ in range(20):
+        a = mutate(a, rng, states, rate=0.5, structural=0.9); assert a
+        c = crossover(a, b, rng); assert c
@@ -0,0 +1,40 @@
+# scripts/generate_graphs.py: the NumPy edge builders give the pure-Python edges, and the default output
+# is byte-identical to the 10x20 substrates the script wrote before streaming (tests/data/substrates).
+
+from pathlib import Path
+
+import pytest
+
+from conftest import load_script
+
+gg = load_script("generate_graphs.py", "generate_graphs")
+SUBSTRATES = Path(__file__).resolve().parent / "data" / "substrates"
+LATTICES = {"strip": (gg.edge_array_diagonal_strip_cylinder, gg.iter_edges_diagonal_strip_cylinder),
+            "torus": (gg.edge_array_torus, gg.iter_edges_torus),
+            "cylinder": (gg.edge_array_cylinder_grid, gg.iter_edges_cylinder_grid)}
+SIZES = [(3, 3), (3, 7), (3, 20), (4, 4), (5, 3), (10, 20), (2, 2), (1, 5)]
+
+@pytest.mark.parametrize("lattice", LATTICES)
+@pytest.mark.parametrize("L, W", SIZES)
+def test_edge_arrays_match_iter_edges(lattice, L, W):
+    pytest.importorskip("numpy")
+    array_fn, iter_fn = LATTICES[lattice]; p = gg.Params(L=L, W=W)
+    assert [tuple(e) for e in array_fn(p).tolist()] == list(iter_fn(p))
+
+@pytest.mark.parametrize("hole", [(0, 0, 0, 0), (1, 1, 1, 2), (4, 9, 2, 2), (0, 0, 3, 1)])
+@pytest.mark.parametrize("L, W", [(3, 7), (6, 8), (10, 20)])
+def test_quad_mesh_edge_array_matches_iter_edges(hole, L, W):
+    pytest.importorskip("numpy")
+    r0, c0, h, w = hole
+    p = gg.Params(quad_L=L, quad_W=W, hole_r0=r0, hole_c0=c0, hole_h=h, hole_w=w)
+    _, mask = gg.generate_nodes_quad_mesh_with_hole(p)
+    assert [tuple(e) for e in gg.edge_array_quad_mesh_with_hole(p, mask).tolist()] == list(gg.iter_edges_quad_mesh_with_hole(p, mask))
+
+@pytest.mark.parametrize("stream", [False, True], ids=["arrays", "stream"])
+def test_default_output_matches_checked_in_files(stream, tmp_path, capsys):
+    if not stream: pytest.importorskip("numpy")
+    gg.main(["--out-dir", str(tmp_path)] + (["--stream"] if stream else []))
+    want = sorted(p.name for p in SUBSTRATES.glob("*.yaml"))
+    assert sorted(p.name for p in tmp_path.iterdir()) == want and len(want) == 4
+    for name in want:
+        assert (tmp_path / name).read_bytes() == (SUBSTRATES / name).read_bytes(), name
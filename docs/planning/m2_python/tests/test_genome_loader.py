@@ -0,0 +1,71 @@
+# The init_graph fast path parses exactly what yaml.safe_load does, and the .gumb cache follows the file's content.
+
+import pytest
+
+yaml = pytest.importorskip("yaml")
+
+import genome_loader  # noqa: E402
+from conftest import GENOME_PATHS, genome_ids  # noqa: E402
+from genome_loader import _fast_parse, cached_binary_path, load_genome, parse_genome  # noqa: E402
+
+HEAD = "machine:\n  max_steps: 5\n"
+RULES = "rules: []\n"
+
+@pytest.mark.parametrize("path", GENOME_PATHS, ids=genome_ids(GENOME_PATHS))
+def test_shipped_genomes_parse_as_safe_load(path):
+    text = path.read_text(encoding="utf-8")
+    assert parse_genome(text) == yaml.safe_load(text)
+
+def test_some_shipped_genomes_take_the_fast_path():
+    assert any(_fast_parse(p.read_text(encoding="utf-8")) is not None for p in GENOME_PATHS)
+
+# init_graph block -> whether the fast path takes it (False: it must fall back to yaml.safe_load)
+CASES = {
+    "flow_nodes_block_edges": ("  nodes: [A, B, C]\n  edges:\n    - [0, 1]\n    - [1, 2]\n", True),
+    "line_end_comments": ("  nodes: [A, B, C]  # row 0\n  edges:\n    - [0, 1]  # first\n    - [1, 2]\n", True),
+    "comments_and_blank_lines_in_edges": ("  nodes: [A, B, C]\n  edges:\n    - [0, 1]\n\n    # a comment line\n    - [1, 2]\n", False),
+    "comment_inside_flow_nodes": ("  nodes: [A, B, # first two\n    C]\n", True),
+    "holes_and_unknown": ("  nodes: [A, -, Unknown, B]\n", True),
+    "trailing_comma": ("  nodes: [A, B, ]\n  edges:\n    - [0, 1]\n", True),
+    "negative_ids": ("  nodes: [A, B]\n  edges:\n    - [-1, 1]\n", True),
+    "quoted_states": ("  nodes: [\"A\", 'B']\n  edges:\n    - [0, 1]\n", False),
+    "leading_zero_ints": ("  nodes: [A, B]\n  edges:\n    - [0, 1]\n    - [010, 1]\n", False),
+    "long_form_nodes": ("  nodes:\n    - {state: A}\n    - {state: B}\n  edges: [[0, 1]]\n", False),
+    "long_form_nodes_block_edges": ("  nodes:\n    - {state: A}\n  edges:\n    - [0, 0]\n", True),  # edges only
+    "flow_edges": ("  nodes: [A, B]\n  edges: [[0, 1]]\n", True),  # nodes only; YAML reads the edges
+    "long_state_name": ("  nodes: [AB, C]\n", False),
+}
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("where", ["middle", "last"])
+def test_edge_cases_parse_as_safe_load(case, where):
+    block, fast = CASES[case]
+    text = HEAD + "init_graph:\n" + block + RULES if where == "middle" else HEAD + RULES + "init_graph:\n" + block
+    want = yaml.safe_load(text)
+    assert parse_genome(text) == want
+    assert _fast_parse(text) == (want if fast else None)
+
+def test_no_fast_path_without_an_init_graph_block():
+    assert _fast_parse(HEAD + RULES) is None  # no init_graph at all
+    assert _fast_parse("init_graph:\n  nodes: [A, B\n") is None  # not YAML
+
+def test_cache_hit_skips_parsing(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    src = tmp_path / "g.yaml"; src.write_text((GENOME_PATHS[0]).read_text(encoding="utf-8"), encoding="utf-8")
+    cache = tmp_path / "cache"; want = load_genome(src)
+    assert load_genome(src, cache_dir=cache) == want and cached_binary_path(src, cache).exists()
+    genome_loader._open_binary.cache_clear()  # as in a fresh process
+    def no_parse(text): raise AssertionError("cache hit should not parse YAML")
+    monkeypatch.setattr(genome_loader, "parse_genome", no_parse)
+    assert load_genome(src, cache_dir=cache) == want
+
+def test_cache_follows_file_changes(tmp_path):
+    pytest.importorskip("numpy")
+    src = tmp_path / "g.yaml"; cache = tmp_path / "cache"
+    src.write_text(HEAD + "init_graph:\n  nodes: [A, B]\n  edges:\n    - [0, 1]\n" + RULES, encoding="utf-8")
+    first = load_genome(src, cache_dir=cache); old = cached_binary_path(src, cache)
+    src.write_text(HEAD + "init_graph:\n  nodes: [A, B, C]\n  edges:\n    - [0, 1]\n    - [1, 2]\n" + RULES, encoding="utf-8")
+    second = load_genome(src, cache_dir=cache); new = cached_binary_path(src, cache)
+    assert new != old and new.exists()
+    assert first["init_graph"]["nodes"] == ["A", "B"] and second == load_genome(src)
+    assert second["init_graph"]["nodes"] == ["A", "B", "C"]
@@ -0,0 +1,41 @@
+# A genome loads and runs the same from YAML (graph_from_config) and from .gumb (graph_from_binary),
+# including '-' hole cells of generated quad meshes.
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from conftest import final_graph
+from genome_loader import graph_from_config, machine_from_config
+from gum_binary import GumBinary, binary_to_genome, genome_to_binary, graph_from_binary, machine_from_binary
+from python_implementation import GUMGraph
+
+def holed_mesh(cfg, L=10, W=20, hole=(4, 9, 2, 2)):
+    """`cfg` on an L x W quad mesh laid out as generate_graphs.py does, with a '-' hole."""
+    r0, c0, h, w = hole
+    cut = [[r0 <= r < r0 + h and c0 <= c < c0 + w for c in range(W)] for r in range(L)]
+    nodes = ["-" if cut[r][c] else "A" for r in range(L) for c in range(W)]
+    edges = [[r * W + c + 1, rr * W + cc + 1] for r in range(L) for c in range(W) if not cut[r][c]
+             for rr, cc in ((r, c + 1), (r + 1, c)) if rr < L and cc < W and not cut[rr][cc]]
+    return {**cfg, "init_graph": {"nodes": nodes, "edges": edges}}
+
+def _shape(g): return [(nid, g.node(nid)["state"]) for nid in g.node_ids()], sorted(g.edges())
+
+def _check_roundtrip(cfg, tmp_path):
+    path = tmp_path / "g.gumb"; genome_to_binary(cfg, path)
+    assert binary_to_genome(path) == cfg
+    b = GumBinary(path)
+    yaml_graph, _ = graph_from_config(cfg, GUMGraph()); bin_graph, _ = graph_from_binary(b)
+    assert yaml_graph.node_count() == bin_graph.node_count()
+    assert _shape(yaml_graph) == _shape(bin_graph)
+    ym, bm = machine_from_config(cfg, max_steps=50), machine_from_binary(b, max_steps=50)
+    ym.run(); bm.run()
+    assert final_graph(ym) == final_graph(bm)
+
+def test_roundtrip(genome, tmp_path):
+    _check_roundtrip(genome, tmp_path)
+
+def test_roundtrip_holed_mesh(genome, tmp_path):
+    cfg = holed_mesh(genome)
+    assert graph_from_config(cfg, GUMGraph())[0].node_count() == 196  # 200 cells, 4 of them holes
+    _check_roundtrip(cfg, tmp_path)
@@ -0,0 +1,26 @@
+# run_seeds gives each seed the result of a freshly built machine, and shares one run only when no seed matters.
+
+import pytest
+
+from conftest import GENOMES
+from genome_loader import load_genome, machine_from_config
+from multiseed import CompiledGenome, run_seeds
+
+RUN = dict(max_steps=40, max_vertices=300)
+
+@pytest.mark.parametrize("overrides", [{}, {"nearest_tie_breaker": "random"}, {"nearest_tie_breaker": "random", "prune_rules": True}])
+def test_seeds_match_fresh_machines(overrides):
+    cfg = load_genome(GENOMES / "dumbbell_and_hairy_circle_hybrid.yaml")
+    recs = run_seeds(CompiledGenome(cfg), range(4), **RUN, **overrides)
+    assert all(r.get("shared") for r in recs) == (not overrides)
+    for r in recs:
+        m = machine_from_config(cfg, rng_seed=r["seed"], **RUN, **overrides); m.run()
+        assert (r["steps"], r["nodes"], r["edges"]) == (m.passed_steps, m.graph.node_count(), m.graph.edge_count())
+
+def test_rule_index_compiled_once(monkeypatch):
+    import python_implementation
+    genome = CompiledGenome(load_genome(GENOMES / "dumbbell.yaml"))
+    calls = []; compile_ = python_implementation.RuleIndex.__init__
+    monkeypatch.setattr(python_implementation.RuleIndex, "__init__", lambda self, *a, **kw: calls.append(1) or compile_(self, *a, **kw))
+    run_seeds(genome, range(3), nearest_tie_breaker="random", **RUN)
+    assert calls == []
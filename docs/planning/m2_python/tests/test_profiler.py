@@ -0,0 +1,59 @@
+# StepProfiler keeps its per-phase split of scalar steps when a TrajectoryRecorder wraps the step too,
+# numbers steps as the machine does, and counts BFS expansions the same way on both backends.
+
+import pytest
+
+from compact_graph import CompactGUMGraph
+from conftest import GENOMES
+from genome_loader import load_genome, machine_from_config
+from profiler import StepProfiler
+from trajectory import TrajectoryRecorder
+
+SCALAR = {"snapshot", "lookup", "apply", "other"}
+
+def _phases(genome, graph, path=None):
+    prof = StepProfiler(count_edges=False)
+    m = machine_from_config(genome, max_steps=20, max_vertices=400, graph=graph() if graph else None, profiler=prof,
+                            recorder=TrajectoryRecorder(path) if path else None)
+    m.run()
+    return [set(r["phases"]) - {"delete"} for r in prof.records]
+
+@pytest.mark.parametrize("graph", [None, CompactGUMGraph], ids=["dict", "compact"])
+def test_recorder_keeps_phase_breakdown(genome, graph, tmp_path):
+    plain = _phases(genome, graph)
+    assert plain and all(p in (SCALAR, {"ca_step"}) for p in plain)
+    assert _phases(genome, graph, tmp_path / "run.gumt") == plain
+
+def test_scalar_steps_are_split_with_recorder(tmp_path):
+    phases = _phases(load_genome(GENOMES / "dumbbell.yaml"), None, tmp_path / "run.gumt")
+    assert all(p == SCALAR for p in phases)
+
+def test_resumed_run_keeps_the_machine_step_numbers(tmp_path):
+    from checkpoint import load_checkpoint, save_checkpoint
+    cfg = load_genome(GENOMES / "dumbbell.yaml"); ckpt = tmp_path / "run.ckpt"
+    m = machine_from_config(cfg, max_steps=30, profiler=StepProfiler())
+    m.run(checkpoint=lambda mm: mm.passed_steps == 10 and save_checkpoint(mm, ckpt), checkpoint_every=1)
+    straight = m.profiler.records
+    assert [r["step"] for r in straight] == list(range(m.passed_steps))
+    m = load_checkpoint(ckpt); m.profiler = prof = StepProfiler(); m.run(resume=True)
+    assert [r["step"] for r in prof.records] == list(range(10, m.passed_steps))
+    assert [r["nodes"] for r in prof.records] == [r["nodes"] for r in straight[10:]]
+    assert prof.summary()["slowest_step"] in {r["step"] for r in prof.records}
+
+def _bfs(genome, graph):
+    prof = StepProfiler(count_edges=False)
+    machine_from_config(genome, max_steps=60, max_vertices=400, graph=graph() if graph else None, profiler=prof).run()
+    return [r["bfs_expansions"] for r in prof.records]
+
+def test_bfs_expansions_match_across_backends(genome):
+    assert _bfs(genome, CompactGUMGraph) == _bfs(genome, None)
+
+def test_bfs_expansions_count_search_pops():
+    from python_implementation import GUMGraph, nearest_candidates
+    g = GUMGraph(); ids = [g.add_vertex("A") for _ in range(5)]
+    for a, b in zip(ids, ids[1:]): g.add_edge(a, b)
+    # path 0-1-2-3-4: looking for state B from 0 at depth 3 expands 0, 1 and 2 (3 is at the depth limit)
+    found, expanded = nearest_candidates(ids[0], 3, g.sorted_neighbors, lambda v: g.node(v)["state"] == "B")
+    assert found == [] and expanded == 3
+    g.try_connect_with_nearest(ids[0], required_state="B", max_depth=3)
+    assert g.bfs_expansions == 3
@@ -0,0 +1,33 @@
+# Pruning dead and shadowed rules never changes a run.
+
+import pytest
+
+from conftest import final_graph, random_machine
+from genome_loader import machine_from_config
+from rule_analysis import analyze_machine, prune_machine
+
+def _outcome(m):
+    passed, nodes, edges, _ = final_graph(m)  # activation counters are per table index
+    return passed, nodes, edges
+
+@pytest.mark.parametrize("transcription", ["resettable", "continuable"])
+def test_prune_rules_is_result_neutral(genome, transcription):
+    kw = dict(max_steps=40, max_vertices=400, transcription=transcription)
+    ref = machine_from_config(genome, **kw); ref.run()
+    m = machine_from_config(genome, prune_rules=True, **kw); m.run()
+    assert final_graph(m) == final_graph(ref)
+    p = machine_from_config(genome, **kw); prune_machine(p); p.run()
+    assert _outcome(p) == _outcome(ref)
+
+@pytest.mark.parametrize("seed", range(200))
+def test_prune_random_tables(seed):
+    ref = random_machine(seed); ref.run()
+    m = random_machine(seed, prune_rules=True); m.run()
+    assert final_graph(m) == final_graph(ref)
+    p = random_machine(seed); prune_machine(p); p.run()
+    assert _outcome(p) == _outcome(ref)
+
+def test_disabled_rules_are_dead():
+    m = random_machine(0)
+    for r in m.change_table: r.is_enabled = False
+    assert analyze_machine(m).live == []
@@ -0,0 +1,53 @@
+# A run on a SharedSubstrateGraph matches the same run on a CompactGUMGraph built from the same init graph,
+# while the worker pays only for node columns and the adjacency rows a run changes.
+
+import pytest
+
+from compact_graph import CompactGUMGraph
+from conftest import final_graph
+from genome_loader import machine_from_config
+from shared_substrate import SharedSubstrate
+
+def _without_init_graph(cfg): return {k: v for k, v in cfg.items() if k != "init_graph"}
+
+@pytest.mark.parametrize("frontier", [False, True])
+def test_shared_run_matches_compact(genome, frontier):
+    kw = dict(max_steps=30, max_vertices=400, frontier=frontier)
+    try:
+        sub = SharedSubstrate.from_genome(genome)
+    except (KeyError, ValueError):
+        pytest.skip("init states outside the compact backend's codes")
+    with sub:
+        ref = machine_from_config(genome, graph=CompactGUMGraph(), **kw); ref.run()
+        m = machine_from_config(_without_init_graph(genome), graph=sub.graph(), **kw); m.run()
+        assert final_graph(m) == final_graph(ref)
+        del m
+
+def test_substrate_graph_costs_only_node_columns():
+    import tracemalloc
+    n = 50_000
+    with SharedSubstrate.create(["A"] * n, [(k, (k + 1) % n) for k in range(n)]) as sub:
+        tracemalloc.start()
+        try:
+            g = sub.graph(); kept, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert kept < 32 * n  # ~21 bytes of node columns per node; no per-node id map or pending set
+        assert g.node_count() == n and g.edge_count() == n and g.copied_rows() == 0
+        del g
+
+def test_substrate_graph_behaves_like_compact():
+    n = 400; ring = [(k, (k + 1) % n) for k in range(n)]
+    with SharedSubstrate.create(["A"] * n, ring) as sub:
+        g = sub.graph()
+        assert g.node_ids() == list(range(n)) and g.edge_count() == n
+        assert g.snapshot_nodes() == set(range(n)) and g.snapshot_nodes() == set()
+        g.mark_deleted(5); assert g.delete_marked() == [5]
+        assert g.copied_rows() == 3  # 4 and 6 lost their edge to 5; 5's row was dropped
+        nid = g.add_vertex("B"); g.add_edge(nid, 6)
+        assert nid == n and g.has_node(nid) and not g.has_node(5) and g.node_count() == n
+        assert g.copied_rows() == 3 and list(g.sorted_neighbors(6)) == [7, n]  # the birth reused 5's slot
+        assert g.node_ids() == [k for k in range(n) if k != 5] + [n]
+        assert sorted(g.edges()) == sorted({tuple(sorted(e)) for e in ring if 5 not in e} | {(6, n)})
+        assert g.snapshot_nodes() == {4, 6, nid}
+        del g
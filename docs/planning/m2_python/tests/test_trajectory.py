@@ -0,0 +1,79 @@
+# A recorded trajectory replays every step of the run it was recorded from.
+
+import pytest
+
+from compact_graph import CompactGUMGraph
+from conftest import random_machine
+from genome_loader import machine_from_config
+from trajectory import TrajectoryReader, TrajectoryRecorder
+
+def _graph_now(g):
+    return ({nid: (g.node(nid)["state"], g.node(nid)["parents_count"]) for nid in g.node_ids()},
+            sorted((a, b) if a < b else (b, a) for a, b in g.edges()))
+
+def _record(make, path, keyframe_every):
+    """Runs make() under a recorder; returns the graph after every step (and the end-of-run deletions)."""
+    seen = {}
+    m = make(); m.recorder = TrajectoryRecorder(path, keyframe_every=keyframe_every)
+    seen[0] = _graph_now(m.graph)
+    m.run(checkpoint=lambda mm: seen.__setitem__(mm.passed_steps, _graph_now(mm.graph)), checkpoint_every=1)
+    seen[m.passed_steps] = _graph_now(m.graph)
+    return seen
+
+def _assert_replays(seen, path):
+    traj = TrajectoryReader(path)
+    for step, want in seen.items():
+        assert traj.state_at(step) == want, step
+
+@pytest.mark.parametrize("graph", [None, CompactGUMGraph], ids=["dict", "compact"])
+def test_replay_shipped_genomes(genome, graph, tmp_path):
+    path = tmp_path / "run.gumt"
+    seen = _record(lambda: machine_from_config(genome, max_steps=30, max_vertices=400, graph=graph() if graph else None), path, 7)
+    _assert_replays(seen, path)
+
+@pytest.mark.parametrize("seed", range(80))
+def test_replay_random_tables(seed, tmp_path):
+    path = tmp_path / "run.gumt"
+    _assert_replays(_record(lambda: random_machine(seed), path, 5), path)
+
+@pytest.mark.parametrize("graph", [None, CompactGUMGraph], ids=["dict", "compact"])
+def test_deltas_do_not_depend_on_keyframes(genome, graph, tmp_path):
+    """A keyframe step's ops still come back: the step's delta frame is written before its keyframe."""
+    make = lambda: machine_from_config(genome, max_steps=20, max_vertices=400, graph=graph() if graph else None)
+    _record(make, tmp_path / "k.gumt", 5); _record(make, tmp_path / "none.gumt", 0)
+    with_kf, without = TrajectoryReader(tmp_path / "k.gumt"), TrajectoryReader(tmp_path / "none.gumt")
+    assert with_kf.last_step == without.last_step
+    for s in range(without.last_step + 2):
+        assert with_kf.deltas(s) == without.deltas(s), s
+
+@pytest.mark.parametrize("keyframe_every", [4, 100])
+@pytest.mark.parametrize("cut", ["none", "header", "mid_frame"])
+def test_append_after_crash(cut, keyframe_every, tmp_path):
+    """Record, crash (file cut at `cut`), resume from the step-10 checkpoint with append=True: every step replays."""
+    from checkpoint import load_checkpoint, save_checkpoint
+    from conftest import GENOMES
+    from genome_loader import load_genome
+    from trajectory import DELTA, KEYFRAME
+    cfg = load_genome(GENOMES / "dumbbell.yaml")
+    path, ckpt = tmp_path / "run.gumt", tmp_path / "run.ckpt"
+    make = lambda: machine_from_config(cfg, max_steps=30)
+    seen = _record(make, tmp_path / "ref.gumt", keyframe_every)
+
+    m = make(); m.recorder = TrajectoryRecorder(path, keyframe_every=keyframe_every)
+    m.run(checkpoint=lambda mm: mm.passed_steps == 10 and save_checkpoint(mm, ckpt), checkpoint_every=1)
+    data = path.read_bytes()
+    if cut == "header": data = data[:3]
+    elif cut == "mid_frame":
+        _, _, a, b = [f for f in TrajectoryReader(path).frames if f[1] == 13][0]
+        data = data[:(a + b) // 2]
+    path.write_bytes(data)
+
+    m = load_checkpoint(ckpt); m.recorder = TrajectoryRecorder(path, keyframe_every=keyframe_every, append=True)
+    m.run(resume=True)
+    seen_after = {s: v for s, v in seen.items() if s >= 10 or cut != "header"}
+    _assert_replays(seen_after, path)
+    frames = [(kind, step) for kind, step, _, _ in TrajectoryReader(path).frames]
+    assert {kind for kind, _ in frames} <= {KEYFRAME, DELTA}
+    assert [step for _, step in frames] == sorted(step for _, step in frames)
+    deltas = [step for kind, step in frames if kind == DELTA]
+    assert len(deltas) - len(set(deltas)) <= 1  # only the end-of-run deletions share the last step number
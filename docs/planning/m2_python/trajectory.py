@@ -0,0 +1,332 @@
+# docs/planning/m2_python/trajectory.py  (reference only; delta-log trajectory recording for GraphUnfoldingMachine)
+#
+#   python trajectory.py ../../../data/genoms/dumbbell.yaml dumbbell.gumt --keyframe-every 50
+#   python trajectory.py --inspect dumbbell.gumt --step 37
+#
+#   machine.recorder = TrajectoryRecorder("run.gumt", keyframe_every=100); machine.run()
+#   traj = TrajectoryReader("run.gumt"); nodes, edges = traj.state_at(37)   # {id: (state, parents)}, [(a, b), ...]
+#
+# File: b"GUMT" + varint version, then frames appended as the run goes:
+#   frame    kind byte (K keyframe, D delta) | varint step | varint payload length | payload
+#   keyframe the graph after `step` steps: state name table, id counter, nodes as (id gap, state code,
+#            parents_count) in id order, edges as sorted (a gap, b - a) pairs
+#   delta    the changes made during step `step`, as varint ops (below), in the order they happened
+# Ops: STATE id code | BIRTH id code parents | EDGE_ADD a b | EDGE_DEL a b | DELETE id (drops its edges)
+#      | PARENTS id value (hand edits, e.g. the reseed pass) | NAME code utf-8 (a state first seen).
+# Step 0 is a keyframe of the graph run() starts from; the deletions at the end of run() are one more
+# delta frame with the last step's number. A reader seeks to step s by replaying, in file order, the
+# delta frames with step <= s that follow the last keyframe with step <= s. Frames are self-delimiting,
+# so a file cut short by a crash reads up to its last complete frame. Appending to such a file (a run
+# resumed from a checkpoint at step p) first truncates it after the last complete frame with step <= p,
+# which drops a torn tail and the deltas of the steps the resumed run is about to redo.
+#
+# Recorded per node: state, parents_count and adjacency (prior_state, rule_index and the saved_*
+# snapshot are engine bookkeeping and are not stored).
+
+import sys
+from pathlib import Path
+
+MAGIC, VERSION = b"GUMT", 1
+KEYFRAME, DELTA = ord("K"), ord("D")
+STATE, BIRTH, EDGE_ADD, EDGE_DEL, DELETE, PARENTS, NAME = range(7)
+_ARITY = {STATE: 2, BIRTH: 3, EDGE_ADD: 2, EDGE_DEL: 2, DELETE: 1, PARENTS: 2}
+
+def _put(buf: bytearray, v: int):
+    while v > 0x7F:
+        buf.append((v & 0x7F) | 0x80); v >>= 7
+    buf.append(v)
+
+def _get(data, pos):
+    v = shift = 0
+    while True:
+        b = data[pos]; pos += 1
+        v |= (b & 0x7F) << shift
+        if b < 0x80: return v, pos
+        shift += 7
+
+def _put_str(buf: bytearray, s: str):
+    raw = s.encode("utf-8"); _put(buf, len(raw)); buf += raw
+
+def _get_str(data, pos):
+    n, pos = _get(data, pos)
+    return bytes(data[pos:pos + n]).decode("utf-8"), pos + n
+
+def _header(data):
+    """Position of the first frame, after the magic and version."""
+    if bytes(data[:4]) != MAGIC: raise ValueError("not a GUM trajectory")
+    version, pos = _get(data, 4)
+    if version > VERSION: raise ValueError(f"trajectory version {version} is newer than supported ({VERSION})")
+    return pos
+
+def _frames(data, pos):
+    """(kind, step, payload start, payload end) of each complete frame from `pos` on; stops at a torn one."""
+    end = len(data)
+    while pos < end:
+        try:
+            kind = data[pos]; step, p = _get(data, pos + 1); size, p = _get(data, p)
+        except IndexError:
+            return
+        if p + size > end: return
+        yield kind, step, p, p + size; pos = p + size
+
+class TrajectoryRecorder:
+    """
+    Writes a run's per-step deltas to `path`, with a keyframe every `keyframe_every` steps (0: only
+    the initial one). append=True continues an existing file, e.g. for a run resumed from a checkpoint:
+    it is first cut back to the last complete frame at or before the machine's passed_steps.
+
+    GraphUnfoldingMachine.run() attaches the recorder only when machine.recorder is set, the same way
+    as StepProfiler: the graph's mutators (add_vertex, set_state, add_edge, remove_edge, remove_vertex,
+    delete_marked, mark_dirty) are shadowed by recording wrappers for the duration of the run. Vectorized CA steps
+    are recorded by diffing the stepper's state vector.
+    """
+    def __init__(self, path, *, keyframe_every=100, append=False):
+        self.path = Path(path); self.keyframe_every = int(keyframe_every); self.append = append
+        self.frames = 0; self.bytes = 0
+        self._f = None; self._buf = bytearray(); self._codes = {}; self._patched = []; self._muted = False
+
+    # -- wiring (called by GraphUnfoldingMachine.run) --
+
+    def attach(self, machine, step, stepper=None):
+        """Installs the hooks, writes the step-0 keyframe; returns `step` wrapped to flush one delta frame per call."""
+        g = machine.graph; self._g = g; self._stepper = stepper
+        fresh = not (self.append and self.path.exists() and self.path.stat().st_size)
+        if not fresh: fresh = not self._truncate(machine.passed_steps)
+        self._f = open(self.path, "ab" if self.append else "wb")
+        if fresh:
+            head = bytearray(MAGIC); _put(head, VERSION); self._f.write(head)
+        self._codes = {}; self._buf = bytearray()
+        add_vertex, set_state, add_edge, remove_edge = g.add_vertex, g.set_state, g.add_edge, g.remove_edge
+        remove_vertex, delete_marked, mark_dirty = g.remove_vertex, g.delete_marked, g.mark_dirty
+        buf = self._buf; code = self._code
+
+        def rec_add_vertex(state, parents_count=0, mark_new=True):
+            nid = add_vertex(state, parents_count=parents_count, mark_new=mark_new)
+            c = code(state); _put(buf, BIRTH); _put(buf, nid); _put(buf, c); _put(buf, parents_count)
+            return nid
+        def rec_set_state(nid, state):
+            if not self._muted and g.node(nid)["state"] != state:
+                c = code(state); _put(buf, STATE); _put(buf, nid); _put(buf, c)
+            set_state(nid, state)
+        def linked(a, b):
+            return g.has_node(a) and g.has_node(b) and b in g.node(a)["neighbors"]
+        def rec_add_edge(a, b):
+            if a != b and g.has_node(a) and g.has_node(b) and not linked(a, b):
+                _put(buf, EDGE_ADD); _put(buf, a); _put(buf, b)
+            add_edge(a, b)
+        def rec_remove_edge(a, b):
+            if linked(a, b):
+                _put(buf, EDGE_DEL); _put(buf, a); _put(buf, b)
+            remove_edge(a, b)
+        def rec_remove_vertex(nid):
+            if g.has_node(nid): _put(buf, DELETE); _put(buf, nid)
+            remove_vertex(nid)
+        def rec_delete_marked():  # bulk removal, not through remove_vertex
+            gone = delete_marked()
+            for nid in gone: _put(buf, DELETE); _put(buf, nid)
+            return gone
+        def rec_mark_dirty(nid):
+            if g.has_node(nid): _put(buf, PARENTS); _put(buf, nid); _put(buf, int(g.node(nid)["parents_count"]))
+            mark_dirty(nid)
+
+        hooks = [(g, "add_vertex", rec_add_vertex), (g, "set_state", rec_set_state), (g, "add_edge", rec_add_edge),
+                 (g, "remove_edge", rec_remove_edge), (g, "remove_vertex", rec_remove_vertex),
+                 (g, "delete_marked", rec_delete_marked), (g, "mark_dirty", rec_mark_dirty)]
+        if stepper is not None:  # write_back replays states the diffs already recorded
+            write_back = stepper.write_back
+            def muted_write_back():
+                self._muted = True
+                try: write_back()
+                finally: self._muted = False
+            hooks.append((stepper, "write_back", muted_write_back))
+        for obj, name, fn in hooks: setattr(obj, name, fn)
+        self._patched = [(obj, name) for obj, name, _ in hooks]
+
+        self._keyframe(machine.passed_steps)
+        prev = [stepper.state] if stepper is not None else None
+        def recorded_step():
+            did = step()
+            if stepper is not None:
+                changed = (stepper.state != prev[0]).nonzero()[0]; names = stepper.names; ids = stepper.ids
+                for k in changed.tolist():
+                    c = code(names[stepper.state[k]]); _put(buf, STATE); _put(buf, ids[k]); _put(buf, c)
+                prev[0] = stepper.state
+            n = machine.passed_steps + 1  # run() counts the step after it returns
+            self._flush(n)
+            if self.keyframe_every and n % self.keyframe_every == 0: self._keyframe(n)
+            return did
+        self._machine = machine
+        return recorded_step
+
+    def detach(self):
+        """Removes the hooks, writes the end-of-run deletions and closes the file."""
+        for obj, name in self._patched:
+            obj.__dict__.pop(name, None)
+        self._patched = []
+        if self._f is None: return
+        if self._buf: self._flush(self._machine.passed_steps)
+        self._f.close(); self._f = None
+
+    def _truncate(self, step):
+        """Cuts the existing file after its last complete frame with step <= `step`; False if not even the header survived."""
+        data = self.path.read_bytes(); keep = 0
+        if len(data) > len(MAGIC):  # shorter: torn inside the header, start over
+            keep = _header(data)
+            for _, s, _, end in _frames(data, keep):
+                if s > step: break
+                keep = end
+        with open(self.path, "r+b") as f: f.truncate(keep)
+        return keep > 0
+
+    # -- encoding --
+
+    def _code(self, state):
+        """State code; a state's first use writes its NAME op, so call this before starting the op that uses it."""
+        k = self._codes.get(state)
+        if k is None:
+            k = self._codes[state] = len(self._codes)
+            _put(self._buf, NAME); _put(self._buf, k); _put_str(self._buf, str(state))
+        return k
+
+    def _frame(self, kind, step, payload):
+        head = bytearray((kind,)); _put(head, step); _put(head, len(payload))
+        self._f.write(head); self._f.write(payload)
+        self.frames += 1; self.bytes += len(head) + len(payload)
+
+    def _flush(self, step):
+        self._frame(DELTA, step, self._buf); self._buf.clear()
+
+    def _keyframe(self, step):
+        g = self._g; st = self._stepper
+        if st is not None:
+            live = dict(zip(st.ids, (st.names[c] for c in st.state.tolist())))
+            state_of = live.__getitem__
+        else:
+            state_of = lambda nid: g.node(nid)["state"]
+        ids = sorted(g.node_ids())
+        rows = [(nid, state_of(nid), int(g.node(nid)["parents_count"])) for nid in ids]
+        mark = len(self._buf)
+        for _, s, _ in rows: self._code(s)
+        del self._buf[mark:]  # the keyframe carries the whole name table
+        kf = bytearray(); names = sorted(self._codes, key=self._codes.get)
+        _put(kf, len(names))
+        for s in names: _put_str(kf, str(s))
+        _put(kf, g.next_id); _put(kf, len(rows)); last = 0
+        for nid, s, parents in rows:
+            _put(kf, nid - last); _put(kf, self._codes[s]); _put(kf, parents); last = nid
+        edges = sorted(g.edges()); _put(kf, len(edges)); last = 0
+        for a, b in edges:
+            _put(kf, a - last); _put(kf, b - a); last = a
+        self._frame(KEYFRAME, step, kf)
+
+class TrajectoryReader:
+    """
+    Random access to a recorded trajectory. Opening scans the frame headers once; state_at(step)
+    replays from the nearest keyframe at or before `step`.
+    """
+    def __init__(self, path):
+        self.data = memoryview(Path(path).read_bytes())
+        self.frames = list(_frames(self.data, _header(self.data)))  # (kind, step, payload start, payload end)
+        self.keyframes = [k for k, f in enumerate(self.frames) if f[0] == KEYFRAME]
+        if not self.keyframes: raise ValueError("trajectory has no keyframe")
+
+    @property
+    def first_step(self): return self.frames[self.keyframes[0]][1]
+    @property
+    def last_step(self): return max(f[1] for f in self.frames)
+
+    def _ops(self, start, end, names):
+        data = self.data; pos = start
+        while pos < end:
+            op, pos = _get(data, pos)
+            if op == NAME:
+                k, pos = _get(data, pos); s, pos = _get_str(data, pos)
+                while len(names) <= k: names.append(None)
+                names[k] = s; continue
+            args = []
+            for _ in range(_ARITY[op]):
+                v, pos = _get(data, pos); args.append(v)
+            yield op, args
+
+    def deltas(self, step):
+        """The ops recorded for `step`, as (op name, args) with state codes resolved to names."""
+        at = [k for k, f in enumerate(self.frames) if f[0] == DELTA and f[1] == step]
+        if not at: return []
+        # a step's delta frame precedes its own keyframe, so names come from the keyframe before that frame
+        k = max(k for k in self.keyframes if k < at[0])
+        names = self._read_keyframe(self.frames[k])[0]; out = []
+        for frame in self.frames[k + 1:at[-1] + 1]:
+            kind, s, a, b = frame
+            if kind == KEYFRAME:
+                names = self._read_keyframe(frame)[0]; continue
+            for op, args in self._ops(a, b, names):
+                if s != step: continue
+                if op in (STATE, BIRTH): args[1] = names[args[1]]
+                out.append((("STATE", "BIRTH", "EDGE_ADD", "EDGE_DEL", "DELETE", "PARENTS")[op], tuple(args)))
+        return out
+
+    def _read_keyframe(self, frame):
+        data = self.data; _, _, pos, _ = frame
+        n, pos = _get(data, pos); names = []
+        for _ in range(n):
+            s, pos = _get_str(data, pos); names.append(s)
+        _next, pos = _get(data, pos); n, pos = _get(data, pos)
+        nodes = {}; nid = 0
+        for _ in range(n):
+            gap, pos = _get(data, pos); c, pos = _get(data, pos); parents, pos = _get(data, pos)
+            nid += gap; nodes[nid] = [c, parents]
+        n, pos = _get(data, pos); adj = {nid: set() for nid in nodes}; a = 0
+        for _ in range(n):
+            gap, pos = _get(data, pos); d, pos = _get(data, pos)
+            a += gap; adj[a].add(a + d); adj[a + d].add(a)
+        return names, nodes, adj
+
+    def state_at(self, step):
+        """({id: (state, parents_count)}, sorted [(a, b)] with a < b) after `step` steps."""
+        if step < self.first_step: raise ValueError(f"step {step} precedes the first keyframe ({self.first_step})")
+        k = max(k for k in self.keyframes if self.frames[k][1] <= step)
+        names, nodes, adj = self._read_keyframe(self.frames[k])
+        for kind, s, a, b in self.frames[k + 1:]:
+            if kind != DELTA or s > step: continue
+            for op, args in self._ops(a, b, names):
+                if op == STATE: nodes[args[0]][0] = args[1]
+                elif op == BIRTH: nodes[args[0]] = [args[1], args[2]]; adj[args[0]] = set()
+                elif op == EDGE_ADD: adj[args[0]].add(args[1]); adj[args[1]].add(args[0])
+                elif op == EDGE_DEL: adj[args[0]].discard(args[1]); adj[args[1]].discard(args[0])
+                elif op == DELETE:
+                    for nb in adj.pop(args[0]): adj[nb].discard(args[0])
+                    del nodes[args[0]]
+                elif op == PARENTS: nodes[args[0]][1] = args[1]
+        states = {nid: (names[c], p) for nid, (c, p) in sorted(nodes.items())}
+        return states, sorted((a, b) for a, nbs in adj.items() for b in nbs if a < b)
+
+def main(argv=None) -> int:
+    import argparse
+    import json
+    ap = argparse.ArgumentParser(description="Record a genome's run as a delta-log trajectory, or inspect one.")
+    ap.add_argument("genome", nargs="?", help="genome .yaml or .gumb to run")
+    ap.add_argument("out", nargs="?", help="trajectory file to write")
+    ap.add_argument("--keyframe-every", type=int, default=100)
+    ap.add_argument("--max-steps", type=int, default=None)
+    ap.add_argument("--inspect", default=None, help="trajectory file to read instead of recording")
+    ap.add_argument("--step", type=int, default=None, help="with --inspect: print the graph after this step")
+    args = ap.parse_args(argv)
+    if args.inspect:
+        traj = TrajectoryReader(args.inspect)
+        info = {"frames": len(traj.frames), "keyframes": len(traj.keyframes), "first_step": traj.first_step,
+                "last_step": traj.last_step, "bytes": len(traj.data)}
+        if args.step is not None:
+            nodes, edges = traj.state_at(args.step)
+            info["state"] = {"step": args.step, "nodes": {str(k): v for k, v in nodes.items()}, "edges": edges}
+        print(json.dumps(info))
+        return 0
+    if not (args.genome and args.out): ap.error("genome and out are required unless --inspect is given")
+    from genome_loader import load_machine
+    rec = TrajectoryRecorder(args.out, keyframe_every=args.keyframe_every)
+    m = load_machine(args.genome, max_steps=args.max_steps, recorder=rec)
+    m.run()
+    print(json.dumps({"steps": m.passed_steps, "frames": rec.frames, "bytes": rec.bytes}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,43 +1,181 @@
-import xml.etree.ElementTree as ET
+#!/usr/bin/env python3
+"""
+Convert legacy gene dictionaries (dictGens.xaml: one <ChangeTable x:Key="..."> per genome) into genome
+YAML files or newline-delimited JSON, using the legacy -> new mapping in docs/planning/m2_python/description.md.
+
+  python scripts/01_convert_xml_genes_to_json.py dictGens.xaml --out-dir data/genoms/legacy
+  python scripts/01_convert_xml_genes_to_json.py dictGens.xaml --ndjson genes.ndjson      # '-' = stdout
+
+The XML is read with iterparse and every finished ChangeTable is converted, written and cleared before
+the next one is parsed, so memory stays flat regardless of dictionary size.
+"""
+from __future__ import annotations
+
+import argparse
 import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+LEGACY_ANY = {"Min", "Ignored"}  # legacy NodeState spellings of the wildcard
+LEGACY_KINDS = {"DisconectFrom": "DisconnectFrom"}
+
+
+def local(name: str) -> str:
+    """'{clr-namespace:...}ChangeTable' -> 'ChangeTable' (the XAML namespaces vary between exports)."""
+    return name.rsplit("}", 1)[-1]
+
+
+def attrs(elem: ET.Element) -> Dict[str, str]:
+    """Attributes by lower-cased local name: XAML uses CurrentState, older docs currentState."""
+    return {local(k).lower(): v for k, v in elem.attrib.items()}
+
+
+def find_local(elem: ET.Element, name: str) -> Optional[ET.Element]:
+    for e in elem.iter():
+        if local(e.tag) == name:
+            return e
+    return None
+
+
+def state(value: Optional[str], default: str = "any") -> str:
+    if value is None or value == "":
+        return default
+    return "any" if value in LEGACY_ANY else value
+
+
+def count(a: Dict[str, str], key: str) -> int:
+    v = a.get(key)
+    return int(v) if v not in (None, "") else -1
+
+
+def convert_item(item: ET.Element) -> Optional[dict]:
+    """One <ChangeTableItem> -> {condition, op}; None when it has no condition or operation."""
+    cond_el = find_local(item, "OperationCondition")
+    op_el = find_local(item, "Operation")
+    if cond_el is None or op_el is None:
+        return None
+    c, o = attrs(cond_el), attrs(op_el)
+    kind = o.get("kind", "")
+    operand = next((o[k] for k in ("operandnodestate", "operand", "state") if o.get(k) is not None), None)
+    return {
+        "condition": {
+            "current": state(c.get("currentstate")),
+            "prior": state(c.get("priorstate")),
+            "conn_ge": count(c, "allconnectionscount_ge"),
+            "conn_le": count(c, "allconnectionscount_le"),
+            "parents_ge": count(c, "parentscount_ge"),
+            "parents_le": count(c, "parentscount_le"),
+        },
+        "op": {"kind": LEGACY_KINDS.get(kind, kind), "operand": state(operand)},
+    }
+
+
+def iter_change_tables(source) -> Iterator[Tuple[str, ET.Element]]:
+    """
+    Yields (name, ChangeTable element) as each table closes. The caller must be done with the element
+    before the next iteration: it is cleared and detached from the root afterwards.
+    """
+    context = ET.iterparse(source, events=("start", "end"))
+    _, root = next(context)
+    index = 0
+    for event, elem in context:
+        if event != "end" or local(elem.tag) != "ChangeTable":
+            continue
+        a = attrs(elem)
+        name = a.get("key") or a.get("name") or f"gene_{index:04d}"
+        index += 1
+        yield name, elem
+        elem.clear()
+        root.clear()  # drop references to finished tables (the parser keeps its own open ancestors)
+
+
+def genome_from_table(table: ET.Element, *, max_steps: int, default_max_vertices: int,
+                      infer_start_state: bool, rng_seed: Optional[int]) -> Tuple[dict, int]:
+    """Returns (genome dict, number of skipped items)."""
+    rules, skipped = [], 0
+    for item in table:
+        if local(item.tag) != "ChangeTableItem":
+            continue
+        rule = convert_item(item)
+        if rule is None:
+            skipped += 1
+        else:
+            rules.append(rule)
+
+    start = "A"
+    if infer_start_state:
+        currents = Counter(r["condition"]["current"] for r in rules if r["condition"]["current"] != "any")
+        if currents:
+            start = currents.most_common(1)[0][0]
+    capacity = attrs(table).get("capacity")
+    machine = {
+        "start_state": start,
+        "transcription": "resettable",
+        "count_compare": "range",
+        "max_vertices": int(capacity) if capacity else default_max_vertices,
+        "max_steps": max_steps,
+        "nearest_search": {"max_depth": 2, "tie_breaker": "stable", "connect_all": False},
+    }
+    if rng_seed is not None:
+        machine["rng_seed"] = rng_seed
+    return {"machine": machine, "init_graph": {"nodes": [{"state": start}]}, "rules": rules}, skipped
+
+
+def safe_filename(name: str, used: Dict[str, int]) -> str:
+    base = re.sub(r"[^\w.-]+", "_", name).strip("._") or "gene"
+    n = used.get(base, 0)
+    used[base] = n + 1
+    return base if n == 0 else f"{base}_{n + 1}"
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Stream legacy XAML gene dictionaries into genome YAML / NDJSON.")
+    ap.add_argument("xml", help="legacy dictionary (.xaml/.xml), '-' for stdin")
+    out = ap.add_mutually_exclusive_group(required=True)
+    out.add_argument("--out-dir", type=Path, help="write one <name>.yaml genome per ChangeTable")
+    out.add_argument("--ndjson", help="write one {name, genome} JSON object per line ('-' = stdout)")
+    ap.add_argument("--max-steps", type=int, default=120)
+    ap.add_argument("--max-vertices", type=int, default=2000, help="used when a table has no Capacity")
+    ap.add_argument("--infer-start-state", action="store_true", help="start_state = most frequent condition.current")
+    ap.add_argument("--rng-seed", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    if args.out_dir is not None:
+        import yaml  # only needed for YAML output
+        args.out_dir.mkdir(parents=True, exist_ok=True)
+        used: Dict[str, int] = {}
+        sink = None
+    else:
+        sink = sys.stdout if args.ndjson == "-" else open(args.ndjson, "w", encoding="utf-8")
+
+    n_genes = n_skipped = 0
+    try:
+        source = sys.stdin.buffer if args.xml == "-" else args.xml
+        for name, table in iter_change_tables(source):
+            genome, skipped = genome_from_table(
+                table, max_steps=args.max_steps, default_max_vertices=args.max_vertices,
+                infer_start_state=args.infer_start_state, rng_seed=args.rng_seed,
+            )
+            if sink is None:
+                path = args.out_dir / f"{safe_filename(name, used)}.yaml"
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(f"# converted from legacy gene dictionary: {name}\n")
+                    yaml.safe_dump(genome, f, sort_keys=False, default_flow_style=None, width=120)
+            else:
+                sink.write(json.dumps({"name": name, "genome": genome}) + "\n")
+            n_genes += 1
+            n_skipped += skipped
+    finally:
+        if sink is not None and sink is not sys.stdout:
+            sink.close()
+
+    print(f"converted {n_genes} genomes" + (f", skipped {n_skipped} incomplete items" if n_skipped else ""), file=sys.stderr)
+    return 0
+
 
-def xml_to_json(xml_file):
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-
-    genes = {}
-
-    for change_table in root.findall("{clr-namespace:GraphUnfoldingMachine;assembly=Physical2DGraphCanvasSL}ChangeTable"):
-        gene_name = change_table.get("{http://schemas.microsoft.com/winfx/2006/xaml}Key")
-        genes[gene_name] = []
-
-        for item in change_table.findall("{clr-namespace:GraphUnfoldingMachine;assembly=Physical2DGraphCanvasSL}ChangeTableItem"):
-            condition = item.find("{clr-namespace:GraphUnfoldingMachine;assembly=Physical2DGraphCanvasSL}ChangeTableItem.Condition/{clr-namespace:GraphUnfoldingMachine;assembly=Physical2DGraphCanvasSL}OperationCondition")
-            operation = item.find("{clr-namespace:GraphUnfoldingMachine;assembly=Physical2DGraphCanvasSL}ChangeTableItem.Operation/{clr-namespace:GraphUnfoldingMachine;assembly=Physical2DGraphCanvasSL}Operation")
-
-            condition_data = {
-                "currentState": condition.get("CurrentState"),
-                "priorState": condition.get("PriorState"),
-                "allConnectionsCount_GE": int(condition.get("AllConnectionsCount_GE")),
-                "allConnectionsCount_LE": int(condition.get("AllConnectionsCount_LE")),
-                "parentsCount_GE": int(condition.get("ParentsCount_GE")),
-                "parentsCount_LE": int(condition.get("ParentsCount_LE"))
-            }
-
-            operation_data = {
-                "kind": operation.get("Kind"),
-                "operandNodeState": operation.get("OperandNodeState")
-            }
-
-            genes[gene_name].append({
-                "condition": condition_data,
-                "operation": operation_data
-            })
-
-    return json.dumps({"genes": genes}, indent=4)
-
-# Example usage:
-xml_file = "/Users/rgudchenko/p/GUCA/2024_10_28_CSharp_backup/GUCA_DemoSL/GUCA_DemoSL/GUCA_DemoSLApplication/dictGens.xaml"
-json_data = xml_to_json(xml_file)
-with open("../data/demo_2010_dict_genes.json", "w") as json_file:
-    json_file.write(json_data)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Set
+from typing import Iterable, Iterator, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python iter_edges_* builders are used instead
+    np = None
 
 # Moore neighborhood in (x,y)
 DELTAS_8: List[Tuple[int, int]] = [
@@ -45,13 +52,26 @@ class Params:
     hole_h: int = 2
     hole_w: int = 2
 
+    # Lazy pure-Python edges (lowest memory) even when NumPy is installed
+    stream: bool = False
+
+    # Output containers: "yaml", "gumb" (binary, see docs/planning/m2_python/gum_binary.py) or both
+    formats: Tuple[str, ...] = ("yaml",)
+
 
 def nid(r: int, c: int, ncols: int) -> int:
     """1-based node id (row-major)."""
     return r * ncols + c + 1
 
 
-def compute_degrees(edges: List[Tuple[int, int]], n_nodes: int) -> List[int]:
+def is_edge_array(edges) -> bool:
+    return np is not None and isinstance(edges, np.ndarray)
+
+
+def compute_degrees(edges: Iterable[Tuple[int, int]], n_nodes: int) -> List[int]:
+    """Degree per 1-based id (index 0 unused); np.bincount for an edge array."""
+    if is_edge_array(edges):
+        return np.bincount(edges.ravel(), minlength=n_nodes + 1)
     deg = [0] * (n_nodes + 1)
     for a, b in edges:
         deg[a] += 1
@@ -59,24 +79,83 @@ def compute_degrees(edges: List[Tuple[int, int]], n_nodes: int) -> List[int]:
     return deg
 
 
-def write_yaml(path: Path, nodes: List[str], edges: List[Tuple[int, int]], header_lines: List[str], per_line: int) -> None:
-    lines: List[str] = []
-    lines.extend(header_lines)
-    lines.append("")
-    lines.append("nodes: [")
+def deg_range(deg) -> Tuple[int, int]:
+    """(min, max) over ids 1..n."""
+    if is_edge_array(deg):
+        return int(deg[1:].min()), int(deg[1:].max())
+    return min(deg[1:]), max(deg[1:])
 
-    for i in range(0, len(nodes), per_line):
-        chunk = nodes[i : i + per_line]
-        suffix = "," if (i + per_line) < len(nodes) else ""
-        lines.append("  " + ", ".join(chunk) + suffix)
 
-    lines.append("]")
-    lines.append("")
-    lines.append("edges:")
-    for a, b in edges:
-        lines.append(f"  - [{a}, {b}]")
-    lines.append("")
-    path.write_text("\n".join(lines), encoding="utf-8")
+def _assert_degrees(name: str, deg, expected) -> None:
+    """Vectorized check of a bincount degree array against a per-cell (rows, cols) grid; -1 = unchecked."""
+    grid = deg[1:].reshape(expected.shape)
+    bad = np.argwhere((expected >= 0) & (grid != expected))
+    if len(bad):
+        r, c = (int(x) for x in bad[0])
+        node = nid(r, c, expected.shape[1])
+        raise AssertionError(f"{name}: node id={node} (r={r},c={c}) degree={grid[r, c]} != expected={expected[r, c]}")
+
+
+WRITE_BUFFER = 1 << 20
+EDGE_CHUNK = 1 << 16
+
+
+def _edge_lines(edges: Iterable[Tuple[int, int]]) -> Iterator[str]:
+    if is_edge_array(edges):
+        # one %-format per chunk over tolist() ints: ~3x faster than an f-string per edge
+        for k in range(0, len(edges), EDGE_CHUNK):
+            chunk = edges[k : k + EDGE_CHUNK]
+            yield ("  - [%d, %d]\n" * len(chunk)) % tuple(chunk.ravel().tolist())
+    else:
+        for a, b in edges:
+            yield f"  - [{a}, {b}]\n"
+
+
+def write_yaml(path: Path, nodes: List[str], edges: Iterable[Tuple[int, int]], header_lines: List[str], per_line: int) -> None:
+    """
+    Streams the document through a buffered writer: edges may be a generator (see iter_edges_*),
+    so the edge list is never held in memory, or an (E, 2) array from edge_array_*. Output is the same bytes as joining all lines with "\n".
+    """
+    with open(path, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER) as f:
+        for line in header_lines:
+            f.write(line + "\n")
+        f.write("\nnodes: [\n")
+
+        for i in range(0, len(nodes), per_line):
+            chunk = nodes[i : i + per_line]
+            suffix = "," if (i + per_line) < len(nodes) else ""
+            f.write("  " + ", ".join(chunk) + suffix + "\n")
+
+        f.write("]\n\nedges:\n")
+        f.writelines(_edge_lines(edges))
+
+
+def write_gumb(path: Path, nodes: List[str], edges: Iterable[Tuple[int, int]], header_lines: List[str]) -> None:
+    """Same substrate as write_yaml, as a .gumb container (state bytes + int32 edges, header kept in meta)."""
+    ref = Path(__file__).resolve().parents[1] / "docs" / "planning" / "m2_python"
+    if str(ref) not in sys.path:
+        sys.path.insert(0, str(ref))
+    import gum_binary
+
+    meta = {
+        "meta": {"comments": [line.lstrip("# ") for line in header_lines]},
+        "init_graph": {"nodes": gum_binary.STATES_REF, "edges": gum_binary.EDGES_REF},
+    }
+    gum_binary.write_binary(path, nodes, edges, meta)
+
+
+def write_substrate(stem: Path, nodes: List[str], edge_sources: List[Iterable[Tuple[int, int]]],
+                    header_lines: List[str], per_line: int, formats: Tuple[str, ...]) -> List[Path]:
+    """Writes stem.yaml / stem.gumb; edge_sources holds one edge pass per format (see edge_passes)."""
+    written = []
+    for fmt, edges in zip(formats, edge_sources):
+        path = stem.with_suffix("." + fmt)
+        if fmt == "yaml":
+            write_yaml(path, nodes, edges, header_lines, per_line)
+        else:
+            write_gumb(path, nodes, edges, header_lines)
+        written.append(path)
+    return written
 
 
 # -------------------------
@@ -119,31 +198,36 @@ def generate_nodes_with_glider_diagonal_strip(p: Params) -> List[str]:
     return nodes
 
 
-def build_edges_diagonal_strip_cylinder(p: Params) -> List[Tuple[int, int]]:
+def iter_edges_diagonal_strip_cylinder(p: Params) -> Iterator[Tuple[int, int]]:
     """
     Moore neighborhood on diagonal strip:
       u' = (u + dx) mod L
       v' = v + (dy - dx)   (open boundary)
+    Yields each edge once as (a, b), a < b, in sorted order: nodes are visited in id order and
+    each emits its own larger-id neighbors, sorted (a per-node set handles wrap duplicates).
     """
     L, W = p.L, p.W
-    edges: Set[Tuple[int, int]] = set()
 
     for u in range(L):
         for v in range(W):
             a = nid(u, v, W)
+            nbrs = set()
             for dx, dy in DELTAS_8:
                 u2 = (u + dx) % L
                 v2 = v + (dy - dx)
                 if 0 <= v2 < W:
                     b = nid(u2, v2, W)
-                    if a != b:
-                        e = (a, b) if a < b else (b, a)
-                        edges.add(e)
+                    if b > a:
+                        nbrs.add(b)
+            for b in sorted(nbrs):
+                yield (a, b)
+
 
-    return sorted(edges)
+def build_edges_diagonal_strip_cylinder(p: Params) -> List[Tuple[int, int]]:
+    return list(iter_edges_diagonal_strip_cylinder(p))
 
 
-def assert_diagonal_strip_ok(edges: List[Tuple[int, int]], p: Params) -> None:
+def assert_diagonal_strip_ok(edges: Iterable[Tuple[int, int]], p: Params) -> None:
     """
     Sanity:
       - max degree <= 8
@@ -153,10 +237,14 @@ def assert_diagonal_strip_ok(edges: List[Tuple[int, int]], p: Params) -> None:
     n = L * W
     deg = compute_degrees(edges, n)
 
-    mx = max(deg[1:])
+    mx = deg_range(deg)[1]
     assert mx <= 8, f"diagonal_strip: max degree {mx} > 8 (bug)"
 
-    if W >= 5:
+    if is_edge_array(edges):
+        expected = np.full((L, W), -1)
+        expected[:, 2 : W - 2] = 8
+        _assert_degrees("diagonal_strip", deg, expected)
+    elif W >= 5:
         for u in range(L):
             for v in range(2, W - 2):
                 node = nid(u, v, W)
@@ -182,35 +270,38 @@ def generate_nodes_with_glider_torus(p: Params) -> List[str]:
     return nodes
 
 
-def build_edges_torus(p: Params) -> List[Tuple[int, int]]:
+def iter_edges_torus(p: Params) -> Iterator[Tuple[int, int]]:
     """
     Standard rectangular torus with Moore (8-neighbor) connectivity:
     wrap in both row and col => every node degree 8 (for R,C >= 3).
+    Yields sorted (a, b), a < b, without a global edge set (see iter_edges_diagonal_strip_cylinder).
     """
     R, C = p.L, p.W
-    edges: Set[Tuple[int, int]] = set()
 
     for r in range(R):
         for c in range(C):
             a = nid(r, c, C)
+            nbrs = set()
             for dr, dc in DELTAS_8:
                 r2 = (r + dr) % R
                 c2 = (c + dc) % C
                 b = nid(r2, c2, C)
-                if a != b:
-                    e = (a, b) if a < b else (b, a)
-                    edges.add(e)
+                if b > a:
+                    nbrs.add(b)
+            for b in sorted(nbrs):
+                yield (a, b)
 
-    return sorted(edges)
+
+def build_edges_torus(p: Params) -> List[Tuple[int, int]]:
+    return list(iter_edges_torus(p))
 
 
-def assert_torus_all_deg_8(edges: List[Tuple[int, int]], p: Params) -> None:
+def assert_torus_all_deg_8(edges: Iterable[Tuple[int, int]], p: Params) -> None:
     R, C = p.L, p.W
     n = R * C
     deg = compute_degrees(edges, n)
 
-    mn = min(deg[1:])
-    mx = max(deg[1:])
+    mn, mx = deg_range(deg)
     assert mn == 8 and mx == 8, f"torus: expected all degrees 8, got min={mn}, max={mx}"
 
 
@@ -244,31 +335,35 @@ def generate_nodes_with_glider_cylinder_grid(p: Params) -> List[str]:
     return nodes
 
 
-def build_edges_cylinder_grid(p: Params) -> List[Tuple[int, int]]:
+def iter_edges_cylinder_grid(p: Params) -> Iterator[Tuple[int, int]]:
     """
     Moore neighborhood on cylinder grid:
       r2 = r + dr must stay in [0..R-1] (open)
       c2 = (c + dc) mod C (wrapped)
+    Yields sorted (a, b), a < b, without a global edge set (see iter_edges_diagonal_strip_cylinder).
     """
     R, C = p.L, p.W
-    edges: Set[Tuple[int, int]] = set()
 
     for r in range(R):
         for c in range(C):
             a = nid(r, c, C)
+            nbrs = set()
             for dr, dc in DELTAS_8:
                 r2 = r + dr
                 if 0 <= r2 < R:
                     c2 = (c + dc) % C
                     b = nid(r2, c2, C)
-                    if a != b:
-                        e = (a, b) if a < b else (b, a)
-                        edges.add(e)
+                    if b > a:
+                        nbrs.add(b)
+            for b in sorted(nbrs):
+                yield (a, b)
 
-    return sorted(edges)
+
+def build_edges_cylinder_grid(p: Params) -> List[Tuple[int, int]]:
+    return list(iter_edges_cylinder_grid(p))
 
 
-def assert_cylinder_grid_ok(edges: List[Tuple[int, int]], p: Params) -> None:
+def assert_cylinder_grid_ok(edges: Iterable[Tuple[int, int]], p: Params) -> None:
     """
     Cylinder grid degrees:
       - max degree <= 8 always
@@ -280,9 +375,15 @@ def assert_cylinder_grid_ok(edges: List[Tuple[int, int]], p: Params) -> None:
     n = R * C
     deg = compute_degrees(edges, n)
 
-    mx = max(deg[1:])
+    mx = deg_range(deg)[1]
     assert mx <= 8, f"cylinder_grid: max degree {mx} > 8 (bug)"
 
+    if is_edge_array(edges):
+        rows = np.arange(R)
+        expected = sum(((rows + dr >= 0) & (rows + dr < R)).astype(int) for dr, _ in DELTAS_8)
+        _assert_degrees("cylinder_grid", deg, np.broadcast_to(expected[:, None], (R, C)))
+        return
+
     for r in range(R):
         # expected degree depends only on whether r+dr stays in bounds (cols always wrap)
         expected = 0
@@ -327,13 +428,13 @@ def generate_nodes_quad_mesh_with_hole(p: Params) -> Tuple[List[str], List[List[
     return nodes, mask
 
 
-def build_edges_quad_mesh_with_hole(p: Params, hole_mask: List[List[bool]]) -> List[Tuple[int, int]]:
+def iter_edges_quad_mesh_with_hole(p: Params, hole_mask: List[List[bool]]) -> Iterator[Tuple[int, int]]:
     """
     4-neighbor (quad mesh): connect right and down, skipping hole cells.
     Node ids remain row-major over the full L*W grid; hole ids exist but have degree 0.
+    Right (a+1) and down (a+W) are both larger ids, so edges come out sorted with no dedup needed.
     """
     L, W = p.quad_L, p.quad_W
-    edges: Set[Tuple[int, int]] = set()
 
     def ok(r: int, c: int) -> bool:
         return 0 <= r < L and 0 <= c < W and (not hole_mask[r][c])
@@ -346,17 +447,17 @@ def build_edges_quad_mesh_with_hole(p: Params, hole_mask: List[List[bool]]) -> L
 
             # right
             if ok(r, c + 1):
-                b = nid(r, c + 1, W)
-                edges.add((a, b) if a < b else (b, a))
+                yield (a, nid(r, c + 1, W))
             # down
             if ok(r + 1, c):
-                b = nid(r + 1, c, W)
-                edges.add((a, b) if a < b else (b, a))
+                yield (a, nid(r + 1, c, W))
+
 
-    return sorted(edges)
+def build_edges_quad_mesh_with_hole(p: Params, hole_mask: List[List[bool]]) -> List[Tuple[int, int]]:
+    return list(iter_edges_quad_mesh_with_hole(p, hole_mask))
 
 
-def assert_quad_mesh_degrees(edges: List[Tuple[int, int]], p: Params, hole_mask: List[List[bool]]) -> None:
+def assert_quad_mesh_degrees(edges: Iterable[Tuple[int, int]], p: Params, hole_mask: List[List[bool]]) -> None:
     """
     Assert exact expected degree for every cell id:
       - hole cells => degree 0
@@ -367,9 +468,15 @@ def assert_quad_mesh_degrees(edges: List[Tuple[int, int]], p: Params, hole_mask:
     n = L * W
     deg = compute_degrees(edges, n)
 
-    mx = max(deg[1:])
+    mx = deg_range(deg)[1]
     assert mx <= 4, f"quad_mesh: max degree {mx} > 4 (bug)"
 
+    if is_edge_array(edges):
+        ok = np.pad(~np.asarray(hole_mask, dtype=bool).reshape(L, W), 1)  # False border = outside
+        exp = ok[:-2, 1:-1].astype(int) + ok[2:, 1:-1] + ok[1:-1, :-2] + ok[1:-1, 2:]
+        _assert_degrees("quad_mesh", deg, np.where(ok[1:-1, 1:-1], exp, 0))
+        return
+
     def ok(r: int, c: int) -> bool:
         return 0 <= r < L and 0 <= c < W and (not hole_mask[r][c])
 
@@ -389,24 +496,126 @@ def assert_quad_mesh_degrees(edges: List[Tuple[int, int]], p: Params, hole_mask:
             assert deg[node] == exp, f"quad_mesh: cell id={node} (r={r},c={c}) degree={deg[node]} != expected={exp}"
 
 
-def main() -> None:
-    p = Params(
-        L=10, W=20,
-        out_dir=Path("."),
-        glider_x0=5, glider_v0=10,
-        torus_glider_r0=5, torus_glider_c0=10,
-        cyl_glider_r0=5, cyl_glider_c0=10,
-        quad_L=10, quad_W=20,
-        hole_r0=4, hole_c0=9, hole_h=0, hole_w=0,
+# ------------------------------------------
+# NumPy edge arrays (same edges/order as iter_edges_*, built by broadcasting over the index grid)
+# ------------------------------------------
+
+def _edge_array(a, b) -> np.ndarray:
+    """
+    Candidate pairs (a -> b) for every node and delta -> sorted unique (a, b), a < b, as int32 (E, 2).
+    The neighborhoods are symmetric, so keeping b > a loses no edge; unique drops wrap duplicates.
+    """
+    a = np.concatenate(a).astype(np.int64)
+    b = np.concatenate(b).astype(np.int64)
+    keep = b > a
+    span = int(b.max(initial=0)) + 1
+    key = np.sort(a[keep] * span + b[keep])
+    key = key[np.diff(key, prepend=-1) != 0]  # np.unique, minus its slower hashing path on NumPy 2
+    return np.stack((key // span, key % span), axis=1).astype(np.int32)
+
+
+def _grid(R: int, C: int):
+    r, c = np.divmod(np.arange(R * C), C)
+    return r, c, r * C + c + 1
+
+
+def edge_array_diagonal_strip_cylinder(p: Params) -> np.ndarray:
+    L, W = p.L, p.W
+    u, v, a = _grid(L, W)
+    src, dst = [], []
+    for dx, dy in DELTAS_8:
+        v2 = v + (dy - dx)
+        inside = (v2 >= 0) & (v2 < W)
+        src.append(a[inside])
+        dst.append(((u[inside] + dx) % L) * W + v2[inside] + 1)
+    return _edge_array(src, dst)
+
+
+def edge_array_torus(p: Params) -> np.ndarray:
+    R, C = p.L, p.W
+    r, c, a = _grid(R, C)
+    return _edge_array([a] * len(DELTAS_8), [((r + dr) % R) * C + (c + dc) % C + 1 for dr, dc in DELTAS_8])
+
+
+def edge_array_cylinder_grid(p: Params) -> np.ndarray:
+    R, C = p.L, p.W
+    r, c, a = _grid(R, C)
+    src, dst = [], []
+    for dr, dc in DELTAS_8:
+        r2 = r + dr
+        inside = (r2 >= 0) & (r2 < R)
+        src.append(a[inside])
+        dst.append(r2[inside] * C + (c[inside] + dc) % C + 1)
+    return _edge_array(src, dst)
+
+
+def edge_array_quad_mesh_with_hole(p: Params, hole_mask: List[List[bool]]) -> np.ndarray:
+    L, W = p.quad_L, p.quad_W
+    ok = ~np.asarray(hole_mask, dtype=bool).reshape(L, W)
+    ids = np.arange(1, L * W + 1).reshape(L, W)
+    right = ok[:, :-1] & ok[:, 1:]
+    down = ok[:-1, :] & ok[1:, :]
+    return _edge_array([ids[:, :-1][right], ids[:-1, :][down]], [ids[:, 1:][right], ids[1:, :][down]])
+
+
+def edge_passes(array_fn, iter_fn, *args, stream: bool = False, passes: int = 2) -> list:
+    """
+    Edge sources for the degree check and each writer: one NumPy array shared by all passes, or one
+    lazy generator per pass.
+    """
+    if np is not None and not stream:
+        edges = array_fn(*args)
+        return [edges] * passes
+    return [iter_fn(*args) for _ in range(passes)]
+
+
+def parse_params(argv: List[str] | None = None) -> Params:
+    """CLI sizes/placements; the defaults reproduce the checked-in 10x20 substrates."""
+    ap = argparse.ArgumentParser(description="Generate lattice substrates (init_graph YAML) for CA genomes.")
+    ap.add_argument("--L", type=int, default=10, help="rows / wrapped length (strip, torus, cylinder)")
+    ap.add_argument("--W", type=int, default=20, help="columns / strip width")
+    ap.add_argument("--out-dir", type=Path, default=Path("."))
+    ap.add_argument("--glider-x0", type=int, default=5)
+    ap.add_argument("--glider-v0", type=int, default=10)
+    ap.add_argument("--torus-glider-r0", type=int, default=5)
+    ap.add_argument("--torus-glider-c0", type=int, default=10)
+    ap.add_argument("--cyl-glider-r0", type=int, default=5)
+    ap.add_argument("--cyl-glider-c0", type=int, default=10)
+    ap.add_argument("--quad-L", type=int, default=None, help="quad mesh rows (default: --L)")
+    ap.add_argument("--quad-W", type=int, default=None, help="quad mesh columns (default: --W)")
+    ap.add_argument("--hole", type=int, nargs=4, default=(4, 9, 0, 0), metavar=("R0", "C0", "H", "W"),
+                    help="quad mesh hole, 0-based; H=0 or W=0 for no hole")
+    ap.add_argument("--format", choices=("yaml", "gumb", "both"), default="yaml",
+                    help="yaml text, .gumb binary container, or both")
+    ap.add_argument("--stream", action="store_true",
+                    help="generate edges lazily in pure Python (O(nodes) memory, slower) instead of NumPy arrays")
+    a = ap.parse_args(argv)
+    hole_r0, hole_c0, hole_h, hole_w = a.hole
+    return Params(
+        L=a.L, W=a.W,
+        out_dir=a.out_dir,
+        glider_x0=a.glider_x0, glider_v0=a.glider_v0,
+        torus_glider_r0=a.torus_glider_r0, torus_glider_c0=a.torus_glider_c0,
+        cyl_glider_r0=a.cyl_glider_r0, cyl_glider_c0=a.cyl_glider_c0,
+        quad_L=a.L if a.quad_L is None else a.quad_L, quad_W=a.W if a.quad_W is None else a.quad_W,
+        hole_r0=hole_r0, hole_c0=hole_c0, hole_h=hole_h, hole_w=hole_w,
+        stream=a.stream,
+        formats=("yaml", "gumb") if a.format == "both" else (a.format,),
     )
+
+
+def main(argv: List[str] | None = None) -> None:
+    # With NumPy, each edge array is built once and shared by the degree check and the writers;
+    # otherwise (or with --stream) edges are regenerated per pass rather than stored, so memory stays O(nodes).
+    p = parse_params(argv)
     p.out_dir.mkdir(parents=True, exist_ok=True)
 
     # 1) Diagonal strip cylinder
     nodes_strip = generate_nodes_with_glider_diagonal_strip(p)
-    edges_strip = build_edges_diagonal_strip_cylinder(p)
-    assert_diagonal_strip_ok(edges_strip, p)
-    out_strip = p.out_dir / f"life_diagonal_strip_cylinder_L{p.L}_W{p.W}.yaml"
-    write_yaml(
+    check_strip, *edges_strip = edge_passes(edge_array_diagonal_strip_cylinder, iter_edges_diagonal_strip_cylinder, p, stream=p.stream, passes=1 + len(p.formats))
+    assert_diagonal_strip_ok(check_strip, p)
+    out_strip = p.out_dir / f"life_diagonal_strip_cylinder_L{p.L}_W{p.W}"
+    out_strip = write_substrate(
         out_strip,
         nodes_strip,
         edges_strip,
@@ -415,14 +624,15 @@ def main() -> None:
             f"# L={p.L} wrapped in u, W={p.W} open in v. Node id = u*W + v + 1.",
         ],
         per_line=p.W,
+        formats=p.formats,
     )
 
     # 2) Torus grid
     nodes_torus = generate_nodes_with_glider_torus(p)
-    edges_torus = build_edges_torus(p)
-    assert_torus_all_deg_8(edges_torus, p)
-    out_torus = p.out_dir / f"life_torus_R{p.L}_C{p.W}.yaml"
-    write_yaml(
+    check_torus, *edges_torus = edge_passes(edge_array_torus, iter_edges_torus, p, stream=p.stream, passes=1 + len(p.formats))
+    assert_torus_all_deg_8(check_torus, p)
+    out_torus = p.out_dir / f"life_torus_R{p.L}_C{p.W}"
+    out_torus = write_substrate(
         out_torus,
         nodes_torus,
         edges_torus,
@@ -432,14 +642,15 @@ def main() -> None:
             "# Node id = row*C + col + 1.",
         ],
         per_line=p.W,
+        formats=p.formats,
     )
 
     # 3) NEW: Straight grid cylinder (wrap columns, open rows)
     nodes_cyl = generate_nodes_with_glider_cylinder_grid(p)
-    edges_cyl = build_edges_cylinder_grid(p)
-    assert_cylinder_grid_ok(edges_cyl, p)
-    out_cyl = p.out_dir / f"life_cylinder_R{p.L}_C{p.W}.yaml"
-    write_yaml(
+    check_cyl, *edges_cyl = edge_passes(edge_array_cylinder_grid, iter_edges_cylinder_grid, p, stream=p.stream, passes=1 + len(p.formats))
+    assert_cylinder_grid_ok(check_cyl, p)
+    out_cyl = p.out_dir / f"life_cylinder_R{p.L}_C{p.W}"
+    out_cyl = write_substrate(
         out_cyl,
         nodes_cyl,
         edges_cyl,
@@ -449,16 +660,17 @@ def main() -> None:
             "# Node id = row*C + col + 1.",
         ],
         per_line=p.W,
+        formats=p.formats,
     )
 
     # 4) Rectangle quad mesh with optional hole
     nodes_quad, hole_mask = generate_nodes_quad_mesh_with_hole(p)
-    edges_quad = build_edges_quad_mesh_with_hole(p, hole_mask)
-    assert_quad_mesh_degrees(edges_quad, p, hole_mask)
+    check_quad, *edges_quad = edge_passes(edge_array_quad_mesh_with_hole, iter_edges_quad_mesh_with_hole, p, hole_mask, stream=p.stream, passes=1 + len(p.formats))
+    assert_quad_mesh_degrees(check_quad, p, hole_mask)
 
     hole_tag = "no_hole" if (p.hole_h <= 0 or p.hole_w <= 0) else f"hole_r{p.hole_r0}_c{p.hole_c0}_h{p.hole_h}_w{p.hole_w}"
-    out_quad = p.out_dir / f"rect_quad_mesh_L{p.quad_L}_W{p.quad_W}_{hole_tag}.yaml"
-    write_yaml(
+    out_quad = p.out_dir / f"rect_quad_mesh_L{p.quad_L}_W{p.quad_W}_{hole_tag}"
+    out_quad = write_substrate(
         out_quad,
         nodes_quad,
         edges_quad,
@@ -470,13 +682,12 @@ def main() -> None:
             f"Set h=0 or w=0 for no hole.",
         ],
         per_line=p.quad_W,
+        formats=p.formats,
     )
 
     print("Wrote:")
-    print(f"  {out_strip}")
-    print(f"  {out_torus}")
-    print(f"  {out_cyl}")
-    print(f"  {out_quad}")
+    for path in out_strip + out_torus + out_cyl + out_quad:
+        print(f"  {path}")
 
 
 if __name__ == "__main__":